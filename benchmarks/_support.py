@@ -0,0 +1,308 @@
+"""
+Shared setup for the offline cache benchmarks.
+
+Configures Django with a LocMem-backed cache per `CacheStoreEnum` store, or
+django-redis against an in-process fakeredis server. Either way every backend
+round trip goes through `faults`, which counts it, sleeps a fixed latency to
+approximate a network hop to Redis, and can fail it to simulate an outage.
+"""
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+from typing import Callable
+import django
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from street_ninja_common.cache.access_patterns import AccessPatternDB
+from street_ninja_common.cache.enums import CacheStoreEnum
+
+
+class FaultInjector:
+    """
+    Latency and failures injected into every backend round trip.
+
+    `failure_rate` fails that fraction of round trips, drawn from a seeded RNG
+    so runs are repeatable; inside `outage()` every round trip fails.
+    """
+
+    def __init__(self):
+        self.latency = 0.0
+        self.failure_rate = 0.0
+        self.down = False
+        self.round_trips = 0
+        self.failures = 0
+        self._rng = random.Random(0)
+
+    def seed(self, seed: int):
+        self._rng.seed(seed)
+
+    def round_trip(self, error: type[Exception] = ConnectionError):
+        self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.down or (self.failure_rate and self._rng.random() < self.failure_rate):
+            self.failures += 1
+            raise error("Injected cache failure")
+
+    @contextmanager
+    def outage(self):
+        self.down = True
+        try:
+            yield
+        finally:
+            self.down = False
+
+    @contextmanager
+    def flaky(self, failure_rate: float):
+        self.failure_rate = failure_rate
+        try:
+            yield
+        finally:
+            self.failure_rate = 0.0
+
+
+faults = FaultInjector()
+
+
+class CountingLocMemCache(LocMemCache):
+    """LocMem cache whose calls are round trips through `faults`."""
+
+    def _round_trip(self):
+        faults.round_trip()
+
+    def get(self, *args, **kwargs):
+        self._round_trip()
+        return super().get(*args, **kwargs)
+
+    def set(self, *args, **kwargs):
+        self._round_trip()
+        return super().set(*args, **kwargs)
+
+    def add(self, *args, **kwargs):
+        self._round_trip()
+        return super().add(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        self._round_trip()
+        return super().delete(*args, **kwargs)
+
+
+def configure(latency: float = 0.0):
+    faults.latency = latency
+    if settings.configured:
+        return
+    settings.configure(
+        CACHES={
+            store.value: {
+                "BACKEND": "benchmarks._support.CountingLocMemCache",
+                "LOCATION": store.value,
+                "OPTIONS": {"MAX_ENTRIES": 1_000_000},
+            }
+            for store in CacheStoreEnum
+        },
+        USE_TZ=True,
+    )
+    django.setup()
+
+
+def configure_redis(latency: float = 0.0):
+    """
+    Configure django-redis against an in-process fakeredis server instead of
+    LocMem, for code that needs Redis commands (scripts, hashes, pipelines).
+    Every round trip sleeps `latency` seconds; a pipeline is one round trip.
+    Injected failures raise redis-py's `ConnectionError`, as a dropped
+    connection would. Needs `pip install fakeredis lupa`.
+    """
+    try:
+        from fakeredis import FakeRedisConnection
+        from redis.exceptions import ConnectionError as RedisConnectionError
+    except ImportError:
+        raise SystemExit("This benchmark needs fakeredis and lupa: pip install fakeredis lupa")
+
+    class LatentFakeRedisConnection(FakeRedisConnection):
+
+        def send_packed_command(self, *args, **kwargs):
+            faults.round_trip(RedisConnectionError)
+            return super().send_packed_command(*args, **kwargs)
+
+    faults.latency = latency
+    if settings.configured:
+        return
+    settings.configure(
+        CACHES={
+            store.value: {
+                "BACKEND": "django_redis.cache.RedisCache",
+                "LOCATION": f"redis://localhost:6379/{db}",
+                "OPTIONS": {"CONNECTION_POOL_KWARGS": {"connection_class": LatentFakeRedisConnection}},
+            }
+            for db, store in enumerate(CacheStoreEnum)
+        },
+        USE_TZ=True,
+    )
+    django.setup()
+
+
+@dataclass(frozen=True)
+class BenchPattern(AccessPatternDB):
+
+    def key(self, **kwargs) -> str:
+        suffix = ":".join(f"{k}={v}" for k, v in sorted(kwargs.items()))
+        return f"{self._key_enum}:{suffix}"
+
+
+Resource = namedtuple("Resource", ["id", "name", "location"])
+
+# Where Street Ninja SMS requests come from: (lat, lon, weight, spread in degrees)
+VANCOUVER_HOTSPOTS = [
+    (49.2810, -123.0990, 0.40, 0.004),  # Downtown Eastside
+    (49.2820, -123.1200, 0.20, 0.006),  # Downtown / Granville
+    (49.2625, -123.0690, 0.15, 0.006),  # Commercial-Broadway
+    (49.2635, -123.1140, 0.10, 0.008),  # Mount Pleasant / Fairview
+    (49.2480, -123.1000, 0.15, 0.030),  # rest of the city
+]
+
+
+def vancouver_point(rng: random.Random) -> tuple[float, float]:
+    lat, lon, _, spread = rng.choices(VANCOUVER_HOTSPOTS, weights=[h[2] for h in VANCOUVER_HOTSPOTS])[0]
+    return rng.gauss(lat, spread), rng.gauss(lon, spread * 1.5)
+
+
+def vancouver_resources(count: int, seed: int = 7) -> list[Resource]:
+    """Resources clustered like the requests, with `location` as a (lat, lon) tuple."""
+    rng = random.Random(seed)
+    return [Resource(i, f"Resource {i}", vancouver_point(rng)) for i in range(count)]
+
+
+def vancouver_queries(count: int, seed: int = 11) -> list[tuple[float, float]]:
+    rng = random.Random(seed)
+    return [vancouver_point(rng) for _ in range(count)]
+
+
+@dataclass(frozen=True)
+class CachedResource:
+    id: int
+    name: str
+    address: str
+    phone: str
+    lat: float
+    lon: float
+    hours: str
+    description: str
+
+
+@dataclass(frozen=True)
+class CachedResourceList:
+    resources: list[CachedResource]
+
+
+def resource_list(n: int = 2000) -> CachedResourceList:
+    return CachedResourceList(resources=[
+        CachedResource(
+            id=i,
+            name=f"Community meal program {i}",
+            address=f"{100 + i} East Hastings St, Vancouver, BC",
+            phone=f"604-555-{i % 10000:04d}",
+            lat=49.2813 + (i % 97) * 1e-4,
+            lon=-123.0997 - (i % 89) * 1e-4,
+            hours="Mon-Fri 11:30-13:00",
+            description="Free hot lunch, no ID required. Vegetarian option available.",
+        )
+        for i in range(n)
+    ])
+
+
+def timed(fn: Callable, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "runs": runs,
+        "mean_us": statistics.fmean(samples) * 1e6,
+        "p50_us": samples[len(samples) // 2] * 1e6,
+        "p99_us": samples[int(len(samples) * 0.99) - 1] * 1e6,
+    }
+
+
+# Every table printed by `report`, in order, for `write_json`
+results: dict[str, dict[str, dict]] = {}
+
+
+def report(title: str, rows: dict[str, dict]):
+    results[title] = rows
+    print(title)
+    for name, row in rows.items():
+        cols = "  ".join(f"{k}={v:.1f}" if isinstance(v, float) else f"{k}={v}" for k, v in row.items())
+        print(f"  {name:<28} {cols}")
+
+
+def environment(**options) -> dict:
+    """Enough about the run to tell whether two result files are comparable."""
+    try:
+        version = metadata.version("street-ninja-common")
+    except metadata.PackageNotFoundError:
+        # Running from a checkout
+        pyproject = (Path(__file__).parent.parent / "pyproject.toml").read_text()
+        version = next((line.split('"')[1] for line in pyproject.splitlines() if line.startswith("version")), None)
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "version": version,
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "django": django.__version__,
+        "platform": platform.platform(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        **options,
+    }
+
+
+def write_json(path: str, **options):
+    """Write every reported table, plus `environment(**options)`, to `path`."""
+    with open(path, "w") as f:
+        json.dump({"environment": environment(**options), "results": results}, f, indent=2, default=str)
+        f.write("\n")
+
+
+def compare(path: str, metrics: tuple[str, ...] = ("_us", "_per_s", "_mb_s"), **options):
+    """
+    Print how this run's timing metrics changed against a `write_json` file,
+    warning when it was written with different `options`.
+    """
+    with open(path) as f:
+        baseline = json.load(f)
+    env = baseline["environment"]
+    print(f"Compared with {path} ({env.get('version')} {env.get('commit') or ''}, {env.get('created_at')})")
+    differing = [key for key in options if env.get(key) != options[key]]
+    if differing:
+        print(f"  Warning: not comparable, different {', '.join(f'{key} ({env.get(key)} vs {options[key]})' for key in differing)}")
+    for title, rows in results.items():
+        old_rows = baseline["results"].get(title, {})
+        lines = []
+        for name, row in rows.items():
+            old_row = old_rows.get(name, {})
+            for key, value in row.items():
+                old = old_row.get(key)
+                if not key.endswith(metrics) or not isinstance(value, (int, float)) or not old:
+                    continue
+                lines.append(f"  {name:<28} {key:<14} {old:>12.1f} -> {value:>12.1f}  {(value - old) / old:+7.1%}")
+        if lines:
+            print(title)
+            print("\n".join(lines))
@@ -0,0 +1,71 @@
+"""
+Per-call overhead of `client.get(pattern)` vs a precompiled `client.bind(pattern)`
+handle, for L1 hits, backend hits and writes, with and without key kwargs.
+
+    python -m benchmarks.bound_handles
+"""
+from dataclasses import dataclass
+from ._support import configure, BenchPattern, timed, report
+
+configure()
+
+from street_ninja_common.cache import (
+    BaseCacheAccessPattern, CacheClient, CacheClientDB, CacheCircuitBreaker, CacheStoreEnum, Seconds,
+)
+
+
+RUNS = 50_000
+ROWS = tuple({"id": i, "name": f"Shelter {i}"} for i in range(20))
+
+
+@dataclass
+class Flags:
+    beta: bool
+
+
+@dataclass(frozen=True)
+class FlagPattern(BaseCacheAccessPattern):
+
+    def key(self, **kwargs) -> str:
+        return f"{self._key_enum}:{kwargs['phone']}" if kwargs else str(self._key_enum)
+
+
+def main():
+    breaker = CacheCircuitBreaker()
+    client_db = CacheClientDB(breaker)
+    client = CacheClient(breaker)
+
+    def db_pattern(name: str, local_ttl: Seconds | None) -> BenchPattern:
+        return BenchPattern(
+            store=CacheStoreEnum.RESOURCES, ttl=Seconds.HOUR, _key_enum=name,
+            value_type=tuple, query=lambda: ROWS, local_ttl=local_ttl,
+        )
+
+    redis_only = db_pattern("shelters", None)
+    with_l1 = db_pattern("shelters-l1", Seconds.MINUTE)
+    flags = FlagPattern(store=CacheStoreEnum.SESSION, ttl=Seconds.HOUR, _key_enum="flags", value_type=Flags)
+    redis_handle, l1_handle, flags_handle = client_db.bind(redis_only), client_db.bind(with_l1), client.bind(flags)
+
+    client_db.get(redis_only)
+    client_db.get(redis_only, region="downtown")
+    client_db.get(with_l1)
+    client.set(Flags(beta=True), flags, phone="+16045550100")
+
+    report("CacheClientDB.get vs bound handle", {
+        "L1 hit, client": timed(lambda: client_db.get(with_l1), RUNS),
+        "L1 hit, handle": timed(lambda: l1_handle.get(), RUNS),
+        "backend hit, client": timed(lambda: client_db.get(redis_only), RUNS),
+        "backend hit, handle": timed(lambda: redis_handle.get(), RUNS),
+        "kwargs hit, client": timed(lambda: client_db.get(redis_only, region="downtown"), RUNS),
+        "kwargs hit, handle": timed(lambda: redis_handle.get(region="downtown"), RUNS),
+    })
+    report("CacheClient get/set vs bound handle", {
+        "get, client": timed(lambda: client.get(flags, phone="+16045550100"), RUNS),
+        "get, handle": timed(lambda: flags_handle.get(phone="+16045550100"), RUNS),
+        "set, client": timed(lambda: client.set(Flags(beta=True), flags, phone="+16045550100"), RUNS),
+        "set, handle": timed(lambda: flags_handle.set(Flags(beta=True), phone="+16045550100"), RUNS),
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Circuit breaker overhead on the healthy fast path (allow + success per cache
+call) under thread contention, and half-open probing after an outage.
+
+    python -m benchmarks.circuit_breaker
+"""
+from ._support import configure, report
+
+configure()
+
+import threading
+import time
+from datetime import timedelta
+from django.utils import timezone
+from street_ninja_common.cache import CacheCircuitBreaker, CacheStoreEnum, CircuitState
+
+
+CALLS_PER_THREAD = 100_000
+
+
+class LegacyCircuitBreaker:
+    """The previous global breaker: locks on every success, timezone-aware clock."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.consecutive_failures = 0
+        self.failure_threshold = 3
+        self.circuit_open = False
+        self.last_failure_time = None
+        self.retry_timeout = timedelta(seconds=30)
+
+    @property
+    def allow_request(self) -> bool:
+        if not self.circuit_open:
+            return True
+        if not self.last_failure_time:
+            return True
+        return timezone.now() - self.last_failure_time >= self.retry_timeout
+
+    def fail(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_failure_time = timezone.now()
+            if self.consecutive_failures >= self.failure_threshold:
+                self.circuit_open = True
+
+    def success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            if self.circuit_open:
+                self.consecutive_failures = 0
+                self.last_failure_time = None
+                self.circuit_open = False
+
+
+def contended(call, threads: int) -> dict:
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        barrier.wait()
+        for _ in range(CALLS_PER_THREAD):
+            call()
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {"threads": threads, "ns_per_call": elapsed / (threads * CALLS_PER_THREAD) * 1e9}
+
+
+def probes_after_outage(breaker: CacheCircuitBreaker, callers: int = 50) -> dict:
+    store = CacheStoreEnum.TESTS
+    breaker.configure(failure_threshold=3, retry_timeout=0.01, half_open_probes=2)
+    for _ in range(3):
+        breaker.fail(store)
+    time.sleep(0.02)
+    allowed = sum(breaker.allow(store) for _ in range(callers))
+    return {
+        "callers": callers,
+        "allowed_probes": allowed,
+        "state": breaker.state(store).value,
+        "session_store_allowed": breaker.allow(CacheStoreEnum.SESSION),
+    }
+
+
+def main():
+    legacy = LegacyCircuitBreaker()
+    breaker = CacheCircuitBreaker()
+    store = CacheStoreEnum.RESOURCES
+
+    def legacy_call():
+        if legacy.allow_request:
+            legacy.success()
+
+    def new_call():
+        if breaker.allow(store):
+            breaker.success(store)
+
+    rows = {}
+    for threads in (1, 8):
+        rows[f"legacy x{threads}"] = contended(legacy_call, threads)
+        rows[f"per-store x{threads}"] = contended(new_call, threads)
+    report("allow + success on a healthy store", rows)
+    report("Half-open probing after an outage", {"per-store": probes_after_outage(breaker)})
+    assert breaker.state(CacheStoreEnum.SESSION) is CircuitState.CLOSED
+
+
+if __name__ == "__main__":
+    main()
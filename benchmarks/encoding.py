@@ -0,0 +1,40 @@
+"""
+Bytes stored and encode/decode time per EncodingStrategy and compression for a
+realistic resource list. Strategies whose optional package isn't installed are
+skipped.
+
+    python -m benchmarks.encoding
+"""
+from ._support import configure, resource_list, timed, report
+
+configure()
+
+import logging
+from street_ninja_common.cache.encoders import DataEncoder
+from street_ninja_common.cache.enums import CompressionStrategy, EncodingStrategy
+from street_ninja_common.cache.exc import RedisClientException
+
+
+RUNS = 200
+
+
+def main():
+    # Unavailable optional codecs log an error when probed
+    logging.disable(logging.ERROR)
+    value = resource_list()
+    rows = {}
+    for strategy in EncodingStrategy:
+        for compression in (None, *CompressionStrategy):
+            name = f"{strategy.value}+{compression.value}" if compression else strategy.value
+            try:
+                data = DataEncoder.encode(value, strategy, compression=compression)
+            except RedisClientException:
+                continue
+            encode = timed(lambda: DataEncoder.encode(value, strategy, compression=compression), RUNS)
+            decode = timed(lambda: DataEncoder.decode(data, strategy), RUNS)
+            rows[name] = {"bytes": len(data), "encode_us": encode["p50_us"], "decode_us": decode["p50_us"]}
+    report(f"{len(value.resources)} resources per cached value (p50)", rows)
+
+
+if __name__ == "__main__":
+    main()
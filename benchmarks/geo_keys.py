@@ -0,0 +1,97 @@
+"""
+Hit rate of "resources near me" lookups keyed by raw coordinates vs geohash
+cells, for a synthetic distribution of SMS requests across Vancouver.
+
+Each DB query sleeps `DB_LATENCY` and returns the resources in the requested
+area. Geo patterns rank the cached candidates by exact distance in-process;
+the results are checked against a brute-force search over every resource.
+Results are exact only while the radius fits inside the neighbouring cells,
+which precision 7 (~150m cells) does not for a 500m radius.
+
+    python -m benchmarks.geo_keys
+"""
+from dataclasses import dataclass
+from ._support import configure, BenchPattern, vancouver_resources, vancouver_queries, report
+
+configure(latency=0.0003)
+
+import time
+from street_ninja_common.cache import CacheClientDB, CacheCircuitBreaker, CacheStoreEnum, GeoAccessPattern, Seconds
+from street_ninja_common.cache.geo import haversine_m
+
+
+QUERIES = 3000
+RADIUS_M = 500
+LIMIT = 5
+DB_LATENCY = 0.002
+RESOURCES = vancouver_resources(600)
+db_queries = 0
+
+
+def within_radius(lat: float, lon: float, radius: float = RADIUS_M) -> list:
+    global db_queries
+    db_queries += 1
+    time.sleep(DB_LATENCY)
+    return [r for r in RESOURCES if haversine_m(lat, lon, *r.location) <= radius]
+
+
+def within_bbox(bbox: tuple[float, float, float, float]) -> list:
+    global db_queries
+    db_queries += 1
+    time.sleep(DB_LATENCY)
+    south, west, north, east = bbox
+    return [r for r in RESOURCES if south <= r.location[0] <= north and west <= r.location[1] <= east]
+
+
+@dataclass(frozen=True)
+class RawCoordinatePattern(BenchPattern):
+
+    def query_params(self, *, lat: float, lon: float) -> dict:
+        return {"lat": lat, "lon": lon}
+
+
+def nearest(candidates: list, lat: float, lon: float) -> list[int]:
+    ranked = sorted((haversine_m(lat, lon, *r.location), r.id) for r in candidates)
+    return [rid for distance, rid in ranked if distance <= RADIUS_M][:LIMIT]
+
+
+def run(client: CacheClientDB, pattern, answer) -> dict:
+    global db_queries
+    db_queries = 0
+    mismatches = 0
+    started = time.perf_counter()
+    for lat, lon in vancouver_queries(QUERIES):
+        # SMS locations arrive as ~1m GPS fixes
+        lat, lon = round(lat, 5), round(lon, 5)
+        if answer(client.get(pattern, lat=lat, lon=lon), lat, lon) != nearest(RESOURCES, lat, lon):
+            mismatches += 1
+    elapsed = time.perf_counter() - started
+    return {
+        "hit_pct": 100 * (1 - db_queries / QUERIES),
+        "db_queries": db_queries,
+        "mean_ms": elapsed / QUERIES * 1e3,
+        "mismatches": mismatches,
+    }
+
+
+def main():
+    client = CacheClientDB(CacheCircuitBreaker())
+    raw = RawCoordinatePattern(
+        store=CacheStoreEnum.GEO, ttl=Seconds.HOUR, _key_enum="raw", value_type=list, query=within_radius,
+    )
+    rows = {"raw lat/lon": run(client, raw, nearest)}
+    for precision in (7, 6, 5):
+        pattern = GeoAccessPattern(
+            store=CacheStoreEnum.GEO, ttl=Seconds.HOUR, _key_enum=f"geo{precision}", value_type=list,
+            query=within_bbox, precision=precision,
+        )
+
+        def answer(candidates, lat, lon, pattern=pattern):
+            return [r.id for _, r in pattern.rank(candidates, lat, lon, limit=LIMIT, max_distance=RADIUS_M)]
+
+        rows[f"geohash precision {precision}"] = run(client, pattern, answer)
+    report(f"{QUERIES} nearby lookups ({RADIUS_M}m, top {LIMIT}) over {len(RESOURCES)} resources", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+L1 hit vs Redis hit vs miss latency for CacheClientDB, plus L1 counters.
+
+    python -m benchmarks.local_cache
+"""
+from ._support import configure, BenchPattern, timed, report
+
+configure(latency=0.0003)
+
+from street_ninja_common.cache import CacheClientDB, CacheCircuitBreaker, CacheStoreEnum, LocalCache, Seconds
+
+
+RUNS = 2000
+ROWS = tuple({"id": i, "name": f"Food program {i}", "lat": 49.28 + i * 1e-4, "lon": -123.12} for i in range(2000))
+
+
+def main():
+    local_cache = LocalCache()
+    local_cache.configure(max_entries=256)
+    client = CacheClientDB(CacheCircuitBreaker(), local_cache)
+    counter = iter(range(10**9))
+
+    def pattern(local_ttl: Seconds | None) -> BenchPattern:
+        return BenchPattern(
+            store=CacheStoreEnum.RESOURCES,
+            ttl=Seconds.HOUR,
+            _key_enum=f"food-{local_ttl}",
+            value_type=tuple,
+            query=lambda: ROWS,
+            local_ttl=local_ttl,
+        )
+
+    redis_only = pattern(None)
+    with_l1 = pattern(Seconds.MINUTE)
+    client.get(redis_only)
+    client.get(with_l1)
+    client.get(with_l1)
+
+    report("CacheClientDB.get, 2000-row resource list (0.3ms injected latency per round trip)", {
+        "L1 hit": timed(lambda: client.get(with_l1), RUNS),
+        "Redis hit": timed(lambda: client.get(redis_only), RUNS),
+        "miss": timed(lambda: client.get(redis_only, n=next(counter)), RUNS // 4),
+        "L1 churn (> max_entries)": timed(lambda: client.get(with_l1, n=next(counter) % 512), RUNS),
+    })
+    report("LocalCache counters", {"stats": local_cache.stats()})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Per-call logging overhead on the cache hot path.
+
+Compares eager f-string vs lazy %-style debug calls with the root logger at
+DEBUG (records built, then dropped by an INFO handler, as in `LOGGING`) and at
+INFO (as in `LOGGING_PRODUCTION`), a full CacheClient hit under both, and a
+synchronous FileHandler vs the queue-backed handler for warnings.
+
+    python -m benchmarks.logging_overhead
+"""
+from ._support import configure, BenchPattern, timed, report
+
+configure()
+
+import logging
+import os
+import tempfile
+from street_ninja_common.cache import CacheClientDB, CacheCircuitBreaker, CacheStoreEnum, Seconds
+from street_ninja_common.config.logging import QueueListenerHandler
+
+
+RUNS = 50_000
+logger = logging.getLogger("benchmarks.hot_path")
+store, key = CacheStoreEnum.RESOURCES, "resources:shelters"
+
+
+def eager():
+    logger.debug(f"Cache hit in store `{store.value}` with key `{key}`")
+
+
+def lazy():
+    logger.debug("Cache hit in store `%s` with key `%s`", store.value, key)
+
+
+def set_root(level: int, handler: logging.Handler):
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+def main():
+    sink = logging.StreamHandler(open(os.devnull, "w"))
+    sink.setLevel(logging.INFO)
+    client = CacheClientDB(CacheCircuitBreaker())
+    pattern = BenchPattern(store=store, ttl=Seconds.HOUR, _key_enum="log", value_type=list, query=lambda: [1, 2, 3])
+    client.get(pattern)
+
+    rows = {}
+    for name, level in (("root DEBUG", logging.DEBUG), ("root INFO", logging.INFO)):
+        set_root(level, sink)
+        rows[f"f-string debug, {name}"] = timed(eager, RUNS)
+        rows[f"%-style debug, {name}"] = timed(lazy, RUNS)
+        rows[f"CacheClientDB hit, {name}"] = timed(lambda: client.get(pattern), RUNS)
+    report("Debug logging cost per call", rows)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file_handler = logging.FileHandler(os.path.join(tmp, "sync.log"))
+        queue_handler = QueueListenerHandler(filename=os.path.join(tmp, "queued.log"), console_level=logging.CRITICAL)
+        rows = {}
+        for name, handler in (("FileHandler", file_handler), ("QueueListenerHandler", queue_handler)):
+            set_root(logging.INFO, handler)
+            rows[name] = timed(lambda: logger.warning("Cache circuit breaker open, bypassing cache"), RUNS // 10)
+        queue_handler.close()
+        file_handler.close()
+    report("Warning emitted from a request thread", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+One SMS flow's cache writes (session flags, a gate marker and a resource
+refresh) as separate blocking sets, as one `client.pipeline()` round trip,
+and queued on the write-behind queue, against an in-process Redis stand-in
+with a simulated network hop.
+
+    python -m benchmarks.pipelining
+"""
+from ._support import configure_redis, BenchPattern, timed, report
+
+LATENCY = 0.0005
+configure_redis(LATENCY)
+
+from dataclasses import dataclass
+from street_ninja_common.cache import (
+    BaseCacheAccessPattern, CacheClient, CacheClientDB, CacheCircuitBreaker, CacheStoreEnum, Seconds, WriteBehindQueue,
+)
+
+
+RUNS = 500
+ROWS = [{"id": i, "name": f"Shelter {i}"} for i in range(20)]
+
+
+@dataclass
+class Flags:
+    step: str
+
+
+@dataclass(frozen=True)
+class PhonePattern(BaseCacheAccessPattern):
+
+    def key(self, *, phone: str) -> str:
+        return f"{self._key_enum}:{phone}"
+
+
+def main():
+    breaker = CacheCircuitBreaker()
+    queue = WriteBehindQueue(max_size=100_000)
+    client = CacheClient(breaker, write_behind=queue)
+    client_db = CacheClientDB(breaker, write_behind=queue)
+    menu = PhonePattern(store=CacheStoreEnum.SESSION, ttl=Seconds.HOUR, _key_enum="menu", value_type=Flags)
+    gate = PhonePattern(store=CacheStoreEnum.SESSION, ttl=Seconds.MINUTE, _key_enum="gate", value_type=Flags)
+    shelters = BenchPattern(store=CacheStoreEnum.SESSION, ttl=Seconds.HOUR, _key_enum="shelters", value_type=list, query=lambda: ROWS)
+    deferred = [
+        PhonePattern(store=CacheStoreEnum.SESSION, ttl=Seconds.HOUR, _key_enum=f"{p._key_enum}-wb", value_type=Flags, write_behind=True)
+        for p in (menu, gate)
+    ]
+    phone = "+16045550100"
+
+    def sequential():
+        client.set(Flags("shelters"), menu, phone=phone)
+        client.set(Flags("seen"), gate, phone=phone)
+        client_db.set(ROWS, shelters)
+
+    def pipelined():
+        with client.pipeline() as pipeline:
+            pipeline.set(Flags("shelters"), menu, phone=phone)
+            pipeline.set(Flags("seen"), gate, phone=phone)
+        with client_db.pipeline() as pipeline:
+            pipeline.set(ROWS, shelters)
+
+    def mixed_pipeline():
+        # CacheClient and CacheClientDB encode differently, so each pipeline is
+        # per client; a single client can still mix patterns and reads
+        with client.pipeline() as pipeline:
+            pipeline.set(Flags("shelters"), menu, phone=phone)
+            pipeline.set(Flags("seen"), gate, phone=phone)
+            pipeline.get(menu, phone=phone)
+
+    def write_behind():
+        client.set(Flags("shelters"), deferred[0], phone=phone)
+        client.set(Flags("seen"), deferred[1], phone=phone)
+
+    rows = {
+        "3 sets, sequential": timed(sequential, RUNS),
+        "3 sets, 2 pipelines": timed(pipelined, RUNS),
+        "2 sets + get, 1 pipeline": timed(mixed_pipeline, RUNS),
+        "2 sets, write-behind": timed(write_behind, RUNS),
+    }
+    queue.flush()
+    rows["write-behind"] = {"dropped": queue.dropped, "failed": queue.failed}
+    report(f"SMS flow cache writes, {LATENCY * 1e6:.0f}us per round trip", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Rate limiter throughput against an in-process Redis stand-in with a simulated
+network hop: single checks, batched `check_many` and the local pre-check
+rejecting a flood from one phone number. fakeredis runs Lua far slower than
+Redis, so compare the rows with each other rather than with production numbers.
+
+    python -m benchmarks.rate_limit
+"""
+from ._support import configure_redis, timed, report
+
+LATENCY = 0.0002
+configure_redis(LATENCY)
+
+from street_ninja_common.cache import CacheCircuitBreaker, SlidingWindow, TokenBucket
+
+
+RUNS = 2_000
+BATCH = 50
+PHONES = [f"+1604555{i:04d}" for i in range(BATCH)]
+
+
+def per_check(row: dict, checks: int) -> dict:
+    return {**row, "checks_per_s": checks * 1e6 / row["mean_us"]}
+
+
+def main():
+    breaker = CacheCircuitBreaker()
+    rows = {}
+    for name, limiter, flood in (
+        ("token bucket", TokenBucket("bench-tb", breaker, capacity=10**9, rate=1.0, local_precheck=False),
+         TokenBucket("bench-tb-flood", breaker, capacity=5, rate=0.001)),
+        ("sliding window", SlidingWindow("bench-sw", breaker, limit=10**9, window=60, local_precheck=False),
+         SlidingWindow("bench-sw-flood", breaker, limit=5, window=3600)),
+    ):
+        rows[f"{name}, check"] = per_check(timed(lambda: limiter.check(PHONES[0]), RUNS), 1)
+        rows[f"{name}, check x{BATCH}"] = per_check(timed(lambda: [limiter.check(p) for p in PHONES], RUNS // BATCH), BATCH)
+        rows[f"{name}, check_many({BATCH})"] = per_check(timed(lambda: limiter.check_many(PHONES), RUNS // 10), BATCH)
+        flood.check_many([PHONES[0]] * 6)
+        rows[f"{name}, flood (pre-check)"] = per_check(timed(lambda: flood.check(PHONES[0]), RUNS), 1)
+    report(f"Rate limiter throughput, {LATENCY * 1e6:.0f}us per round trip", rows)
+
+
+if __name__ == "__main__":
+    main()
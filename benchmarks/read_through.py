@@ -0,0 +1,56 @@
+"""
+Round trips and latency per CacheClientDB miss, before and after single-round-trip
+read-through.
+
+    python -m benchmarks.read_through
+"""
+from ._support import configure, BenchPattern, faults, timed, report
+
+configure(latency=0.0005)
+
+from street_ninja_common.cache import CacheClientDB, CacheCircuitBreaker, CacheStoreEnum, Seconds
+
+
+RUNS = 500
+ROWS = [{"id": i, "name": f"Shelter {i}", "beds": i % 40} for i in range(500)]
+
+
+class LegacyCacheClientDB(CacheClientDB):
+    """The pre-change miss path: query, set, then read back what was just written."""
+
+    def get(self, access_pattern, **kwargs):
+        cached_data = self._get_from_cache(access_pattern, **kwargs)
+        if cached_data is None:
+            self._set_from_db(access_pattern, **kwargs)
+            cached_data = self._get_from_cache(access_pattern, **kwargs)
+        return cached_data
+
+
+def bench_miss(name: str, client: CacheClientDB, background_write: bool = False) -> dict:
+    counter = iter(range(10**9))
+    # A key space per run, so no run reads keys an earlier run wrote
+    pattern = BenchPattern(
+        store=CacheStoreEnum.TESTS,
+        ttl=Seconds.HOUR,
+        _key_enum=f"bench-{name}",
+        value_type=list,
+        query=lambda: ROWS,
+        background_write=background_write,
+    )
+    faults.round_trips = 0
+    row = timed(lambda: client.get(pattern, n=next(counter)), RUNS)
+    row["round_trips_per_miss"] = faults.round_trips / RUNS
+    return row
+
+
+def main():
+    breaker = CacheCircuitBreaker()
+    report("CacheClientDB miss (0.5ms injected latency per round trip)", {
+        "legacy set-then-get": bench_miss("legacy", LegacyCacheClientDB(breaker)),
+        "read-through": bench_miss("read-through", CacheClientDB(breaker)),
+        "read-through background": bench_miss("background", CacheClientDB(breaker), background_write=True),
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+What each worker pays to get a projected resource set: decoding it from the
+cache (the backend hit `CacheClientDB.get` does in every worker) vs mapping a
+host-local snapshot, plus reads through `SnapshotReader` and row access.
+
+    python -m benchmarks.snapshots
+"""
+from ._support import configure, BenchPattern, vancouver_resources, timed, report
+
+configure()
+
+import tempfile
+from street_ninja_common.cache import (
+    CacheClientDB, CacheCircuitBreaker, CacheStoreEnum, ResourceSnapshot, Seconds, SnapshotPublisher, SnapshotReader,
+)
+from street_ninja_common.cache.enums import EncodingStrategy
+
+
+def bench(size: int, directory: str) -> dict[str, dict]:
+    client = CacheClientDB(CacheCircuitBreaker())
+    resources = vancouver_resources(size)
+    pattern = BenchPattern(
+        store=CacheStoreEnum.RESOURCES, ttl=Seconds.HOUR, _key_enum=f"resources-{size}",
+        value_type=list, query=lambda: resources, projection=("id", "name", "location"),
+    )
+    rows = client.get(pattern)
+    payload = client._get(pattern)
+    path = SnapshotPublisher(client, directory).publish(pattern)
+    reader = SnapshotReader(client, directory)
+    snapshot = reader.get(pattern)
+    runs = 100 if size > 20_000 else 1000
+    return {
+        f"{size} decode from cache": timed(lambda: client._decode(payload, pattern, EncodingStrategy.PICKLE), runs),
+        f"{size} map snapshot": timed(lambda: ResourceSnapshot(path), runs),
+        f"{size} reader.get": timed(lambda: reader.get(pattern), runs * 10),
+        f"{size} row, rows": timed(lambda: rows[size // 2], runs * 10),
+        f"{size} row, snapshot": timed(lambda: snapshot[size // 2], runs * 10),
+        f"{size} locations, snapshot": timed(lambda: snapshot.column("location"), runs // 10),
+    }
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        rows = {}
+        for size in (1_000, 10_000, 100_000):
+            rows.update(bench(size, directory))
+        report("Projected resource set per worker: cache decode vs shared snapshot", rows)
+
+
+if __name__ == "__main__":
+    main()
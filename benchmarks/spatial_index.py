@@ -0,0 +1,75 @@
+"""
+Nearest-N and radius lookups over a cached resource set: linear haversine
+scan vs `SpatialIndex`, plus index build time and rebuilds through
+`SpatialIndexCache`.
+
+    python -m benchmarks.spatial_index
+"""
+from ._support import configure, BenchPattern, vancouver_resources, vancouver_queries, timed, report
+
+configure()
+
+import time
+from street_ninja_common.cache import CacheClientDB, CacheCircuitBreaker, CacheStoreEnum, Seconds, SpatialIndex, SpatialIndexCache
+from street_ninja_common.cache import spatial
+from street_ninja_common.cache.geo import haversine_m
+
+
+K = 5
+RADIUS_M = 800
+
+
+def linear_nearest(resources, lat: float, lon: float) -> list:
+    return sorted((haversine_m(lat, lon, *r.location), r.id) for r in resources)[:K]
+
+
+def linear_within(resources, lat: float, lon: float) -> list:
+    return sorted(
+        (d, r.id) for r in resources if (d := haversine_m(lat, lon, *r.location)) <= RADIUS_M
+    )
+
+
+def bench(size: int) -> dict[str, dict]:
+    resources = vancouver_resources(size)
+    queries = iter(vancouver_queries(10**6))
+    runs = 200 if size > 20_000 else 1000
+    started = time.perf_counter()
+    index = SpatialIndex.from_resources(resources)
+    build_ms = (time.perf_counter() - started) * 1e3
+    return {
+        f"{size} linear nearest": timed(lambda: linear_nearest(resources, *next(queries)), runs // 10),
+        f"{size} index nearest": timed(lambda: index.nearest(*next(queries), k=K), runs),
+        f"{size} linear within": timed(lambda: linear_within(resources, *next(queries)), runs // 10),
+        f"{size} index within": timed(lambda: index.within(*next(queries), radius=RADIUS_M), runs),
+        f"{size} index build": {"ms": build_ms},
+    }
+
+
+def main():
+    print(f"NumPy: {'yes' if spatial.np is not None else 'no (pure Python fallback)'}")
+    for size in (10_000, 50_000):
+        report(f"{size} resources, k={K}, radius={RADIUS_M}m", bench(size))
+
+    resources = tuple(vancouver_resources(10_000))
+    pattern = BenchPattern(
+        store=CacheStoreEnum.RESOURCES, ttl=Seconds.HOUR, _key_enum="indexed", value_type=tuple,
+        query=lambda: resources, local_ttl=Seconds.MINUTE,
+    )
+    client = CacheClientDB(CacheCircuitBreaker())
+    indexes = SpatialIndexCache(client, pattern)
+    queries = iter(vancouver_queries(10**6))
+    # The miss returns the DB result and the first cache hit the L1 copy: two builds
+    indexes.get()
+    indexes.get()
+    row = timed(lambda: indexes.get().nearest(*next(queries), k=K), 2000)
+    builds = indexes.builds
+    client.invalidate(pattern)
+    indexes.get()
+    report("SpatialIndexCache.get().nearest() over a cached 10000-row set", {
+        "steady state": {**row, "builds": builds},
+        "after invalidate": {"builds": indexes.builds},
+    })
+
+
+if __name__ == "__main__":
+    main()
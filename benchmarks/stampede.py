@@ -0,0 +1,85 @@
+"""
+Contention check for CacheClientDB stampede protection.
+
+Many threads miss the same key at once. Each simulated worker process gets its
+own single-flight group, so the in-process coalescing and the cross-process
+rebuild lock in the shared store are both exercised.
+
+    python -m benchmarks.stampede
+"""
+import threading
+import time
+from ._support import configure, BenchPattern, faults, report
+
+configure()
+
+from street_ninja_common.cache import CacheClientDB, CacheCircuitBreaker, CacheStoreEnum, Seconds
+from street_ninja_common.cache.single_flight import SingleFlight
+
+
+PROCESSES = 8
+THREADS_PER_PROCESS = 16
+QUERY_LATENCY = 0.2
+
+
+def run(lock_ttl: Seconds | None, coalesce: bool) -> dict:
+    queries = 0
+    queries_lock = threading.Lock()
+
+    def query():
+        nonlocal queries
+        with queries_lock:
+            queries += 1
+        time.sleep(QUERY_LATENCY)
+        return list(range(1000))
+
+    pattern = BenchPattern(
+        store=CacheStoreEnum.TESTS,
+        ttl=Seconds.HOUR,
+        _key_enum=f"stampede-{lock_ttl}-{coalesce}",
+        value_type=list,
+        query=query,
+        lock_ttl=lock_ttl,
+    )
+    clients = []
+    for _ in range(PROCESSES):
+        client = CacheClientDB(CacheCircuitBreaker())
+        client._single_flight = SingleFlight()
+        clients.append(client)
+
+    barrier = threading.Barrier(PROCESSES * THREADS_PER_PROCESS)
+    results = []
+
+    def worker(client: CacheClientDB):
+        barrier.wait()
+        if coalesce:
+            results.append(client.get(pattern))
+        else:
+            results.append(client._load(pattern))
+
+    faults.round_trips = 0
+    threads = [
+        threading.Thread(target=worker, args=(client,))
+        for client in clients for _ in range(THREADS_PER_PROCESS)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    assert len(results) == len(threads) and all(len(r) == 1000 for r in results)
+    return {"callers": len(threads), "db_queries": queries, "round_trips": faults.round_trips, "wall_ms": elapsed * 1e3}
+
+
+def main():
+    report(f"{PROCESSES} simulated processes x {THREADS_PER_PROCESS} threads missing one key", {
+        "unprotected": run(lock_ttl=None, coalesce=False),
+        "single-flight only": run(lock_ttl=None, coalesce=True),
+        "single-flight + lock": run(lock_ttl=Seconds.MINUTE_HALF, coalesce=True),
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Reproducible benchmark and load-test suite for the cache package, for
+comparing releases of `CacheClient`/`CacheClientDB`.
+
+Runs offline against LocMem or an in-process fakeredis server, with a fixed
+latency injected per round trip and a seeded RNG for injected failures and
+key choice. Covers:
+- hit, miss and read-through latency, and round trips per call
+- encode/decode time and throughput per EncodingStrategy and compression
+- circuit breaker behaviour through a full outage and a flaky store
+- throughput and tail latency with many threads sharing a client
+
+Write the results to JSON with `--json`, and print the change against an
+earlier file with `--compare`:
+
+    python -m benchmarks.suite --json before.json
+    git checkout <branch>
+    python -m benchmarks.suite --compare before.json
+    python -m benchmarks.suite --backend redis --latency 0.0005
+
+Absolute numbers depend on the machine (and fakeredis is far slower than
+Redis), so only compare files produced with the same environment and options.
+"""
+import argparse
+
+parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description=__doc__.split("\n\n")[0])
+parser.add_argument("--backend", choices=("locmem", "redis"), default="locmem")
+parser.add_argument("--latency", type=float, default=0.0002, help="seconds injected per round trip")
+parser.add_argument("--runs", type=int, default=500, help="samples per latency measurement")
+parser.add_argument("--seed", type=int, default=1)
+parser.add_argument("--only", nargs="+", choices=("reads", "encoding", "outage", "contention"))
+parser.add_argument("--json", metavar="PATH", help="write the results to PATH")
+parser.add_argument("--compare", metavar="PATH", help="print the change against an earlier --json file")
+args = parser.parse_args()
+
+from ._support import configure, configure_redis, BenchPattern, faults, resource_list, timed, report, write_json, compare
+
+if args.backend == "redis":
+    configure_redis(args.latency)
+else:
+    configure(args.latency)
+
+import logging
+import random
+import threading
+import time
+from street_ninja_common.cache import (
+    CacheClient, CacheClientDB, CacheCircuitBreaker, CacheStoreEnum, CircuitState, LocalCache, Seconds,
+)
+from street_ninja_common.cache.encoders import DataEncoder
+from street_ninja_common.cache.enums import CompressionStrategy, EncodingStrategy
+from street_ninja_common.cache.exc import RedisClientException
+
+
+STORE = CacheStoreEnum.TESTS
+VALUE = resource_list(200)
+
+
+def pattern(name: str, query=lambda: VALUE, **kwargs) -> BenchPattern:
+    return BenchPattern(store=STORE, ttl=Seconds.HOUR, _key_enum=f"suite-{name}", value_type=type(VALUE), query=query, **kwargs)
+
+
+def measure(fn, runs: int) -> dict:
+    faults.round_trips = 0
+    row = timed(fn, runs)
+    row["round_trips_per_call"] = faults.round_trips / runs
+    return row
+
+
+def bench_reads(runs: int):
+    breaker = CacheCircuitBreaker()
+    local_cache = LocalCache()
+    client = CacheClient(breaker)
+    client_db = CacheClientDB(breaker, local_cache)
+    counter = iter(range(10**9))
+
+    cached = pattern("cached")
+    client.set(VALUE, cached)
+    db_cached = pattern("db-cached")
+    client_db.get(db_cached)
+    local = pattern("local", local_ttl=Seconds.MINUTE)
+    client_db.get(local)
+    client_db.get(local)
+    read_through = pattern("read-through")
+
+    report(f"Reads, {len(VALUE.resources)}-resource value, {args.latency * 1e6:.0f}us per round trip", {
+        "CacheClient hit": measure(lambda: client.get(cached), runs),
+        "CacheClient miss": measure(lambda: client.get(cached, n=next(counter)), runs),
+        "CacheClient set": measure(lambda: client.set(VALUE, cached, n=next(counter)), runs),
+        "CacheClientDB L1 hit": measure(lambda: client_db.get(local), runs),
+        "CacheClientDB hit": measure(lambda: client_db.get(db_cached), runs),
+        "CacheClientDB read-through": measure(lambda: client_db.get(read_through, n=next(counter)), runs),
+    })
+
+
+def bench_encoding(runs: int):
+    # Unavailable optional codecs log an error when probed
+    logging.disable(logging.ERROR)
+    value = resource_list()
+    rows = {}
+    try:
+        for strategy in EncodingStrategy:
+            for compression in (None, *CompressionStrategy):
+                name = f"{strategy.value}+{compression.value}" if compression else strategy.value
+                try:
+                    data = DataEncoder.encode(value, strategy, compression=compression)
+                except RedisClientException:
+                    continue
+                encode = timed(lambda: DataEncoder.encode(value, strategy, compression=compression), runs)
+                decode = timed(lambda: DataEncoder.decode(data, strategy), runs)
+                rows[name] = {
+                    "bytes": len(data),
+                    "encode_p50_us": encode["p50_us"],
+                    "decode_p50_us": decode["p50_us"],
+                    "encode_mb_s": len(data) / encode["mean_us"],
+                    "decode_mb_s": len(data) / decode["mean_us"],
+                }
+    finally:
+        logging.disable(logging.NOTSET)
+    report(f"Encoding, {len(value.resources)} resources per value", rows)
+
+
+def bench_outage(duration: float = 0.5, retry_timeout: float = 0.05):
+    breaker = CacheCircuitBreaker()
+    breaker.configure(failure_threshold=3, retry_timeout=retry_timeout, half_open_probes=1)
+    transitions = {state: 0 for state in CircuitState}
+
+    def on_transition(store, state):
+        if store is STORE:
+            transitions[state] += 1
+
+    breaker.add_listener(on_transition)
+    queries = 0
+
+    def query():
+        nonlocal queries
+        queries += 1
+        return VALUE
+
+    client = CacheClientDB(breaker)
+    keys = random.Random(args.seed)
+    outage_pattern = pattern("outage", query=query)
+    for n in range(64):
+        client.get(outage_pattern, n=n)
+
+    def phase(calls_until) -> dict:
+        nonlocal queries
+        for state in transitions:
+            transitions[state] = 0
+        queries = 0
+        faults.round_trips = faults.failures = 0
+        errors = 0
+        samples = []
+        end = time.monotonic() + duration
+        while calls_until(end):
+            start = time.perf_counter()
+            try:
+                client.get(outage_pattern, n=keys.randrange(64))
+            except RedisClientException:
+                errors += 1
+            samples.append(time.perf_counter() - start)
+        samples.sort()
+        return {
+            "calls": len(samples),
+            "round_trips": faults.round_trips,
+            "failed_round_trips": faults.failures,
+            "errors_raised": errors,
+            "db_queries": queries,
+            "opened": transitions[CircuitState.OPEN],
+            "closed": transitions[CircuitState.CLOSED],
+            "p50_us": samples[len(samples) // 2] * 1e6,
+            "p99_us": samples[int(len(samples) * 0.99) - 1] * 1e6,
+            "state": breaker.state(STORE).value,
+        }
+
+    logging.disable(logging.CRITICAL)
+    try:
+        rows = {"healthy": phase(lambda end: time.monotonic() < end)}
+        with faults.outage():
+            rows["outage"] = phase(lambda end: time.monotonic() < end)
+        # Calls until the breaker has probed and closed again
+        started = time.monotonic()
+        rows["recovery"] = phase(lambda end: breaker.state(STORE) is not CircuitState.CLOSED)
+        rows["recovery"]["recovery_ms"] = (time.monotonic() - started) * 1e3
+        with faults.flaky(0.05):
+            rows["5% failures"] = phase(lambda end: time.monotonic() < end)
+        # Leave the store healthy for later sections
+        while breaker.state(STORE) is not CircuitState.CLOSED:
+            client.get(outage_pattern, n=0)
+    finally:
+        logging.disable(logging.NOTSET)
+    report(f"CacheClientDB.get through outages, {duration}s per phase, retry_timeout={retry_timeout}s", rows)
+
+
+def bench_contention(ops_per_thread: int):
+    breaker = CacheCircuitBreaker()
+    client = CacheClientDB(breaker)
+    hot = pattern("contention")
+    for n in range(64):
+        client.get(hot, n=n)
+
+    def run(threads: int) -> dict:
+        barrier = threading.Barrier(threads + 1)
+        samples: list[list[float]] = []
+        errors = 0
+
+        def worker(seed: int):
+            nonlocal errors
+            rng = random.Random(seed)
+            own = []
+            barrier.wait()
+            for _ in range(ops_per_thread):
+                n = rng.randrange(64)
+                start = time.perf_counter()
+                try:
+                    # 10% writes, the rest hits on a hot set of 64 keys
+                    if rng.random() < 0.1:
+                        client.set(VALUE, hot, n=n)
+                    else:
+                        client.get(hot, n=n)
+                except RedisClientException:
+                    errors += 1
+                own.append(time.perf_counter() - start)
+            samples.append(own)
+
+        pool = [threading.Thread(target=worker, args=(args.seed * 1000 + i,)) for i in range(threads)]
+        for thread in pool:
+            thread.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in pool:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        merged = sorted(sample for own in samples for sample in own)
+        return {
+            "threads": threads,
+            "ops": len(merged),
+            "errors": errors,
+            "ops_per_s": len(merged) / elapsed,
+            "p50_us": merged[len(merged) // 2] * 1e6,
+            "p99_us": merged[int(len(merged) * 0.99) - 1] * 1e6,
+        }
+
+    report(f"Contention, 90% get / 10% set on 64 hot keys, {ops_per_thread} ops per thread", {
+        f"x{threads}": run(threads) for threads in (1, 4, 16)
+    })
+
+
+def main():
+    random.seed(args.seed)
+    faults.seed(args.seed)
+    sections = args.only or ("reads", "encoding", "outage", "contention")
+    if "reads" in sections:
+        bench_reads(args.runs)
+    if "encoding" in sections:
+        bench_encoding(max(args.runs // 5, 10))
+    if "outage" in sections:
+        bench_outage()
+    if "contention" in sections:
+        bench_contention(args.runs)
+    options = {"backend": args.backend, "latency": args.latency, "runs": args.runs, "seed": args.seed}
+    if args.json:
+        write_json(args.json, sections=list(sections), **options)
+    if args.compare:
+        compare(args.compare, **options)
+
+
+if __name__ == "__main__":
+    main()
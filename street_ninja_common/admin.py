@@ -1,38 +0,0 @@
-from django.contrib import admin
-from django.contrib.gis import admin as gis_admin
-
-
-class BaseAdmin(admin.ModelAdmin):
-    """
-    Common admin functionality for non-GIS models.
-    """
-
-    def get_readonly_fields(self, request, obj=None):
-        return [field.name for field in self.model._meta.fields]
-
-    def has_add_permission(self, request):
-        return False
-
-    def has_change_permission(self, request, obj=None):
-        return False
-
-    def has_delete_permission(self, request, obj=None):
-        return False
-
-
-class BaseGISAdmin(gis_admin.GISModelAdmin):
-    """
-    Common admin functionality for GIS models.
-    """
-
-    def get_readonly_fields(self, request, obj=None):
-        return [field.name for field in self.model._meta.fields]
-
-    def has_add_permission(self, request):
-        return False
-
-    def has_change_permission(self, request, obj=None):
-        return False
-
-    def has_delete_permission(self, request, obj=None):
-        return False
@@ -0,0 +1,124 @@
+from functools import cache, cached_property
+from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Model
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that reads the row count of an unfiltered Postgres table from
+    the planner statistics (`pg_class.reltuples`) instead of running
+    `COUNT(*)`, which scans the whole table. Filtered querysets, other
+    databases and tables smaller than `estimate_threshold` rows are counted
+    exactly.
+    """
+    estimate_threshold = 10_000
+
+    @cached_property
+    def count(self) -> int:
+        estimate = self._estimate()
+        if estimate is not None and estimate >= self.estimate_threshold:
+            return estimate
+        return super().count
+
+    def _estimate(self) -> int | None:
+        query = getattr(self.object_list, "query", None)
+        if query is None or query.where or query.distinct or query.is_sliced:
+            return None
+        connection = connections[self.object_list.db]
+        if connection.vendor != "postgresql":
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [connection.ops.quote_name(query.model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+        # -1 until the table has been analyzed
+        return int(row[0]) if row and row[0] >= 0 else None
+
+
+@cache
+def _readonly_fields(model: type[Model]) -> tuple[str, ...]:
+    return tuple(field.name for field in model._meta.fields)
+
+
+class _ProjectedChangeList(ChangeList):
+    """Loads only the columns the changelist displays."""
+
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        fields = self.model_admin._changelist_fields(self.list_display)
+        if fields is not None:
+            return queryset.only(*fields)
+        deferred = self.model_admin._changelist_deferred(self.list_display)
+        return queryset.defer(*deferred) if deferred else queryset
+
+
+class PerformanceAdminMixin:
+    """
+    Keeps changelists over large tables cheap:
+    - estimated row counts on unfiltered changelists (`EstimatedCountPaginator`)
+      and no second `COUNT(*)` of the whole table when filtering
+    - foreign keys shown in `list_display` are joined (`list_select_related`)
+      instead of queried once per row
+    - when every column is a model field only those columns are loaded;
+      otherwise every column is, unless the admin opts in to deferring some
+      (`BaseGISAdmin.defer_geometry`)
+    - the readonly field list is built once per model
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_readonly_fields(self, request, obj=None):
+        return _readonly_fields(self.model)
+
+    def get_changelist(self, request, **kwargs):
+        return _ProjectedChangeList
+
+    def get_list_select_related(self, request):
+        if self.list_select_related is not False:
+            return self.list_select_related
+        relations = {
+            field.name for field in self.model._meta.concrete_fields
+            if field.many_to_one or field.one_to_one
+        }
+        return [name for name in self.list_display if name in relations]
+
+    def _changelist_fields(self, list_display) -> list[str] | None:
+        """Columns to load, or None when a column may read any field (callables, `__str__`)."""
+        columns = [name for name in list_display if name != "action_checkbox"]
+        concrete = {field.name for field in self.model._meta.concrete_fields}
+        if not all(name in concrete for name in columns):
+            return None
+        # Related objects joined by select_related are still loaded whole
+        return list(dict.fromkeys([self.model._meta.pk.name, *columns]))
+
+    def _changelist_deferred(self, list_display) -> list[str]:
+        """Columns to defer when `_changelist_fields` can't tell which are read."""
+        return []
+
+
+class BaseAdmin(PerformanceAdminMixin, admin.ModelAdmin):
+    """
+    Common admin functionality for non-GIS models.
+    """
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+def __getattr__(name: str):
+    # GeoDjango needs the GDAL library, so it's only imported for GIS admins
+    if name == "BaseGISAdmin":
+        from .gis import BaseGISAdmin
+        return BaseGISAdmin
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
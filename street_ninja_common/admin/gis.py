@@ -0,0 +1,31 @@
+from django.contrib.gis import admin as gis_admin
+from django.contrib.gis.db.models import GeometryField
+from . import PerformanceAdminMixin
+
+
+class BaseGISAdmin(PerformanceAdminMixin, gis_admin.GISModelAdmin):
+    """
+    Common admin functionality for GIS models.
+
+    Set `defer_geometry = True` to also skip loading undisplayed geometries
+    when `list_display` has callables or `__str__`; only do so when none of
+    them reads a geometry, or each row queries it separately.
+    """
+    defer_geometry = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def _changelist_deferred(self, list_display) -> list[str]:
+        if not self.defer_geometry:
+            return []
+        return [
+            field.name for field in self.model._meta.concrete_fields
+            if isinstance(field, GeometryField) and field.name not in list_display
+        ]
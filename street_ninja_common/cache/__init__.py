@@ -1,19 +1,74 @@
-from .access_patterns import BaseCacheAccessPattern, AccessPatternDB
+from .access_patterns import BaseCacheAccessPattern, AccessPatternDB, GeoAccessPattern
 from .circuit_breaker import CacheCircuitBreaker
 from .clients.client import CacheClient
 from .clients.client_db import CacheClientDB
-from .enums import CacheKey, Seconds, CacheStoreEnum
-from .exc import RedisClientException
+from .clients.client_async import AsyncCacheClient, AsyncCacheClientDB
+from .clients.client_session import SessionCacheClient
+from .clients.bound import BoundAccessPattern, BoundAccessPatternDB
+from .clients.pipeline import CachePipeline, PipelineResult
+from .enums import CacheKey, Seconds, CacheStoreEnum, CircuitState
+from .exc import RedisClientException, NoSessionFound
+from .invalidation import InvalidationBus, RedisPubSubTransport, LocalPubSubTransport
+from .local_cache import LocalCache
+from .metrics import MetricsSink, NullMetrics, InMemoryMetrics, PrometheusExporter
+from .projection import ProjectedRows
+from .rate_limit import RateLimiter, RateLimitResult, TokenBucket, SlidingWindow
+from .snapshot import ResourceSnapshot, SnapshotPublisher, SnapshotReader
+from .signals import write_through, invalidate_tags_on_change
+from .spatial import SpatialIndex, SpatialIndexCache
+from .tags import TagIndex, RedisTagIndex, LocalTagIndex
+from .write_behind import WriteBehindQueue, write_behind_queue
+from .warmup import WarmupRegistry, WarmupRunner, WarmupResult, warmup_registry, warm_cache
 
 
 __all__ = [
     "CacheStoreEnum",
     "BaseCacheAccessPattern",
     "AccessPatternDB",
+    "GeoAccessPattern",
     "CacheClient",
     "CacheClientDB",
+    "AsyncCacheClient",
+    "AsyncCacheClientDB",
+    "SessionCacheClient",
+    "BoundAccessPattern",
+    "BoundAccessPatternDB",
+    "CachePipeline",
+    "PipelineResult",
+    "WriteBehindQueue",
+    "write_behind_queue",
     "CacheKey",
     "Seconds",
     "RedisClientException",
-    "CacheCircuitBreaker"
+    "NoSessionFound",
+    "CacheCircuitBreaker",
+    "CircuitState",
+    "LocalCache",
+    "InvalidationBus",
+    "RedisPubSubTransport",
+    "LocalPubSubTransport",
+    "ProjectedRows",
+    "ResourceSnapshot",
+    "SnapshotPublisher",
+    "SnapshotReader",
+    "SpatialIndex",
+    "SpatialIndexCache",
+    "TagIndex",
+    "RedisTagIndex",
+    "LocalTagIndex",
+    "RateLimiter",
+    "RateLimitResult",
+    "TokenBucket",
+    "SlidingWindow",
+    "write_through",
+    "invalidate_tags_on_change",
+    "WarmupRegistry",
+    "WarmupRunner",
+    "WarmupResult",
+    "warmup_registry",
+    "warm_cache",
+    "MetricsSink",
+    "NullMetrics",
+    "InMemoryMetrics",
+    "PrometheusExporter",
 ]
\ No newline at end of file
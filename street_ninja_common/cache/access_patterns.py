@@ -1,7 +1,21 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
-from typing import Any, Callable, Type
-from .enums import CacheStoreEnum, Seconds, CacheKey
+from dataclasses import dataclass, field, is_dataclass
+from typing import Any, Callable, Iterable, Type
+from .enums import CacheStoreEnum, Seconds, CacheKey, EncodingStrategy, CompressionStrategy
+from .exc import InvalidAccessPattern
+from .geo import BBox, geohash, geohash_bbox, expand_bbox, haversine_m, coordinates
+from .projection import ProjectedRows
+
+
+_IMMUTABLE_TYPES = (str, bytes, int, float, bool, tuple, frozenset, ProjectedRows)
+
+
+def _is_immutable(value_type: Any) -> bool:
+    if not isinstance(value_type, type):
+        return False
+    if is_dataclass(value_type):
+        return value_type.__dataclass_params__.frozen
+    return issubclass(value_type, _IMMUTABLE_TYPES)
 
 
 @dataclass(frozen=True)
@@ -12,6 +26,29 @@ class BaseCacheAccessPattern(ABC):
     _key_enum: CacheKey
     value_type: Type[Any]
     version: int = field(default=1, init=False)
+    # Opt in to the in-process L1 tier. Decoded values are kept for this long,
+    # capped at `ttl`. Every L1 hit returns the same object, so `value_type`
+    # must be immutable: a tuple, frozen dataclass or `ProjectedRows`.
+    local_ttl: Seconds | None = field(default=None, kw_only=True)
+    # Codec used by CacheClient (defaults to JSON); CacheClientDB always pickles.
+    # Payloads of at least `compression_threshold` bytes are compressed when
+    # `compression` is set.
+    encoding_strategy: EncodingStrategy | None = field(default=None, kw_only=True)
+    compression: CompressionStrategy | None = field(default=None, kw_only=True)
+    compression_threshold: int = field(default=1024, kw_only=True)
+    # Queue `set`s on the client's write-behind queue and return immediately;
+    # for values whose loss or brief delay is harmless.
+    write_behind: bool = field(default=False, kw_only=True)
+
+    def __post_init__(self):
+        if self.local_ttl is not None and not self._immutable_values():
+            raise InvalidAccessPattern(
+                f"{self.__class__.__name__} local_ttl needs an immutable value_type (tuple, frozen dataclass, "
+                f"ProjectedRows), got `{self.value_type}`: L1 hits share one object between callers"
+            )
+
+    def _immutable_values(self) -> bool:
+        return _is_immutable(self.value_type)
 
     @abstractmethod
     def key(self, **kwargs) -> str:
@@ -22,4 +59,131 @@ class BaseCacheAccessPattern(ABC):
 class AccessPatternDB(BaseCacheAccessPattern):
 
     query: Callable
-    params: dict[str, Any] = field(default_factory=dict)
\ No newline at end of file
+    params: dict[str, Any] = field(default_factory=dict)
+    # Write the read-through result to cache on a background thread instead of
+    # blocking the caller on the cache write after a miss.
+    background_write: bool = field(default=False, kw_only=True)
+    # Cross-process stampede lock. When `lock_ttl` is set, only the worker that
+    # acquires the lock rebuilds a missing key; the others wait up to
+    # `lock_timeout` seconds for the value before querying the DB themselves.
+    lock_ttl: Seconds | None = field(default=None, kw_only=True)
+    lock_timeout: float = field(default=5.0, kw_only=True)
+    # Stale-while-revalidate. Past `soft_ttl` the cached value is still returned
+    # but one background refresh is started. `xfetch_beta` enables XFetch-style
+    # probabilistic early refresh before that point (1.0 is the usual value).
+    soft_ttl: Seconds | None = field(default=None, kw_only=True)
+    xfetch_beta: float | None = field(default=None, kw_only=True)
+    # Cache only these fields of each row as compact tuples (point geometries as
+    # lat/lon floats) and return read-only `ProjectedRows` instead of model instances.
+    projection: tuple[str, ...] | None = field(default=None, kw_only=True)
+    # Every key written for this pattern is recorded under these tags so that
+    # `CacheClientDB.invalidate_tag()` can drop them all at once.
+    tags: tuple[str, ...] = field(default=(), kw_only=True)
+    # Cache empty results (`None` or an empty collection) for this long instead
+    # of querying the DB again on every request for keys with no data.
+    negative_ttl: Seconds | None = field(default=None, kw_only=True)
+    # Cancel DB fallbacks that take longer than this many seconds (PostgreSQL
+    # `statement_timeout`, scoped to the query), raising instead of holding the worker.
+    query_timeout: float | None = field(default=None, kw_only=True)
+
+    def __post_init__(self):
+        super().__post_init__()
+        if self.soft_ttl is not None and self.soft_ttl.value >= self.ttl.value:
+            raise InvalidAccessPattern(
+                f"{self.__class__.__name__} soft_ttl `{self.soft_ttl}` must be shorter than ttl `{self.ttl}`"
+            )
+
+    def _immutable_values(self) -> bool:
+        # Projected patterns always return ProjectedRows
+        return self.projection is not None or super()._immutable_values()
+
+    @property
+    def refreshes_early(self) -> bool:
+        return self.soft_ttl is not None or self.xfetch_beta is not None
+
+    def query_params(self, **kwargs) -> dict[str, Any]:
+        """
+        Keyword arguments for `query`, given the kwargs the key was built from.
+        Defaults to the static `params`; override to query per key.
+        """
+        return self.params
+
+
+@dataclass(frozen=True)
+class GeoAccessPattern(AccessPatternDB):
+    """
+    Caches "resources near a point" per geohash cell instead of per coordinate.
+
+    `lat`/`lon` passed to the client are quantized to a geohash cell of
+    `precision` characters, which becomes the cache key, so every request from
+    the same cell shares one cached candidate set. `query` is called with
+    `bbox=(south, west, north, east)` covering the cell and, with
+    `include_neighbours`, the 8 cells around it, so any point in the cell has
+    every candidate within one cell size of it. Use `rank()` on the cached
+    candidates to order and filter them by exact distance from the caller.
+
+    Precision 6 (~1.2km x 0.6km) suits walking distance, 5 (~4.9km x 4.9km)
+    transit distance.
+
+    Usage:
+        NEARBY_FOOD = GeoAccessPattern(..., query=food_in_bbox, precision=6)
+        candidates = client.get(NEARBY_FOOD, lat=lat, lon=lon)
+        nearest = NEARBY_FOOD.rank(candidates, lat, lon, limit=5)
+    """
+    precision: int = field(default=6, kw_only=True)
+    include_neighbours: bool = field(default=True, kw_only=True)
+    # Attribute holding each candidate's location, a GEOS point or (lat, lon)
+    # tuple. ProjectedRows rename `a__b` fields to `a_b`.
+    location_field: str = field(default="location", kw_only=True)
+
+    def __post_init__(self):
+        super().__post_init__()
+        if not 1 <= self.precision <= 12:
+            raise InvalidAccessPattern(f"{self.__class__.__name__} precision `{self.precision}` must be between 1 and 12")
+
+    def key(self, *, lat: float, lon: float) -> str:
+        return f"{getattr(self._key_enum, 'value', self._key_enum)}:{self.cell(lat, lon)}"
+
+    def cell(self, lat: float, lon: float) -> str:
+        return geohash(lat, lon, self.precision)
+
+    def bbox(self, lat: float, lon: float) -> BBox:
+        bbox = geohash_bbox(self.cell(lat, lon))
+        return expand_bbox(bbox) if self.include_neighbours else bbox
+
+    def query_params(self, *, lat: float, lon: float) -> dict[str, Any]:
+        return {**self.params, "bbox": self.bbox(lat, lon)}
+
+    def affected_kwargs(self, lat: float, lon: float) -> list[dict[str, float]]:
+        """Key kwargs of every cell whose cached candidates include a resource at (lat, lon)."""
+        south, west, north, east = geohash_bbox(self.cell(lat, lon))
+        lat, lon = (south + north) / 2, (west + east) / 2
+        if not self.include_neighbours:
+            return [{"lat": lat, "lon": lon}]
+        height, width = north - south, east - west
+        return [
+            {"lat": lat + i * height, "lon": lon + j * width}
+            for i in (-1, 0, 1) for j in (-1, 0, 1)
+            if -90 < lat + i * height < 90 and -180 < lon + j * width < 180
+        ]
+
+    def rank(
+            self,
+            candidates: Iterable[Any],
+            lat: float,
+            lon: float,
+            limit: int | None = None,
+            max_distance: float | None = None,
+    ) -> list[tuple[float, Any]]:
+        """`(distance_m, candidate)` pairs nearest first, optionally capped by count and distance in metres."""
+        attr = self.location_field.replace("__", "_")
+        ranked = []
+        for candidate in candidates:
+            location = getattr(candidate, attr)
+            if location is None:
+                continue
+            distance = haversine_m(lat, lon, *coordinates(location))
+            if max_distance is None or distance <= max_distance:
+                ranked.append((distance, candidate))
+        ranked.sort(key=lambda pair: pair[0])
+        return ranked if limit is None else ranked[:limit]
@@ -1,93 +1,251 @@
+import logging
 import threading
-from datetime import timedelta
-from django.utils import timezone
-from .enums import Seconds
+import time
+from typing import Callable
+from .enums import CacheStoreEnum, CircuitState, Seconds
+
+# Enum attribute access is comparatively slow; the hot paths compare against these
+_CLOSED = CircuitState.CLOSED
+_OPEN = CircuitState.OPEN
+_HALF_OPEN = CircuitState.HALF_OPEN
+
+logger = logging.getLogger(__name__)
+
+
+class _StoreCircuit:
+    """Breaker state for a single cache store."""
+
+    __slots__ = (
+        "_lock", "_store", "_notify", "state", "consecutive_failures", "opened_at",
+        "probes_in_flight", "probe_successes", "probed_at", "half_open_period", "_held",
+        "failure_threshold", "retry_timeout", "half_open_probes",
+    )
+
+    def __init__(
+            self,
+            store: CacheStoreEnum,
+            notify: Callable[[CacheStoreEnum, CircuitState], None],
+            failure_threshold: int,
+            retry_timeout: float,
+            half_open_probes: int,
+    ):
+        self._lock = threading.Lock()
+        self._store = store
+        self._notify = notify
+        self.state = _CLOSED  # Start closed (normal operation)
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probes_in_flight = 0
+        self.probe_successes = 0
+        self.probed_at = 0.0
+        # Probes granted to each thread in the current half-open period, so a
+        # probe's result is counted once however many operations report it
+        self.half_open_period = 0
+        self._held = threading.local()
+        self.failure_threshold = failure_threshold
+        self.retry_timeout = retry_timeout
+        self.half_open_probes = half_open_probes
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state is _OPEN:
+                if time.monotonic() - self.opened_at < self.retry_timeout:
+                    return False
+                self.state = _HALF_OPEN
+                self.half_open_period += 1
+                self.probes_in_flight = 0
+                self.probe_successes = 0
+                self._notify(self._store, _HALF_OPEN)
+            if self.state is _HALF_OPEN:
+                if self.probes_in_flight >= self.half_open_probes:
+                    # A probe whose caller raised before reporting back never
+                    # frees its slot; once the slots are stale, re-open so the
+                    # store is probed again after `retry_timeout`
+                    if time.monotonic() - self.probed_at >= self.retry_timeout:
+                        self._open()
+                    return False
+                self.probes_in_flight += 1
+                self.probed_at = time.monotonic()
+                held = self._held
+                if getattr(held, "period", None) != self.half_open_period:
+                    held.period, held.probes = self.half_open_period, 0
+                held.probes += 1
+            return True
+
+    def success(self):
+        with self._lock:
+            if self.state is _HALF_OPEN:
+                # Only the first result reported for a granted probe counts; a
+                # read-through's write-back after its read, or a write that
+                # never asked `allow()` (write-behind, background writes), doesn't
+                if not self._release_probe():
+                    return
+                self.probes_in_flight = max(self.probes_in_flight - 1, 0)
+                self.probe_successes += 1
+                if self.probe_successes >= self.half_open_probes:
+                    self._close()
+            elif self.state is _CLOSED:
+                self.consecutive_failures = 0
+
+    def fail(self):
+        with self._lock:
+            if self.state is _HALF_OPEN:
+                self._open()
+            elif self.state is _CLOSED:
+                self.consecutive_failures += 1
+                if self.consecutive_failures >= self.failure_threshold:
+                    self._open()
+
+    def _release_probe(self) -> bool:
+        held = self._held
+        if getattr(held, "period", None) != self.half_open_period or not held.probes:
+            return False
+        held.probes -= 1
+        return True
+
+    def _open(self):
+        """Open the circuit (block cache operations)"""
+        self.state = _OPEN
+        self.opened_at = time.monotonic()
+        self.probes_in_flight = 0
+        self.probe_successes = 0
+        self._notify(self._store, _OPEN)
+
+    def _close(self):
+        """Close the circuit (allow cache operations)"""
+        self.state = _CLOSED
+        self.consecutive_failures = 0
+        self.probes_in_flight = 0
+        self.probe_successes = 0
+        self._notify(self._store, _CLOSED)
 
 
 class CacheCircuitBreaker:
     """
         Circuit breaker for cache operations that prevents cascading failures.
-        
+
         When cache (Redis) is down or experiencing issues, this circuit breaker:
         1. Detects failures through consecutive error tracking
         2. "Opens" the circuit to block cache operations and prevent timeouts
-        3. Allows periodic test requests to check if cache has recovered
-        4. "Closes" the circuit when cache is healthy again
-        
+        3. After `retry_timeout` seconds goes "half-open" and lets up to
+           `half_open_probes` concurrent test requests through; probes that
+           never report back are given up on after another `retry_timeout`
+        4. "Closes" the circuit once that many probes succeed, or re-opens it on
+           the first failure
+
+        A probe is counted once, by the first success reported from the thread
+        `allow()` granted it to; other successes while half-open are ignored.
+
+        State is kept separately per `CacheStoreEnum`, so a sick SESSION Redis
+        doesn't block RESOURCES. Timing uses `time.monotonic()`, and a success
+        while the circuit is closed and healthy takes no lock.
+
         This is implemented as a singleton because cache health is service-wide state.
         All cache clients within a single service should share the same circuit breaker
         to ensure consistent behavior - if cache is down for one operation, it's down
         for all operations in that service.
-        
+
         Each microservice gets its own singleton instance (isolated between services),
         but all cache operations within a service share the same health tracking.
-        
+
         Usage:
             circuit_breaker = CacheCircuitBreaker()  # Always returns same instance
-            if circuit_breaker.should_allow_request():
+            circuit_breaker.configure(failure_threshold=5, half_open_probes=2)
+            if circuit_breaker.allow(CacheStoreEnum.RESOURCES):
                 try:
                     result = cache.get(key)
-                    circuit_breaker.record_success()
+                    circuit_breaker.success(CacheStoreEnum.RESOURCES)
                 except Exception:
-                    circuit_breaker.record_failure()
+                    circuit_breaker.fail(CacheStoreEnum.RESOURCES)
                     # Fall back to DB or return None
     """
     _instance = None
-    
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
-    
+
     def __init__(self):
         # Prevent re-initialization of singleton
         if hasattr(self, '_initialized'):
             return
-        
+
         self._lock = threading.Lock()
-        self.consecutive_failures = 0
+        # Keyed by id() of the enum member: members are singletons and id() avoids Enum.__hash__
+        self._circuits: dict[int, _StoreCircuit] = {}
+        self._listeners: list[Callable[[CacheStoreEnum, CircuitState], None]] = []
         self.failure_threshold = 3
-        self.circuit_open = False  # Start closed (normal operation)
-        self.last_failure_time = None
-        self.retry_timeout = timedelta(seconds=Seconds.MINUTE_HALF.value)  # 30 seconds
+        self.retry_timeout = float(Seconds.MINUTE_HALF.value)  # 30 seconds
+        self.half_open_probes = 1
         self._initialized = True
-    
+
+    def configure(
+            self,
+            failure_threshold: int | None = None,
+            retry_timeout: float | None = None,
+            half_open_probes: int | None = None,
+    ):
+        """Set thresholds for every store, including stores already in use."""
+        with self._lock:
+            if failure_threshold is not None:
+                self.failure_threshold = failure_threshold
+            if retry_timeout is not None:
+                self.retry_timeout = retry_timeout
+            if half_open_probes is not None:
+                self.half_open_probes = half_open_probes
+            for circuit in self._circuits.values():
+                circuit.failure_threshold = self.failure_threshold
+                circuit.retry_timeout = self.retry_timeout
+                circuit.half_open_probes = self.half_open_probes
+
+    def add_listener(self, listener: Callable[[CacheStoreEnum, CircuitState], None]):
+        """
+        Call `listener(store, state)` on every state transition. Listeners run
+        while the store's lock is held, so they must be quick and must not call
+        back into the breaker.
+        """
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
     @property
     def allow_request(self) -> bool:
-        if not self.circuit_open:
-            return True
-        return self._should_attempt_retry()
-    
-    def fail(self):
+        return self.allow(CacheStoreEnum.DEFAULT)
+
+    def allow(self, store: CacheStoreEnum = CacheStoreEnum.DEFAULT) -> bool:
+        circuit = self._circuits.get(id(store)) or self._circuit(store)
+        # Lock-free fast path while closed
+        return circuit.state is _CLOSED or circuit.allow()
+
+    def fail(self, store: CacheStoreEnum = CacheStoreEnum.DEFAULT):
         """Record a cache operation failure"""
-        with self._lock:
-            self.consecutive_failures += 1
-            self.last_failure_time = timezone.now()
-            
-            if self.consecutive_failures >= self.failure_threshold:
-                self._open_circuit()
-    
-    def success(self):
+        (self._circuits.get(id(store)) or self._circuit(store)).fail()
+
+    def success(self, store: CacheStoreEnum = CacheStoreEnum.DEFAULT):
         """Record a successful cache operation"""
+        circuit = self._circuits.get(id(store)) or self._circuit(store)
+        # Lock-free fast path: nothing to reset while closed and healthy
+        if circuit.state is _CLOSED and not circuit.consecutive_failures:
+            return
+        circuit.success()
+
+    def state(self, store: CacheStoreEnum = CacheStoreEnum.DEFAULT) -> CircuitState:
+        return self._circuit(store).state
+
+    def _circuit(self, store: CacheStoreEnum) -> _StoreCircuit:
         with self._lock:
-            self.consecutive_failures = 0
-            if self.circuit_open:
-                self._close_circuit()
-    
-    def _open_circuit(self):
-        """Open the circuit (block cache operations)"""
-        self.circuit_open = True
-    
-    def _close_circuit(self):
-        """Close the circuit (allow cache operations)"""
-        self.consecutive_failures = 0
-        self.last_failure_time = None
-        self.circuit_open = False
-    
-    def _should_attempt_retry(self) -> bool:
-        """Check if enough time has passed to attempt a retry"""
-        if not self.last_failure_time:
-            return True
-        
-        elapsed = timezone.now() - self.last_failure_time
-        return elapsed >= self.retry_timeout
\ No newline at end of file
+            circuit = self._circuits.get(id(store))
+            if circuit is None:
+                circuit = _StoreCircuit(
+                    store, self._notify, self.failure_threshold, self.retry_timeout, self.half_open_probes
+                )
+                self._circuits[id(store)] = circuit
+        return circuit
+
+    def _notify(self, store: CacheStoreEnum, state: CircuitState):
+        for listener in self._listeners:
+            try:
+                listener(store, state)
+            except Exception:
+                logger.error("Circuit breaker listener failed for store `%s`", store.value, exc_info=True)
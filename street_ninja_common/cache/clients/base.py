@@ -1,11 +1,19 @@
 from abc import ABC
 import logging
+from time import perf_counter
+from asgiref.sync import sync_to_async
 from django.core.cache import caches
 from django.core.cache.backends.base import BaseCache
-from typing import cast, TypeVar, Generic
+from typing import cast, Hashable, TypeVar, Generic
 from ..circuit_breaker import CacheCircuitBreaker
+from ..invalidation import InvalidationBus
+from ..local_cache import LocalCache
+from ..metrics import MetricsSink, NullMetrics
+from ..tags import TagIndex, RedisTagIndex
+from ..write_behind import WriteBehindQueue, write_behind_queue
+from .pipeline import CachePipeline
 from ..encoders import DataEncoder
-from ..enums import EncodingStrategy
+from ..enums import EncodingStrategy, MetricEvent
 from ..exc import RedisClientException, InvalidAccessPattern
 from ..access_patterns import BaseCacheAccessPattern
 
@@ -16,13 +24,116 @@ T = TypeVar("T")
 
 class BaseCacheClient(ABC, Generic[T]):
 
-    def __init__(self, circuit_breaker: CacheCircuitBreaker):
+    # Payloads at least this large are encoded/decoded on a worker thread by the
+    # async helpers instead of on the event loop.
+    offload_threshold = 64 * 1024
+
+    def __init__(
+            self,
+            circuit_breaker: CacheCircuitBreaker,
+            local_cache: LocalCache | None = None,
+            invalidation_bus: InvalidationBus | None = None,
+            metrics: MetricsSink | None = None,
+            tag_index: TagIndex | None = None,
+            write_behind: WriteBehindQueue | None = None,
+    ):
         self.circuit_breaker = circuit_breaker
+        self.local_cache = local_cache or LocalCache()
+        self.invalidation_bus = invalidation_bus
+        self.metrics = metrics or NullMetrics()
+        self.tag_index = tag_index or RedisTagIndex()
+        self.write_behind = write_behind if write_behind is not None else write_behind_queue
+
+    def invalidate(self, access_pattern: BaseCacheAccessPattern, **kwargs):
+        """
+        Delete a key from its store and from the L1 tier of this process, then
+        broadcast the invalidation so other processes drop their L1 copy too.
+        """
+        store = self._store(access_pattern)
+        key = self._key(access_pattern, **kwargs)
+        try:
+            store.delete(key=key, version=access_pattern.version)
+        except Exception as e:
+            self.circuit_breaker.fail(access_pattern.store)
+            msg = f"Unexpected error invalidating key `{key}` in cache store `{access_pattern.store.value}`"
+            logger.error(msg, exc_info=True)
+            raise RedisClientException(msg) from e
+        else:
+            self.circuit_breaker.success(access_pattern.store)
+        finally:
+            self.local_cache.delete(self._local_key(access_pattern, **kwargs))
+
+        if self.invalidation_bus is not None:
+            self.invalidation_bus.publish(access_pattern, key)
+
+    def pipeline(self) -> CachePipeline[T]:
+        """
+        Buffer gets and sets, across access patterns, and send them in one
+        round trip per store when the `with` block exits.
+        """
+        return CachePipeline(self)
+
+    def _defer(self, value: T, access_pattern: BaseCacheAccessPattern, **kwargs):
+        # Resolve the key now so an invalid pattern still fails the caller
+        self._key(access_pattern, **kwargs)
+        self.write_behind.put(self, value, access_pattern, **kwargs)
+
+    def _pipeline_encode(self, value: T, access_pattern: BaseCacheAccessPattern) -> tuple[bytes, int]:
+        """Payload and timeout of a pipelined `set`, as `set` would write them."""
+        return self._encode(value, self._strategy(access_pattern), access_pattern), access_pattern.ttl.value
+
+    def _pipeline_decode(self, data: bytes | None, access_pattern: BaseCacheAccessPattern, **kwargs) -> T | None:
+        """Value of a pipelined `get`, as `get` would return it."""
+        if data is None:
+            return None
+        decoded = self._decode(data, access_pattern, EncodingStrategy.JSON)
+        self._set_local(decoded, access_pattern, len(data), **kwargs)
+        return decoded
+
+    def _pipeline_fallback(self, access_pattern: BaseCacheAccessPattern, **kwargs) -> T | None:
+        """Value of a pipelined `get` when the cache is unavailable."""
+        return None
+
+    def _pipeline_written(self, access_pattern: BaseCacheAccessPattern, keys: list[str]):
+        if access_pattern.local_ttl is not None:
+            for key in keys:
+                self.local_cache.delete((access_pattern.store.value, access_pattern.version, key))
+
+    def _get_local(self, access_pattern: BaseCacheAccessPattern, **kwargs) -> T | None:
+        if access_pattern.local_ttl is None:
+            return None
+        local_data = self.local_cache.get(self._local_key(access_pattern, **kwargs))
+        if local_data is not None:
+            self._record(MetricEvent.LOCAL_HIT, access_pattern)
+        return local_data
+
+    def _set_local(self, value: T, access_pattern: BaseCacheAccessPattern, size: int, **kwargs):
+        if access_pattern.local_ttl is None:
+            return
+        self.local_cache.set(
+            key=self._local_key(access_pattern, **kwargs),
+            value=value,
+            ttl=min(access_pattern.local_ttl.value, access_pattern.ttl.value),
+            size=size,
+        )
+
+    def _drop_local(self, access_pattern: BaseCacheAccessPattern, **kwargs):
+        if access_pattern.local_ttl is None:
+            return
+        self.local_cache.delete(self._local_key(access_pattern, **kwargs))
+
+    def _local_key(self, access_pattern: BaseCacheAccessPattern, **kwargs) -> Hashable:
+        return (access_pattern.store.value, access_pattern.version, self._key(access_pattern, **kwargs))
 
     def _get(self, access_pattern: BaseCacheAccessPattern, **kwargs) -> bytes | None:
         
         store = self._store(access_pattern)
         key = self._key(access_pattern, **kwargs)
+        return self._get_key(access_pattern, store, key)
+
+    def _get_key(self, access_pattern: BaseCacheAccessPattern, store: BaseCache, key: str) -> bytes | None:
+        """`_get` with the store and key already resolved, as used by bound handles."""
+        started = perf_counter()
         try:
             cached_data = store.get(
                key=key,
@@ -30,62 +141,216 @@ class BaseCacheClient(ABC, Generic[T]):
                version=access_pattern.version,
             )
         except Exception as e:
-            self.circuit_breaker.fail()
+            self.circuit_breaker.fail(access_pattern.store)
             msg = f"Unexpected error fetching cached data from store `{access_pattern.store.value}` with key `{key}`"
             logger.error(msg, exc_info=True)
             raise RedisClientException(msg) from e
         else:
-            self.circuit_breaker.success()
+            self.circuit_breaker.success(access_pattern.store)
+            self._record(MetricEvent.CACHE_LATENCY, access_pattern, perf_counter() - started)
             if cached_data is not None:
-                logger.debug(f"Cache hit in store `{access_pattern.store.value}` with key `{key}`")
+                self._record(MetricEvent.HIT, access_pattern)
+                self._record(MetricEvent.PAYLOAD_BYTES, access_pattern, len(cached_data))
+                logger.debug("Cache hit in store `%s` with key `%s`", access_pattern.store.value, key)
                 return cached_data
             else:
-                logger.debug(f"Cache miss in store `{access_pattern.store.value}` with key `{key}`")
+                self._record(MetricEvent.MISS, access_pattern)
+                logger.debug("Cache miss in store `%s` with key `%s`", access_pattern.store.value, key)
                 return None
 
+    def _get_many(self, access_pattern: BaseCacheAccessPattern, kwargs_list: list[dict]) -> list[bytes | None]:
+
+        store = self._store(access_pattern)
+        keys = [self._key(access_pattern, **kwargs) for kwargs in kwargs_list]
+        started = perf_counter()
+        try:
+            cached_data = store.get_many(
+                keys=keys,
+                version=access_pattern.version,
+            )
+        except Exception as e:
+            self.circuit_breaker.fail(access_pattern.store)
+            msg = f"Unexpected error fetching {len(keys)} cached keys from store `{access_pattern.store.value}`"
+            logger.error(msg, exc_info=True)
+            raise RedisClientException(msg) from e
+        else:
+            self.circuit_breaker.success(access_pattern.store)
+            self._record(MetricEvent.CACHE_LATENCY, access_pattern, perf_counter() - started)
+            self._record(MetricEvent.HIT, access_pattern, len(cached_data))
+            self._record(MetricEvent.MISS, access_pattern, len(keys) - len(cached_data))
+            logger.debug("Cache batch in store `%s`: %s hits, %s misses", access_pattern.store.value, len(cached_data), len(keys) - len(cached_data))
+            return [cached_data.get(key) for key in keys]
+
+    def _set_many(self, values: list[T], access_pattern: BaseCacheAccessPattern, encoding_strategy: EncodingStrategy, kwargs_list: list[dict], timeout: int | None = None):
+
+        store = self._store(access_pattern)
+        data = {
+            self._key(access_pattern, **kwargs): self._encode(value, encoding_strategy, access_pattern)
+            for value, kwargs in zip(values, kwargs_list, strict=True)
+        }
+        started = perf_counter()
+        try:
+            failed_keys = store.set_many(
+                data=data,
+                timeout=access_pattern.ttl.value if timeout is None else timeout,
+                version=access_pattern.version
+            )
+        except Exception as e:
+            self.circuit_breaker.fail(access_pattern.store)
+            msg = f"Unexpected error setting {len(data)} keys in cache store `{access_pattern.store.value}`"
+            logger.error(msg, exc_info=True)
+            raise RedisClientException(msg) from e
+        else:
+            self.circuit_breaker.success(access_pattern.store)
+            self._record(MetricEvent.CACHE_LATENCY, access_pattern, perf_counter() - started)
+            if failed_keys:
+                logger.warning("Failed to set keys `%s` in cache store `%s`", failed_keys, access_pattern.store.value)
+            for kwargs in kwargs_list:
+                self._drop_local(access_pattern, **kwargs)
+            logger.debug("Successfully set %s keys in cache store `%s`", len(data), access_pattern.store.value)
+
     def _set(self, value: T, access_pattern: BaseCacheAccessPattern, encoding_strategy: EncodingStrategy, **kwargs): 
         
         store = self._store(access_pattern)
         key = self._key(access_pattern, **kwargs)
+        self._set_key(value, access_pattern, encoding_strategy, store, key)
+
+    def _set_key(self, value: T, access_pattern: BaseCacheAccessPattern, encoding_strategy: EncodingStrategy, store: BaseCache, key: str, timeout: int | None = None):
+        """`_set` with the store and key already resolved, as used by bound handles. `timeout` overrides the pattern's TTL."""
+        data = self._encode(value, encoding_strategy, access_pattern)
+        started = perf_counter()
         try:
             store.set(
                 key=key, 
-                value=self._encode(value, encoding_strategy), 
-                timeout=access_pattern.ttl.value, 
+                value=data, 
+                timeout=access_pattern.ttl.value if timeout is None else timeout, 
                 version=access_pattern.version
             )
         except Exception as e:
+            self.circuit_breaker.fail(access_pattern.store)
             msg = f"Unexpected error setting cache store `{access_pattern.store.value}` with key `{key}`"
             logger.error(msg, exc_info=True)
             raise RedisClientException(msg) from e
         else:
-            logger.debug(f"Successfully set cache store `{access_pattern.store.value}` with key `{key}`")
-            
-    def _encode(self, value: T, strategy: EncodingStrategy) -> bytes:
-        match strategy:
-            case EncodingStrategy.JSON:
-                data = DataEncoder.serialize(value)
-            case EncodingStrategy.PICKLE:
-                data = DataEncoder.pickle(value)
-            case _:
-                msg = f"Invalid EncodingStrategy for encoding: `{strategy}`"
-                logger.error(msg, exc_info=True)
-                raise RedisClientException(msg)
+            self.circuit_breaker.success(access_pattern.store)
+            self._record(MetricEvent.CACHE_LATENCY, access_pattern, perf_counter() - started)
+            if access_pattern.local_ttl is not None:
+                self.local_cache.delete((access_pattern.store.value, access_pattern.version, key))
+            logger.debug("Successfully set cache store `%s` with key `%s`", access_pattern.store.value, key)
             
+    async def _aget(self, access_pattern: BaseCacheAccessPattern, **kwargs) -> bytes | None:
+
+        store = self._store(access_pattern)
+        key = self._key(access_pattern, **kwargs)
+        started = perf_counter()
+        try:
+            cached_data = await store.aget(
+               key=key,
+               default=None,
+               version=access_pattern.version,
+            )
+        except Exception as e:
+            self.circuit_breaker.fail(access_pattern.store)
+            msg = f"Unexpected error fetching cached data from store `{access_pattern.store.value}` with key `{key}`"
+            logger.error(msg, exc_info=True)
+            raise RedisClientException(msg) from e
+        else:
+            self.circuit_breaker.success(access_pattern.store)
+            self._record(MetricEvent.CACHE_LATENCY, access_pattern, perf_counter() - started)
+            if cached_data is not None:
+                self._record(MetricEvent.HIT, access_pattern)
+                self._record(MetricEvent.PAYLOAD_BYTES, access_pattern, len(cached_data))
+                logger.debug("Cache hit in store `%s` with key `%s`", access_pattern.store.value, key)
+                return cached_data
+            else:
+                self._record(MetricEvent.MISS, access_pattern)
+                logger.debug("Cache miss in store `%s` with key `%s`", access_pattern.store.value, key)
+                return None
+
+    async def _aget_many(self, access_pattern: BaseCacheAccessPattern, kwargs_list: list[dict]) -> list[bytes | None]:
+
+        store = self._store(access_pattern)
+        keys = [self._key(access_pattern, **kwargs) for kwargs in kwargs_list]
+        started = perf_counter()
+        try:
+            cached_data = await store.aget_many(
+                keys=keys,
+                version=access_pattern.version,
+            )
+        except Exception as e:
+            self.circuit_breaker.fail(access_pattern.store)
+            msg = f"Unexpected error fetching {len(keys)} cached keys from store `{access_pattern.store.value}`"
+            logger.error(msg, exc_info=True)
+            raise RedisClientException(msg) from e
+        else:
+            self.circuit_breaker.success(access_pattern.store)
+            self._record(MetricEvent.CACHE_LATENCY, access_pattern, perf_counter() - started)
+            self._record(MetricEvent.HIT, access_pattern, len(cached_data))
+            self._record(MetricEvent.MISS, access_pattern, len(keys) - len(cached_data))
+            logger.debug("Cache batch in store `%s`: %s hits, %s misses", access_pattern.store.value, len(cached_data), len(keys) - len(cached_data))
+            return [cached_data.get(key) for key in keys]
+
+    async def _aset(self, value: T, access_pattern: BaseCacheAccessPattern, encoding_strategy: EncodingStrategy, **kwargs):
+
+        store = self._store(access_pattern)
+        key = self._key(access_pattern, **kwargs)
+        await self._aset_key(value, access_pattern, encoding_strategy, store, key)
+
+    async def _aset_key(self, value: T, access_pattern: BaseCacheAccessPattern, encoding_strategy: EncodingStrategy, store: BaseCache, key: str, timeout: int | None = None):
+        data = await self._aencode(value, encoding_strategy, access_pattern)
+        started = perf_counter()
+        try:
+            await store.aset(
+                key=key,
+                value=data,
+                timeout=access_pattern.ttl.value if timeout is None else timeout,
+                version=access_pattern.version
+            )
+        except Exception as e:
+            self.circuit_breaker.fail(access_pattern.store)
+            msg = f"Unexpected error setting cache store `{access_pattern.store.value}` with key `{key}`"
+            logger.error(msg, exc_info=True)
+            raise RedisClientException(msg) from e
+        else:
+            self.circuit_breaker.success(access_pattern.store)
+            self._record(MetricEvent.CACHE_LATENCY, access_pattern, perf_counter() - started)
+            if access_pattern.local_ttl is not None:
+                self.local_cache.delete((access_pattern.store.value, access_pattern.version, key))
+            logger.debug("Successfully set cache store `%s` with key `%s`", access_pattern.store.value, key)
+
+    async def _aencode(self, value: T, strategy: EncodingStrategy, access_pattern: BaseCacheAccessPattern) -> bytes:
+        if strategy == EncodingStrategy.PICKLE:
+            # Result size isn't known up front and pickled DB results are the large ones.
+            return await sync_to_async(self._encode, thread_sensitive=False)(value, strategy, access_pattern)
+        return self._encode(value, strategy, access_pattern)
+
+    async def _adecode(self, data: bytes, access_pattern: BaseCacheAccessPattern, strategy: EncodingStrategy) -> T:
+        if len(data) >= self.offload_threshold:
+            return await sync_to_async(self._decode, thread_sensitive=False)(data, access_pattern, strategy)
+        return self._decode(data, access_pattern, strategy)
+
+    def _encode(self, value: T, strategy: EncodingStrategy, access_pattern: BaseCacheAccessPattern) -> bytes:
+        started = perf_counter()
+        data = DataEncoder.encode(
+            value,
+            strategy,
+            compression=access_pattern.compression,
+            compression_threshold=access_pattern.compression_threshold,
+        )
+        self._record(MetricEvent.ENCODE_TIME, access_pattern, perf_counter() - started)
+        self._record(MetricEvent.PAYLOAD_BYTES, access_pattern, len(data))
         return data
     
     def _decode(self, data: bytes, access_pattern: BaseCacheAccessPattern, strategy: EncodingStrategy) -> T:
-        match strategy:
-            case EncodingStrategy.JSON:
-                deserialized = DataEncoder.deserialize(data)
-                result = access_pattern.value_type(**deserialized)
-            case EncodingStrategy.PICKLE:
-                result = DataEncoder.unpickle(data)
+        started = perf_counter()
+        decoded, codec = DataEncoder.decode(data, strategy)
+        match codec:
+            case EncodingStrategy.JSON | EncodingStrategy.ORJSON | EncodingStrategy.MSGPACK:
+                result = access_pattern.value_type(**decoded)
             case _:
-                msg = f"Invalid EncodingStrategy for decoding: `{strategy}`"
-                logger.error(msg, exc_info=True)
-                raise RedisClientException(msg)
+                result = decoded
             
+        self._record(MetricEvent.DECODE_TIME, access_pattern, perf_counter() - started)
         return cast(T, result)
 
     def _store(self, access_pattern: BaseCacheAccessPattern) -> BaseCache:
@@ -96,7 +361,7 @@ class BaseCacheClient(ABC, Generic[T]):
             logger.error(msg, exc_info=True)
             raise RedisClientException(msg) from e
         else:
-            logger.debug(f"Valid redis store: {access_pattern.store}")
+            logger.debug("Valid redis store: %s", access_pattern.store)
             return store
     
     def _key(self, access_pattern: BaseCacheAccessPattern, **kwargs) -> str:
@@ -107,5 +372,11 @@ class BaseCacheClient(ABC, Generic[T]):
             logger.error(msg, exc_info=True)
             raise InvalidAccessPattern(msg) from e
         else:
-            logger.debug(f"{access_pattern.__class__.__name__} key is valid")
-            return key
\ No newline at end of file
+            logger.debug("%s key is valid", access_pattern.__class__.__name__)
+            return key
+
+    def _strategy(self, access_pattern: BaseCacheAccessPattern) -> EncodingStrategy:
+        return access_pattern.encoding_strategy or EncodingStrategy.JSON
+
+    def _record(self, event: MetricEvent, access_pattern: BaseCacheAccessPattern, value: float = 1.0):
+        self.metrics.record(event, access_pattern.__class__.__name__, access_pattern.store.value, value)
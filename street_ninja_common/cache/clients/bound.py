@@ -0,0 +1,152 @@
+import logging
+from typing import TYPE_CHECKING, Any, Generic, Hashable, TypeVar
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from ..enums import EncodingStrategy, MetricEvent
+from ..envelope import CacheEnvelope, NegativeResult
+from ..exc import RedisClientException, InvalidAccessPattern
+from ..access_patterns import BaseCacheAccessPattern, AccessPatternDB
+
+if TYPE_CHECKING:
+    from .client import CacheClient
+    from .client_db import CacheClientDB
+
+T = TypeVar("T")
+logger = logging.getLogger(__name__)
+
+
+class BoundAccessPattern(Generic[T]):
+    """
+    An access pattern compiled against one cache client.
+
+    Everything the client would otherwise work out on every call is resolved
+    once: the Django cache backend, version, L1 TTL, codec, and for
+    patterns whose key takes no kwargs the rendered key and L1 key. A steady
+    state `get()` is then an L1 lookup or a single backend call, without the
+    `caches[...]` lookup, Enum attribute reads or the key validation wrapper.
+
+    The backend is looked up on first use rather than in `bind()`, so handles
+    can be created at import time before Django is set up. It is shared by
+    every thread using the handle, which is safe for the Redis and LocMem
+    backends Street Ninja uses.
+
+    Usage:
+        SHELTERS = CacheClientDB(CacheCircuitBreaker()).bind(ShelterAccessPattern(...))
+        shelters = SHELTERS.get()
+    """
+    __slots__ = (
+        "client", "access_pattern", "_store", "_backend", "_version", "_local_ttl",
+        "_strategy", "_static_key", "_static_local_key",
+    )
+
+    def __init__(self, client: "CacheClient[T]", access_pattern: BaseCacheAccessPattern):
+        self.client = client
+        self.access_pattern = access_pattern
+        self._store = access_pattern.store
+        self._backend: BaseCache | None = None
+        self._version = access_pattern.version
+        self._local_ttl = (
+            None if access_pattern.local_ttl is None
+            else min(access_pattern.local_ttl.value, access_pattern.ttl.value)
+        )
+        self._strategy = client._strategy(access_pattern)
+        self._static_key: str | None = None
+        self._static_local_key: Hashable | None = None
+
+    def get(self, **kwargs) -> T | None:
+        key, local_key = self._resolve(kwargs)
+        if local_key is not None:
+            local_data = self.client.local_cache.get(local_key)
+            if local_data is not None:
+                self.client._record(MetricEvent.LOCAL_HIT, self.access_pattern)
+                return local_data
+        if self.client.circuit_breaker.allow(self._store):
+            cached_data = self.client._get_key(self.access_pattern, self._backend or self._bind_backend(), key)
+            if cached_data is not None:
+                decoded = self.client._decode(cached_data, self.access_pattern, EncodingStrategy.JSON)
+                self._set_local(local_key, decoded, len(cached_data))
+                return decoded
+        else:
+            logger.critical("Cache circuit breaker open. Can not read from cache")
+        return None
+
+    def set(self, value: T, **kwargs):
+        if self.access_pattern.write_behind:
+            return self.client.set(value, self.access_pattern, **kwargs)
+        key, _ = self._resolve(kwargs)
+        self.client._set_key(value, self.access_pattern, self._strategy, self._backend or self._bind_backend(), key)
+
+    def _resolve(self, kwargs: dict[str, Any]) -> tuple[str, Hashable | None]:
+        if not kwargs and self._static_key is not None:
+            return self._static_key, self._static_local_key
+        try:
+            key = self.access_pattern.key(**kwargs)
+        except TypeError as e:
+            msg = f"{self.access_pattern.__class__.__name__} invalid key enum `{self.access_pattern._key_enum}` with kwargs `{kwargs}`"
+            logger.error(msg, exc_info=True)
+            raise InvalidAccessPattern(msg) from e
+        local_key = None if self._local_ttl is None else (self._store.value, self._version, key)
+        if not kwargs:
+            self._static_key, self._static_local_key = key, local_key
+        return key, local_key
+
+    def _set_local(self, local_key: Hashable | None, value: T, size: int):
+        if local_key is not None:
+            self.client.local_cache.set(key=local_key, value=value, ttl=self._local_ttl, size=size)
+
+    def _bind_backend(self) -> BaseCache:
+        try:
+            self._backend = caches[self._store.value]
+        except KeyError as e:
+            msg = f"Invalid Redis store: `{self._store}`"
+            logger.error(msg, exc_info=True)
+            raise RedisClientException(msg) from e
+        return self._backend
+
+
+class BoundAccessPatternDB(BoundAccessPattern[T]):
+    """
+    `BoundAccessPattern` for `CacheClientDB`: a miss falls through to the
+    client's read-through path (single flight, rebuild lock, background write)
+    and soft TTL envelopes are unwrapped and refreshed as usual.
+    """
+    __slots__ = ()
+
+    client: "CacheClientDB[T]"
+    access_pattern: AccessPatternDB
+
+    def get(self, **kwargs) -> T:
+        key, local_key = self._resolve(kwargs)
+        if local_key is not None:
+            local_data = self.client.local_cache.get(local_key)
+            if local_data is not None:
+                self.client._record(MetricEvent.LOCAL_HIT, self.access_pattern)
+                return local_data
+        if not self.client.circuit_breaker.allow(self._store):
+            logger.warning("Cache circuit breaker open, bypassing cache")
+            return self.client._get_from_db(self.access_pattern, **kwargs)
+
+        cached_data = self.client._get_key(self.access_pattern, self._backend or self._bind_backend(), key)
+        if cached_data is None:
+            return self.client._unwrap_negative(self.client._read_through(self.access_pattern, **kwargs))
+        decoded = self.client._decode(cached_data, self.access_pattern, EncodingStrategy.PICKLE)
+        if isinstance(decoded, NegativeResult):
+            self.client._record(MetricEvent.NEGATIVE_HIT, self.access_pattern)
+            return decoded.value
+        if isinstance(decoded, CacheEnvelope):
+            self.client._maybe_refresh(decoded, self.access_pattern, **kwargs)
+            decoded = decoded.value
+        self._set_local(local_key, decoded, len(cached_data))
+        return decoded
+
+    def set(self, value: T, **kwargs):
+        if self.access_pattern.write_behind:
+            return self.client.set(value, self.access_pattern, **kwargs)
+        key, _ = self._resolve(kwargs)
+        self.client._set_key(
+            self.client._wrap(value, self.access_pattern, 0.0),
+            self.access_pattern,
+            self._strategy,
+            self._backend or self._bind_backend(),
+            key,
+        )
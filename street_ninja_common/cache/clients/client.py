@@ -1,6 +1,7 @@
 import logging
 from typing import TypeVar
 from .base import BaseCacheClient
+from .bound import BoundAccessPattern
 from ..enums import EncodingStrategy
 from ..access_patterns import BaseCacheAccessPattern
 
@@ -16,28 +17,72 @@ class CacheClient(BaseCacheClient[T]):
     Uses JSON serialization for broad compatibility and human-readable cache values.
     
     Key characteristics:
-    - JSON encoding only (for compatibility and debugging)
+    - JSON encoding by default (for compatibility and debugging)
     - No fallback data source - if cache fails, operations return None
     - Suitable for: user preferences, API responses, computed results, sessions
     - Not suitable for: database query results (use CacheClientDB instead)
     
+    Patterns may pick a faster codec (`EncodingStrategy.ORJSON`/`MSGPACK`) and
+    compression; readers recognise every format from its header byte, so legacy
+    JSON values stay readable while a pattern is switched over.
+
     The client integrates with a circuit breaker to fail fast when cache is down,
     preventing timeout delays and providing clear "cache unavailable" signals
     rather than hanging operations.
     """
     def get(self, access_pattern: BaseCacheAccessPattern, **kwargs) -> T | None:
-        if self.circuit_breaker.allow_request:
+        local_data = self._get_local(access_pattern, **kwargs)
+        if local_data is not None:
+            return local_data
+        if self.circuit_breaker.allow(access_pattern.store):
             cached_data = self._get(access_pattern, **kwargs)
             if cached_data is not None:
-                return self._decode(cached_data, access_pattern, EncodingStrategy.JSON)
+                decoded = self._decode(cached_data, access_pattern, EncodingStrategy.JSON)
+                self._set_local(decoded, access_pattern, len(cached_data), **kwargs)
+                return decoded
         else:
             logger.critical("Cache circuit breaker open. Can not read from cache")
         return None
 
+    def get_many(self, access_pattern: BaseCacheAccessPattern, kwargs_list: list[dict]) -> list[T | None]:
+        results = [self._get_local(access_pattern, **kwargs) for kwargs in kwargs_list]
+        remote = [i for i, result in enumerate(results) if result is None]
+        if not remote:
+            return results
+        if not self.circuit_breaker.allow(access_pattern.store):
+            logger.critical("Cache circuit breaker open. Can not read from cache")
+            return results
+
+        remote_kwargs = [kwargs_list[i] for i in remote]
+        for i, kwargs, cached_data in zip(remote, remote_kwargs, self._get_many(access_pattern, remote_kwargs)):
+            if cached_data is not None:
+                results[i] = self._decode(cached_data, access_pattern, EncodingStrategy.JSON)
+                self._set_local(results[i], access_pattern, len(cached_data), **kwargs)
+        return results
+
+    def set_many(self, values: list[T], access_pattern: BaseCacheAccessPattern, kwargs_list: list[dict]):
+        if access_pattern.write_behind:
+            for value, kwargs in zip(values, kwargs_list, strict=True):
+                self._defer(value, access_pattern, **kwargs)
+            return
+        self._set_many(
+            values=values,
+            access_pattern=access_pattern,
+            encoding_strategy=self._strategy(access_pattern),
+            kwargs_list=kwargs_list,
+        )
+
     def set(self, value: T, access_pattern: BaseCacheAccessPattern, **kwargs):
+        if access_pattern.write_behind:
+            self._defer(value, access_pattern, **kwargs)
+            return
         self._set(
             value=value,
             access_pattern=access_pattern,
-            encoding_strategy=EncodingStrategy.JSON,
+            encoding_strategy=self._strategy(access_pattern),
             **kwargs
         )
+
+    def bind(self, access_pattern: BaseCacheAccessPattern) -> BoundAccessPattern[T]:
+        """Compile `access_pattern` into a handle with `get(**kwargs)` / `set(value, **kwargs)`."""
+        return BoundAccessPattern(self, access_pattern)
@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import time
+from typing import Hashable, TypeVar
+from uuid import uuid4
+from asgiref.sync import sync_to_async
+from django.core.cache.backends.base import BaseCache
+from .client import CacheClient
+from .client_db import CacheClientDB
+from ..enums import EncodingStrategy
+from ..envelope import NegativeResult
+from ..exc import RedisClientException
+from ..access_patterns import BaseCacheAccessPattern, AccessPatternDB
+
+T = TypeVar("T")
+logger = logging.getLogger(__name__)
+
+
+class AsyncCacheClient(CacheClient[T]):
+    """
+    Asyncio version of CacheClient for async Django views.
+
+    Adds `aget`, `aget_many` and `aset` on top of the sync API. Cache I/O goes
+    through Django's async cache API, large payloads are decoded on a worker
+    thread, and the circuit breaker and L1 tier are the same process-wide
+    instances the sync clients use.
+    """
+    async def aget(self, access_pattern: BaseCacheAccessPattern, **kwargs) -> T | None:
+        local_data = self._get_local(access_pattern, **kwargs)
+        if local_data is not None:
+            return local_data
+        if self.circuit_breaker.allow(access_pattern.store):
+            cached_data = await self._aget(access_pattern, **kwargs)
+            if cached_data is not None:
+                decoded = await self._adecode(cached_data, access_pattern, EncodingStrategy.JSON)
+                self._set_local(decoded, access_pattern, len(cached_data), **kwargs)
+                return decoded
+        else:
+            logger.critical("Cache circuit breaker open. Can not read from cache")
+        return None
+
+    async def aget_many(self, access_pattern: BaseCacheAccessPattern, kwargs_list: list[dict]) -> list[T | None]:
+        results = [self._get_local(access_pattern, **kwargs) for kwargs in kwargs_list]
+        remote = [i for i, result in enumerate(results) if result is None]
+        if not remote:
+            return results
+        if not self.circuit_breaker.allow(access_pattern.store):
+            logger.critical("Cache circuit breaker open. Can not read from cache")
+            return results
+
+        remote_kwargs = [kwargs_list[i] for i in remote]
+        for i, kwargs, cached_data in zip(remote, remote_kwargs, await self._aget_many(access_pattern, remote_kwargs)):
+            if cached_data is not None:
+                results[i] = await self._adecode(cached_data, access_pattern, EncodingStrategy.JSON)
+                self._set_local(results[i], access_pattern, len(cached_data), **kwargs)
+        return results
+
+    async def aset(self, value: T, access_pattern: BaseCacheAccessPattern, **kwargs):
+        if access_pattern.write_behind:
+            self._defer(value, access_pattern, **kwargs)
+            return
+        await self._aset(
+            value=value,
+            access_pattern=access_pattern,
+            encoding_strategy=self._strategy(access_pattern),
+            **kwargs
+        )
+
+
+class AsyncCacheClientDB(CacheClientDB[T]):
+    """
+    Asyncio version of CacheClientDB for async Django views.
+
+    Adds `aget`, `aget_many` and `aset` on top of the sync API with the same
+    read-through, stampede, soft TTL and L1 behaviour. The sync `query` callable
+    runs through `sync_to_async` (thread sensitive, so the ORM stays on its usual
+    thread), pickling and large unpickles run on worker threads, and concurrent
+    misses for one key within an event loop share a single rebuild task.
+    """
+    _inflight: dict[Hashable, asyncio.Task] = {}
+    _background_tasks: set[asyncio.Task] = set()
+
+    async def aget(self, access_pattern: AccessPatternDB, **kwargs) -> T:
+        local_data = self._get_local(access_pattern, **kwargs)
+        if local_data is not None:
+            return local_data
+        if self.circuit_breaker.allow(access_pattern.store):
+            cached_data = await self._aget_from_cache(access_pattern, **kwargs)
+            if cached_data is None:
+                cached_data = await self._aread_through(access_pattern, **kwargs)
+        else:
+            logger.warning("Cache circuit breaker open, bypassing cache")
+            cached_data = await self._aget_from_db(access_pattern, **kwargs)
+
+        return self._unwrap_negative(cached_data)
+
+    async def aget_many(self, access_pattern: AccessPatternDB, kwargs_list: list[dict]) -> list[T]:
+        results = [self._get_local(access_pattern, **kwargs) for kwargs in kwargs_list]
+        remote = [i for i, result in enumerate(results) if result is None]
+        if not remote:
+            return results
+        if not self.circuit_breaker.allow(access_pattern.store):
+            logger.warning("Cache circuit breaker open, bypassing cache")
+            for i in remote:
+                results[i] = await self._aget_from_db(access_pattern, **kwargs_list[i])
+            return results
+
+        remote_kwargs = [kwargs_list[i] for i in remote]
+        for i, kwargs, cached_data in zip(remote, remote_kwargs, await self._aget_many(access_pattern, remote_kwargs)):
+            if cached_data is not None:
+                decoded = await self._adecode(cached_data, access_pattern, EncodingStrategy.PICKLE)
+                results[i] = self._unwrap_decoded(decoded, len(cached_data), access_pattern, **kwargs)
+        missing = [i for i in remote if results[i] is None]
+        loaded = await asyncio.gather(*(self._aread_through(access_pattern, **kwargs_list[i]) for i in missing))
+        for i, db_data in zip(missing, loaded):
+            results[i] = db_data
+        return [self._unwrap_negative(result) for result in results]
+
+    async def aset(self, value: T, access_pattern: AccessPatternDB, **kwargs):
+        if access_pattern.write_behind:
+            self._defer(value, access_pattern, **kwargs)
+            return
+        await self._aset(
+            value=self._wrap(value, access_pattern, 0.0),
+            access_pattern=access_pattern,
+            encoding_strategy=EncodingStrategy.PICKLE,
+            **kwargs
+        )
+
+    async def _aset_key(self, value: T, access_pattern: AccessPatternDB, encoding_strategy: EncodingStrategy, store: BaseCache, key: str, timeout: int | None = None):
+        if timeout is None and isinstance(value, NegativeResult):
+            timeout = access_pattern.negative_ttl.value
+        await super()._aset_key(value, access_pattern, encoding_strategy, store, key, timeout)
+        if access_pattern.tags:
+            await sync_to_async(self._tag, thread_sensitive=False)(access_pattern, [key])
+
+    async def _aread_through(self, access_pattern: AccessPatternDB, **kwargs) -> T:
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), self._flight_key(access_pattern, **kwargs))
+        task = self._inflight.get(flight_key)
+        if task is None:
+            task = loop.create_task(self._arebuild(access_pattern, **kwargs))
+            self._inflight[flight_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(flight_key, None))
+        return await asyncio.shield(task)
+
+    async def _arebuild(self, access_pattern: AccessPatternDB, **kwargs) -> T:
+        if access_pattern.lock_ttl is None:
+            return await self._aload(access_pattern, **kwargs)
+
+        token = uuid4().hex
+        if await self._aacquire_lock(access_pattern, token, **kwargs):
+            try:
+                return await self._aload(access_pattern, **kwargs)
+            finally:
+                await self._arelease_lock(access_pattern, token, **kwargs)
+
+        cached_data = await self._await_rebuild(access_pattern, **kwargs)
+        if cached_data is None:
+            logger.warning("Timed out waiting for rebuild lock with AccessPattern `%s`, querying DB", access_pattern.__class__.__name__)
+            return await self._aload(access_pattern, **kwargs)
+        return cached_data
+
+    async def _aload(self, access_pattern: AccessPatternDB, **kwargs) -> T:
+        started = time.monotonic()
+        db_data = await self._aget_from_db(access_pattern, **kwargs)
+        value = self._wrap(db_data, access_pattern, time.monotonic() - started)
+        if access_pattern.background_write:
+            task = asyncio.get_running_loop().create_task(self._awrite_safely(value, access_pattern, **kwargs))
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+        else:
+            await self._awrite_safely(value, access_pattern, **kwargs)
+        return db_data
+
+    async def _awrite_safely(self, value, access_pattern: AccessPatternDB, **kwargs):
+        try:
+            await self._aset(
+                value=value,
+                access_pattern=access_pattern,
+                encoding_strategy=EncodingStrategy.PICKLE,
+                **kwargs
+            )
+        except RedisClientException:
+            logger.warning("Read-through cache write failed with AccessPattern `%s`, returning DB data", access_pattern.__class__.__name__)
+
+    async def _aacquire_lock(self, access_pattern: AccessPatternDB, token: str, **kwargs) -> bool:
+        store = self._store(access_pattern)
+        lock_key = self._lock_key(access_pattern, **kwargs)
+        try:
+            acquired = await store.aadd(
+                key=lock_key,
+                value=token,
+                timeout=access_pattern.lock_ttl.value,
+                version=access_pattern.version,
+            )
+        except Exception:
+            logger.warning("Unable to take rebuild lock `%s`, rebuilding without it", lock_key, exc_info=True)
+            return True
+        else:
+            logger.debug("Rebuild lock `%s` acquired: %s", lock_key, acquired)
+            return acquired
+
+    async def _arelease_lock(self, access_pattern: AccessPatternDB, token: str, **kwargs):
+        store = self._store(access_pattern)
+        lock_key = self._lock_key(access_pattern, **kwargs)
+        try:
+            if await store.aget(lock_key, version=access_pattern.version) == token:
+                await store.adelete(lock_key, version=access_pattern.version)
+        except Exception:
+            logger.warning("Unable to release rebuild lock `%s`, it will expire on its own", lock_key, exc_info=True)
+
+    async def _await_rebuild(self, access_pattern: AccessPatternDB, **kwargs) -> T | None:
+        deadline = time.monotonic() + access_pattern.lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self._lock_poll_interval)
+            try:
+                cached_data = await self._aget_from_cache(access_pattern, **kwargs)
+            except RedisClientException:
+                return None
+            if cached_data is not None:
+                return cached_data
+        return None
+
+    async def _aget_from_db(self, access_pattern: AccessPatternDB, **kwargs) -> T:
+        return await sync_to_async(self._get_from_db)(access_pattern, **kwargs)
+
+    async def _aget_from_cache(self, access_pattern: AccessPatternDB, **kwargs) -> T | None:
+        cached_data = await self._aget(access_pattern, **kwargs)
+        if cached_data is not None:
+            decoded = await self._adecode(cached_data, access_pattern, EncodingStrategy.PICKLE)
+            return self._unwrap_decoded(decoded, len(cached_data), access_pattern, **kwargs)
+        return None
@@ -1,9 +1,22 @@
 import logging
-from typing import  TypeVar
-from ..enums import EncodingStrategy
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import  Any, Hashable, Iterable, TypeVar
+from uuid import uuid4
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+from django.db.models import QuerySet
+from ..enums import CacheStoreEnum, EncodingStrategy, MetricEvent, Seconds
 from ..exc import RedisClientException
 from .base import BaseCacheClient
+from .bound import BoundAccessPatternDB
 from ..access_patterns import AccessPatternDB
+from ..envelope import CacheEnvelope, NegativeResult
+from ..projection import ProjectedRows
+from ..single_flight import single_flight
 
 logger = logging.getLogger(__name__)
 T = TypeVar("T")
@@ -23,41 +36,414 @@ class CacheClientDB(BaseCacheClient[T]):
     - Circuit breaker integration for graceful cache failure handling
     - Guaranteed data availability: always returns data (cache or DB)
 
+    On a miss the DB result is returned directly after being written to cache,
+    so a miss costs one cache read and one cache write. Patterns with
+    `background_write=True` hand the write to a background thread instead.
+
+    Misses are protected against stampedes. Concurrent misses for the same key
+    within a process share one DB query, and patterns with a `lock_ttl` also take
+    a short-lived lock in their own cache store so that only one process rebuilds
+    the key while the others wait for it.
+
+    Patterns with a `soft_ttl` or `xfetch_beta` are stored with a refresh
+    timestamp. Once it passes, the cached value is still returned immediately and
+    a single background refresh rebuilds the key before the hard TTL expires.
+
+    Patterns with a `projection` cache only the declared fields as compact rows
+    and return read-only `ProjectedRows`, which are far smaller to store and far
+    cheaper to unpickle than model instances.
+
+    Patterns with a `local_ttl` are also served from the in-process L1 tier,
+    which is checked before the circuit breaker and Redis.
+
     The client provides resilience during cache outages by transparently falling
     back to database-only operation, ensuring application functionality is maintained
     even when Redis is unavailable.
     """
+    _write_executor: ThreadPoolExecutor | None = None
+    _lock_poll_interval = 0.05
+    _single_flight = single_flight
+    _refreshing: set[Hashable] = set()
+    _refreshing_lock = threading.Lock()
+
     def get(self, access_pattern: AccessPatternDB, **kwargs) -> T:
-        if self.circuit_breaker.allow_request:
+        local_data = self._get_local(access_pattern, **kwargs)
+        if local_data is not None:
+            return local_data
+        if self.circuit_breaker.allow(access_pattern.store):
             cached_data = self._get_from_cache(access_pattern, **kwargs)
             if cached_data is None:
-                self._set_from_db(access_pattern, **kwargs)
-                cached_data = self._get_from_cache(access_pattern, **kwargs)
-                if cached_data is None:
-                    msg = f"Read-through cache lookup failed with AccessPattern `{access_pattern.__class__.__name__}`"
-                    logger.error(msg)
-                    raise RedisClientException(msg)
+                cached_data = self._read_through(access_pattern, **kwargs)
         else:
             logger.warning("Cache circuit breaker open, bypassing cache")
-            cached_data = self._get_from_db(access_pattern)
+            cached_data = self._get_from_db(access_pattern, **kwargs)
+
+        return self._unwrap_negative(cached_data)
+
+    def get_many(self, access_pattern: AccessPatternDB, kwargs_list: list[dict]) -> list[T]:
+        """
+        Batched read-through. Cached keys are fetched in one round trip, only the
+        missing keys go to the DB, and their results are written back in one
+        round trip. The circuit breaker is consulted once for the whole batch.
+        """
+        results = [self._get_local(access_pattern, **kwargs) for kwargs in kwargs_list]
+        remote = [i for i, result in enumerate(results) if result is None]
+        if not remote:
+            return results
+        if not self.circuit_breaker.allow(access_pattern.store):
+            logger.warning("Cache circuit breaker open, bypassing cache")
+            for i in remote:
+                results[i] = self._get_from_db(access_pattern, **kwargs_list[i])
+            return results
+
+        remote_kwargs = [kwargs_list[i] for i in remote]
+        for i, kwargs, cached_data in zip(remote, remote_kwargs, self._get_many(access_pattern, remote_kwargs)):
+            if cached_data is not None:
+                results[i] = self._unwrap(cached_data, access_pattern, **kwargs)
+        missing = [i for i in remote if results[i] is None]
+        if missing:
+            values = []
+            for i in missing:
+                started = time.monotonic()
+                results[i] = self._get_from_db(access_pattern, **kwargs_list[i])
+                values.append(self._wrap(results[i], access_pattern, time.monotonic() - started))
+            try:
+                self._set_many(
+                    values=values,
+                    access_pattern=access_pattern,
+                    encoding_strategy=EncodingStrategy.PICKLE,
+                    kwargs_list=[kwargs_list[i] for i in missing],
+                )
+            except RedisClientException:
+                logger.warning("Read-through batch cache write failed with AccessPattern `%s`, returning DB data", access_pattern.__class__.__name__)
+        return [self._unwrap_negative(result) for result in results]
+
+    def set(self, value: T, access_pattern: AccessPatternDB, **kwargs):
+        if access_pattern.write_behind:
+            self._defer(value, access_pattern, **kwargs)
+            return
+        self._set(
+            value=self._wrap(value, access_pattern, 0.0),
+            access_pattern=access_pattern,
+            encoding_strategy=EncodingStrategy.PICKLE,
+            **kwargs
+        )
+
+    def set_many(self, values: list[T], access_pattern: AccessPatternDB, kwargs_list: list[dict]):
+        if access_pattern.write_behind:
+            for value, kwargs in zip(values, kwargs_list, strict=True):
+                self._defer(value, access_pattern, **kwargs)
+            return
+        self._set_many(
+            values=[self._wrap(value, access_pattern, 0.0) for value in values],
+            access_pattern=access_pattern,
+            encoding_strategy=EncodingStrategy.PICKLE,
+            kwargs_list=kwargs_list,
+        )
+
+    def invalidate_tag(self, tag: str, stores: Iterable[CacheStoreEnum] | None = None) -> int:
+        """
+        Delete every key written under `tag` by a pattern's `tags`, in `stores`
+        or every configured store the tag index supports (Redis stores for
+        `RedisTagIndex`), and drop their L1 copies here and (through
+        the invalidation bus) in other processes. Per store this is one round
+        trip to take the tag's members and one to delete them.
+        Returns the number of keys invalidated.
+        """
+        if stores is None:
+            stores = [
+                store for store in CacheStoreEnum
+                if store.value in settings.CACHES and self.tag_index.supports(store)
+            ]
+
+        invalidated = 0
+        for store in stores:
+            try:
+                members = self.tag_index.pop(store, tag)
+            except Exception as e:
+                self.circuit_breaker.fail(store)
+                msg = f"Unexpected error reading tag `{tag}` in cache store `{store.value}`"
+                logger.error(msg, exc_info=True)
+                raise RedisClientException(msg) from e
+
+            keys_by_version: dict[int, list[str]] = {}
+            for member in members:
+                version, key = member.split(":", 1)
+                keys_by_version.setdefault(int(version), []).append(key)
+            for version, keys in keys_by_version.items():
+                try:
+                    caches[store.value].delete_many(keys, version=version)
+                except Exception as e:
+                    self.circuit_breaker.fail(store)
+                    # Put the members back so a retry still finds them; their
+                    # patterns' TTLs aren't known here, so keep them for the longest any pattern has
+                    self._tag_members(store, (tag,), [f"{version}:{key}" for key in keys], Seconds.DAYS_NINETY.value)
+                    msg = f"Unexpected error invalidating {len(keys)} keys tagged `{tag}` in cache store `{store.value}`"
+                    logger.error(msg, exc_info=True)
+                    raise RedisClientException(msg) from e
+                for key in keys:
+                    self.local_cache.delete((store.value, version, key))
+                    if self.invalidation_bus is not None:
+                        self.invalidation_bus.publish_key(store, version, key)
+            self.circuit_breaker.success(store)
+            invalidated += len(members)
+            logger.debug("Invalidated %s keys tagged `%s` in cache store `%s`", len(members), tag, store.value)
+        return invalidated
+
+    def bind(self, access_pattern: AccessPatternDB) -> BoundAccessPatternDB[T]:
+        """Compile `access_pattern` into a handle with `get(**kwargs)` / `set(value, **kwargs)`."""
+        return BoundAccessPatternDB(self, access_pattern)
+
+    def _strategy(self, access_pattern: AccessPatternDB) -> EncodingStrategy:
+        return EncodingStrategy.PICKLE
+
+    def _set_key(self, value: T, access_pattern: AccessPatternDB, encoding_strategy: EncodingStrategy, store: BaseCache, key: str, timeout: int | None = None):
+        if timeout is None and isinstance(value, NegativeResult):
+            timeout = access_pattern.negative_ttl.value
+        super()._set_key(value, access_pattern, encoding_strategy, store, key, timeout)
+        if access_pattern.tags:
+            self._tag(access_pattern, [key])
+
+    def _set_many(self, values: list[T], access_pattern: AccessPatternDB, encoding_strategy: EncodingStrategy, kwargs_list: list[dict], timeout: int | None = None):
+        negative = [i for i, value in enumerate(values) if isinstance(value, NegativeResult)]
+        if timeout is None and negative:
+            # Empty results expire on their own TTL, so they go in a separate batch
+            positive = [i for i, value in enumerate(values) if not isinstance(value, NegativeResult)]
+            if positive:
+                super()._set_many([values[i] for i in positive], access_pattern, encoding_strategy, [kwargs_list[i] for i in positive])
+            super()._set_many(
+                [values[i] for i in negative],
+                access_pattern,
+                encoding_strategy,
+                [kwargs_list[i] for i in negative],
+                access_pattern.negative_ttl.value,
+            )
+        else:
+            super()._set_many(values, access_pattern, encoding_strategy, kwargs_list, timeout)
+        if access_pattern.tags:
+            self._tag(access_pattern, [self._key(access_pattern, **kwargs) for kwargs in kwargs_list])
+
+    def _pipeline_encode(self, value: T, access_pattern: AccessPatternDB) -> tuple[bytes, int]:
+        wrapped = self._wrap(value, access_pattern, 0.0)
+        timeout = access_pattern.negative_ttl.value if isinstance(wrapped, NegativeResult) else access_pattern.ttl.value
+        return self._encode(wrapped, EncodingStrategy.PICKLE, access_pattern), timeout
+
+    def _pipeline_decode(self, data: bytes | None, access_pattern: AccessPatternDB, **kwargs) -> T:
+        if data is None:
+            return self._unwrap_negative(self._read_through(access_pattern, **kwargs))
+        return self._unwrap_negative(self._unwrap(data, access_pattern, **kwargs))
+
+    def _pipeline_fallback(self, access_pattern: AccessPatternDB, **kwargs) -> T:
+        return self._get_from_db(access_pattern, **kwargs)
+
+    def _pipeline_written(self, access_pattern: AccessPatternDB, keys: list[str]):
+        super()._pipeline_written(access_pattern, keys)
+        if access_pattern.tags:
+            self._tag(access_pattern, keys)
+
+    def _tag(self, access_pattern: AccessPatternDB, keys: list[str]):
+        self._tag_members(
+            access_pattern.store, access_pattern.tags, [f"{access_pattern.version}:{key}" for key in keys], access_pattern.ttl.value
+        )
 
+    def _tag_members(self, store: CacheStoreEnum, tags: tuple[str, ...], members: list[str], ttl: int):
+        # A lost tag only delays invalidation until the TTL, so it never fails the write
+        try:
+            self.tag_index.add(store, tags, members, ttl)
+        except Exception:
+            logger.error("Unable to record tags `%s` for %s keys in cache store `%s`", tags, len(members), store.value, exc_info=True)
+
+    def _flight_key(self, access_pattern: AccessPatternDB, **kwargs) -> Hashable:
+        return (access_pattern.store.value, access_pattern.version, self._key(access_pattern, **kwargs))
+
+    def _read_through(self, access_pattern: AccessPatternDB, **kwargs) -> T:
+        flight_key = self._flight_key(access_pattern, **kwargs)
+        return self._single_flight.do(flight_key, lambda: self._rebuild(access_pattern, **kwargs))
+
+    def _rebuild(self, access_pattern: AccessPatternDB, **kwargs) -> T:
+        if access_pattern.lock_ttl is None:
+            return self._load(access_pattern, **kwargs)
+
+        token = uuid4().hex
+        if self._acquire_lock(access_pattern, token, **kwargs):
+            try:
+                return self._load(access_pattern, **kwargs)
+            finally:
+                self._release_lock(access_pattern, token, **kwargs)
+
+        cached_data = self._wait_for_rebuild(access_pattern, **kwargs)
+        if cached_data is None:
+            logger.warning("Timed out waiting for rebuild lock with AccessPattern `%s`, querying DB", access_pattern.__class__.__name__)
+            return self._load(access_pattern, **kwargs)
         return cached_data
 
-    def _get_from_db(self, access_pattern: AccessPatternDB) -> T:
+    def _load(self, access_pattern: AccessPatternDB, **kwargs) -> T:
+        started = time.monotonic()
+        db_data = self._get_from_db(access_pattern, **kwargs)
+        value = self._wrap(db_data, access_pattern, time.monotonic() - started)
+        if access_pattern.background_write:
+            self._executor().submit(self._write_safely, value, access_pattern, **kwargs)
+        else:
+            self._write_safely(value, access_pattern, **kwargs)
+        return db_data
+
+    def _wrap(self, db_data: T, access_pattern: AccessPatternDB, delta: float) -> T | CacheEnvelope | NegativeResult:
+        if access_pattern.negative_ttl is not None and NegativeResult.is_empty(db_data):
+            return NegativeResult(db_data)
+        if not access_pattern.refreshes_early:
+            return db_data
+        fresh_for = (access_pattern.soft_ttl or access_pattern.ttl).value
+        return CacheEnvelope(value=db_data, refresh_at=time.time() + fresh_for, delta=delta)
+
+    def _maybe_refresh(self, envelope: CacheEnvelope, access_pattern: AccessPatternDB, **kwargs):
+        if not envelope.should_refresh(access_pattern.xfetch_beta):
+            return
+        flight_key = self._flight_key(access_pattern, **kwargs)
+        with self._refreshing_lock:
+            if flight_key in self._refreshing:
+                return
+            self._refreshing.add(flight_key)
+        logger.debug("Scheduling background refresh with AccessPattern `%s`", access_pattern.__class__.__name__)
+        self._executor().submit(self._refresh, flight_key, access_pattern, **kwargs)
+
+    def _refresh(self, flight_key: Hashable, access_pattern: AccessPatternDB, **kwargs):
+        try:
+            if access_pattern.lock_ttl is None:
+                self._load(access_pattern, **kwargs)
+                return
+            token = uuid4().hex
+            if not self._acquire_lock(access_pattern, token, **kwargs):
+                logger.debug("Background refresh with AccessPattern `%s` already running elsewhere", access_pattern.__class__.__name__)
+                return
+            try:
+                self._load(access_pattern, **kwargs)
+            finally:
+                self._release_lock(access_pattern, token, **kwargs)
+        except Exception:
+            logger.warning("Background refresh failed with AccessPattern `%s`, serving stale data", access_pattern.__class__.__name__, exc_info=True)
+        finally:
+            with self._refreshing_lock:
+                self._refreshing.discard(flight_key)
+
+    def _write_safely(self, db_data: T | CacheEnvelope, access_pattern: AccessPatternDB, **kwargs):
+        try:
+            self._set(
+                value=db_data,
+                access_pattern=access_pattern,
+                encoding_strategy=EncodingStrategy.PICKLE,
+                **kwargs
+            )
+        except RedisClientException:
+            logger.warning("Read-through cache write failed with AccessPattern `%s`, returning DB data", access_pattern.__class__.__name__)
+
+    def _lock_key(self, access_pattern: AccessPatternDB, **kwargs) -> str:
+        return f"{self._key(access_pattern, **kwargs)}:lock"
+
+    def _acquire_lock(self, access_pattern: AccessPatternDB, token: str, **kwargs) -> bool:
+        store = self._store(access_pattern)
+        lock_key = self._lock_key(access_pattern, **kwargs)
+        try:
+            acquired = store.add(
+                key=lock_key,
+                value=token,
+                timeout=access_pattern.lock_ttl.value,
+                version=access_pattern.version,
+            )
+        except Exception:
+            logger.warning("Unable to take rebuild lock `%s`, rebuilding without it", lock_key, exc_info=True)
+            return True
+        else:
+            logger.debug("Rebuild lock `%s` acquired: %s", lock_key, acquired)
+            return acquired
+
+    def _release_lock(self, access_pattern: AccessPatternDB, token: str, **kwargs):
+        store = self._store(access_pattern)
+        lock_key = self._lock_key(access_pattern, **kwargs)
         try:
-            db_data = access_pattern.query(**access_pattern.params)
+            if store.get(lock_key, version=access_pattern.version) == token:
+                store.delete(lock_key, version=access_pattern.version)
+        except Exception:
+            logger.warning("Unable to release rebuild lock `%s`, it will expire on its own", lock_key, exc_info=True)
+
+    def _wait_for_rebuild(self, access_pattern: AccessPatternDB, **kwargs) -> T | None:
+        deadline = time.monotonic() + access_pattern.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self._lock_poll_interval)
+            try:
+                cached_data = self._get_from_cache(access_pattern, **kwargs)
+            except RedisClientException:
+                return None
+            if cached_data is not None:
+                return cached_data
+        return None
+
+    @classmethod
+    def _executor(cls) -> ThreadPoolExecutor:
+        if cls._write_executor is None:
+            cls._write_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-write")
+        return cls._write_executor
+
+    def _get_from_db(self, access_pattern: AccessPatternDB, **kwargs) -> T:
+        started = time.perf_counter()
+        try:
+            if access_pattern.query_timeout is None:
+                db_data = self._query(access_pattern, **kwargs)
+            else:
+                db_data = self._query_with_timeout(access_pattern, **kwargs)
+        except OperationalError as e:
+            if access_pattern.query_timeout is None:
+                msg = f"Unexpected error when querying DB with AccessPattern `{access_pattern.__class__.__name__}`"
+            else:
+                msg = f"DB query with AccessPattern `{access_pattern.__class__.__name__}` failed or exceeded its {access_pattern.query_timeout}s timeout"
+            logger.error(msg, exc_info=True)
+            raise RedisClientException(msg) from e
         except Exception as e:
             msg = f"Unexpected error when querying DB with AccessPattern `{access_pattern.__class__.__name__}`"
             logger.error(msg, exc_info=True)
             raise RedisClientException(msg) from e
         else:
-            logger.debug(f"Successfully queried DB with AccessPattern `{access_pattern.__class__.__name__}`")
+            self._record(MetricEvent.DB_QUERY_TIME, access_pattern, time.perf_counter() - started)
+            logger.debug("Successfully queried DB with AccessPattern `%s`", access_pattern.__class__.__name__)
+        return db_data
+
+    def _query(self, access_pattern: AccessPatternDB, **kwargs) -> T:
+        db_data = access_pattern.query(**access_pattern.query_params(**kwargs))
+        if access_pattern.projection is not None:
+            return ProjectedRows.from_data(db_data, access_pattern.projection)
+        if isinstance(db_data, QuerySet):
+            return list(db_data)
+        return db_data
+
+    def _query_with_timeout(self, access_pattern: AccessPatternDB, **kwargs) -> T:
+        """
+        Run the query with a PostgreSQL `statement_timeout` of `query_timeout`.
+        The setting is transaction-local and restored afterwards, so it never
+        leaks into an enclosing (e.g. ATOMIC_REQUESTS) transaction. Other
+        databases run the query without a timeout.
+        """
+        connection = connections[DEFAULT_DB_ALIAS]
+        if connection.vendor != "postgresql":
+            logger.debug("query_timeout is only enforced on PostgreSQL, not `%s`", connection.vendor)
+            return self._query(access_pattern, **kwargs)
+
+        with transaction.atomic(using=DEFAULT_DB_ALIAS):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT current_setting('statement_timeout'), set_config('statement_timeout', %s, true)",
+                    [f"{int(access_pattern.query_timeout * 1000)}ms"],
+                )
+                previous = cursor.fetchone()[0]
+            # The whole result is fetched here, while the timeout applies
+            db_data = self._query(access_pattern, **kwargs)
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT set_config('statement_timeout', %s, true)", [previous])
         return db_data
 
     def _set_from_db(self, access_pattern: AccessPatternDB, **kwargs):
-        db_data = self._get_from_db(access_pattern)
+        started = time.monotonic()
+        db_data = self._get_from_db(access_pattern, **kwargs)
         self._set(
-            value=db_data,
+            value=self._wrap(db_data, access_pattern, time.monotonic() - started),
             access_pattern=access_pattern,
             encoding_strategy=EncodingStrategy.PICKLE,
             **kwargs
@@ -66,5 +452,24 @@ class CacheClientDB(BaseCacheClient[T]):
     def _get_from_cache(self, access_pattern, **kwargs) -> T | None:
         cached_data = self._get(access_pattern, **kwargs)
         if cached_data is not None:
-            return self._decode(cached_data, access_pattern, EncodingStrategy.PICKLE)
-        return None
\ No newline at end of file
+            return self._unwrap(cached_data, access_pattern, **kwargs)
+        return None
+
+    def _unwrap(self, cached_data: bytes, access_pattern: AccessPatternDB, **kwargs) -> T:
+        decoded = self._decode(cached_data, access_pattern, EncodingStrategy.PICKLE)
+        return self._unwrap_decoded(decoded, len(cached_data), access_pattern, **kwargs)
+
+    def _unwrap_decoded(self, decoded: Any, size: int, access_pattern: AccessPatternDB, **kwargs) -> T | NegativeResult:
+        if isinstance(decoded, NegativeResult):
+            # Kept wrapped until `get` returns, so a cached `None` isn't taken for a miss
+            self._record(MetricEvent.NEGATIVE_HIT, access_pattern)
+            return decoded
+        if isinstance(decoded, CacheEnvelope):
+            self._maybe_refresh(decoded, access_pattern, **kwargs)
+            decoded = decoded.value
+        self._set_local(decoded, access_pattern, size, **kwargs)
+        return decoded
+
+    @staticmethod
+    def _unwrap_negative(data: T | NegativeResult) -> T:
+        return data.value if isinstance(data, NegativeResult) else data
@@ -0,0 +1,250 @@
+import json
+import logging
+from dataclasses import asdict, fields, is_dataclass
+from time import perf_counter
+from typing import Any, Callable, TypeVar
+from django_redis import get_redis_connection
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+from redis.exceptions import DataError, ResponseError, WatchError
+from .base import BaseCacheClient
+from ..enums import MetricEvent
+from ..exc import RedisClientException, InvalidAccessPattern, NoSessionFound
+from ..access_patterns import BaseCacheAccessPattern
+
+T = TypeVar("T")
+logger = logging.getLogger(__name__)
+
+
+# Partial writes only apply to sessions that already exist, so an update racing
+# an expiry can't leave behind a session with a handful of fields.
+_UPDATE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return 0 end
+redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return 1
+"""
+
+_INCR_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return false end
+local value = redis.call('HINCRBY', KEYS[1], ARGV[2], ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return value
+"""
+
+
+class SessionCacheClient(BaseCacheClient[T]):
+    """
+    Cache client for phone and user sessions stored as Redis hashes.
+
+    Each field of the session dataclass (`access_pattern.value_type`) is its
+    own JSON-encoded hash field, so an inbound SMS that changes one field
+    writes only that field instead of re-encoding the whole session, and two
+    concurrent messages changing different fields can't overwrite each other.
+
+    Key characteristics:
+    - `get` reads the hash and slides its TTL in one pipelined round trip
+    - `update`/`incr` change fields atomically, refreshing the TTL in the same
+      script, and only on sessions that exist
+    - `transaction` is an optimistic read-modify-write (WATCH/MULTI) for
+      changes that depend on the current state, retried on conflict
+    - `NoSessionFound` is raised when the session doesn't exist, and
+      `InvalidAccessPattern` when Redis rejects a command for the data at the
+      key (a non-hash value, a non-integer field for `incr`)
+    - Sessions are mutable, so the L1 tier is never used
+
+    Requires the pattern's store to be a django-redis cache. Shares the circuit
+    breaker and metrics of the other clients.
+
+    Usage:
+        sessions = SessionCacheClient(CacheCircuitBreaker())
+        sessions.set(PhoneSession(phone=phone, step="menu"), PHONE_SESSION, phone=phone)
+        sessions.update(PHONE_SESSION, {"step": "shelters"}, phone=phone)
+        sessions.incr(PHONE_SESSION, "message_count", phone=phone)
+    """
+    _scripts: dict[tuple[str, str], Any] = {}
+
+    def get(self, access_pattern: BaseCacheAccessPattern, **kwargs) -> T:
+        raw = self._execute(access_pattern, "read", lambda conn, key: self._read(conn, key, access_pattern), **kwargs)
+        if not raw:
+            self._record(MetricEvent.MISS, access_pattern)
+            raise NoSessionFound(f"No session found in store `{access_pattern.store.value}` for kwargs `{kwargs}`")
+        self._record(MetricEvent.HIT, access_pattern)
+        return self._build(raw, access_pattern)
+
+    def get_or_none(self, access_pattern: BaseCacheAccessPattern, **kwargs) -> T | None:
+        try:
+            return self.get(access_pattern, **kwargs)
+        except NoSessionFound:
+            return None
+
+    def set(self, value: T, access_pattern: BaseCacheAccessPattern, **kwargs):
+        """Replace the whole session."""
+        mapping = self._encode_fields(self._as_dict(value, access_pattern), access_pattern)
+
+        def write(conn, key):
+            pipeline = conn.pipeline(transaction=True)
+            pipeline.delete(key)
+            pipeline.hset(key, mapping=mapping)
+            pipeline.expire(key, access_pattern.ttl.value)
+            pipeline.execute()
+
+        self._execute(access_pattern, "write", write, **kwargs)
+
+    def update(self, access_pattern: BaseCacheAccessPattern, changes: dict[str, Any], **kwargs):
+        """Set some fields of an existing session and slide its TTL."""
+        if not changes:
+            return
+        args = [access_pattern.ttl.value]
+        for field, value in self._encode_fields(changes, access_pattern).items():
+            args += [field, value]
+        updated = self._execute(
+            access_pattern,
+            "update",
+            lambda conn, key: self._script(conn, access_pattern, "update", _UPDATE_SCRIPT)(keys=[key], args=args),
+            **kwargs
+        )
+        if not updated:
+            raise NoSessionFound(f"No session found in store `{access_pattern.store.value}` for kwargs `{kwargs}`")
+
+    def incr(self, access_pattern: BaseCacheAccessPattern, field: str, amount: int = 1, **kwargs) -> int:
+        """Atomically add `amount` to an integer field of an existing session and slide its TTL."""
+        self._check_fields([field], access_pattern)
+        value = self._execute(
+            access_pattern,
+            "incr",
+            lambda conn, key: self._script(conn, access_pattern, "incr", _INCR_SCRIPT)(
+                keys=[key], args=[access_pattern.ttl.value, field, amount]
+            ),
+            **kwargs
+        )
+        if value is None:
+            raise NoSessionFound(f"No session found in store `{access_pattern.store.value}` for kwargs `{kwargs}`")
+        return int(value)
+
+    def touch(self, access_pattern: BaseCacheAccessPattern, **kwargs):
+        """Slide the TTL of an existing session without reading it."""
+        if not self._execute(access_pattern, "touch", lambda conn, key: conn.expire(key, access_pattern.ttl.value), **kwargs):
+            raise NoSessionFound(f"No session found in store `{access_pattern.store.value}` for kwargs `{kwargs}`")
+
+    def transaction(self, access_pattern: BaseCacheAccessPattern, fn: Callable[[T], T], retries: int = 5, **kwargs) -> T:
+        """
+        Optimistic read-modify-write: `fn` receives the current session and
+        returns the new one, which is written only if nobody changed the
+        session in between. On a conflict `fn` is re-run on the fresh state, up
+        to `retries` times before RedisClientException is raised.
+        """
+        def attempt(conn, key) -> tuple[bool | None, T | None]:
+            with conn.pipeline(transaction=True) as pipeline:
+                for _ in range(retries):
+                    try:
+                        pipeline.watch(key)
+                        raw = pipeline.hgetall(key)
+                        if not raw:
+                            return False, None
+                        value = fn(self._build(raw, access_pattern))
+                        pipeline.multi()
+                        pipeline.delete(key)
+                        pipeline.hset(key, mapping=self._encode_fields(self._as_dict(value, access_pattern), access_pattern))
+                        pipeline.expire(key, access_pattern.ttl.value)
+                        pipeline.execute()
+                        return True, value
+                    except WatchError:
+                        logger.debug("Session `%s` changed during transaction, retrying", key)
+                        continue
+            # Contention isn't a Redis failure, so it mustn't count against the circuit breaker
+            return None, None
+
+        found, value = self._execute(access_pattern, "transaction", attempt, **kwargs)
+        if found is None:
+            msg = f"Session in store `{access_pattern.store.value}` for kwargs `{kwargs}` kept changing, gave up after {retries} attempts"
+            logger.warning(msg)
+            raise RedisClientException(msg)
+        if not found:
+            raise NoSessionFound(f"No session found in store `{access_pattern.store.value}` for kwargs `{kwargs}`")
+        return value
+
+    def pipeline(self):
+        # CachePipeline gets and sets whole encoded values, which sessions aren't
+        raise InvalidAccessPattern("Sessions are Redis hashes; use `update`, `incr` or `transaction` instead of a pipeline")
+
+    def _execute(self, access_pattern: BaseCacheAccessPattern, operation: str, fn: Callable, **kwargs) -> Any:
+        if not self.circuit_breaker.allow(access_pattern.store):
+            msg = f"Cache circuit breaker open. Can not {operation} session in store `{access_pattern.store.value}`"
+            logger.critical(msg)
+            raise RedisClientException(msg)
+
+        key = self._redis_key(access_pattern, **kwargs)
+        started = perf_counter()
+        try:
+            result = fn(get_redis_connection(access_pattern.store.value), key)
+        except (RedisConnectionError, RedisTimeoutError) as e:
+            self.circuit_breaker.fail(access_pattern.store)
+            msg = f"Unexpected error during session {operation} in store `{access_pattern.store.value}` with key `{key}`"
+            logger.error(msg, exc_info=True)
+            raise RedisClientException(msg) from e
+        except (ResponseError, DataError) as e:
+            # Redis answered, so the store is healthy: the command doesn't fit
+            # the data, e.g. WRONGTYPE on a session CacheClient wrote as a string
+            # (`invalidate()` removes it) or HINCRBY on a non-integer field
+            self.circuit_breaker.success(access_pattern.store)
+            msg = f"Session {operation} rejected in store `{access_pattern.store.value}` with key `{key}`: {e}"
+            logger.error(msg)
+            raise InvalidAccessPattern(msg) from e
+        except Exception:
+            # Errors raised by the caller's own code (e.g. a `transaction` fn)
+            # aren't store failures and propagate unchanged
+            self.circuit_breaker.success(access_pattern.store)
+            raise
+        else:
+            self.circuit_breaker.success(access_pattern.store)
+            self._record(MetricEvent.CACHE_LATENCY, access_pattern, perf_counter() - started)
+            logger.debug("Session %s in store `%s` with key `%s`", operation, access_pattern.store.value, key)
+            return result
+
+    def _read(self, conn, key: str, access_pattern: BaseCacheAccessPattern) -> dict[bytes, bytes]:
+        pipeline = conn.pipeline(transaction=False)
+        pipeline.hgetall(key)
+        pipeline.expire(key, access_pattern.ttl.value)
+        raw, _ = pipeline.execute()
+        return raw
+
+    def _redis_key(self, access_pattern: BaseCacheAccessPattern, **kwargs) -> str:
+        # Same key the Django cache API would use, so `invalidate()` deletes the hash
+        return self._store(access_pattern).make_key(self._key(access_pattern, **kwargs), version=access_pattern.version)
+
+    def _script(self, conn, access_pattern: BaseCacheAccessPattern, name: str, source: str):
+        script = self._scripts.get((access_pattern.store.value, name))
+        if script is None:
+            script = self._scripts[(access_pattern.store.value, name)] = conn.register_script(source)
+        return script
+
+    def _build(self, raw: dict[bytes, bytes], access_pattern: BaseCacheAccessPattern) -> T:
+        known = {field.name for field in fields(access_pattern.value_type)}
+        values = {}
+        for field, value in raw.items():
+            name = field.decode("utf-8") if isinstance(field, bytes) else field
+            # Fields dropped from the dataclass since the session was written are ignored
+            if name in known:
+                values[name] = json.loads(value)
+        return access_pattern.value_type(**values)
+
+    def _as_dict(self, value: T, access_pattern: BaseCacheAccessPattern) -> dict[str, Any]:
+        if not is_dataclass(value) or not isinstance(value, access_pattern.value_type):
+            raise InvalidAccessPattern(
+                f"{access_pattern.__class__.__name__} expects a `{access_pattern.value_type.__name__}` session, got `{type(value)}`"
+            )
+        return asdict(value)
+
+    def _encode_fields(self, values: dict[str, Any], access_pattern: BaseCacheAccessPattern) -> dict[str, str]:
+        self._check_fields(values, access_pattern)
+        try:
+            return {field: json.dumps(value) for field, value in values.items()}
+        except (TypeError, ValueError) as e:
+            msg = f"Cannot serialize session fields `{list(values)}` to JSON"
+            logger.error(msg, exc_info=True)
+            raise RedisClientException(msg) from e
+
+    def _check_fields(self, names, access_pattern: BaseCacheAccessPattern):
+        unknown = set(names) - {field.name for field in fields(access_pattern.value_type)}
+        if unknown:
+            raise InvalidAccessPattern(f"`{access_pattern.value_type.__name__}` has no fields `{sorted(unknown)}`")
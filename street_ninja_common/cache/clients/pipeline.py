@@ -0,0 +1,183 @@
+import logging
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Generic, NamedTuple, TypeVar
+from django.core.cache.backends.base import BaseCache
+from django_redis.cache import RedisCache
+from ..enums import CacheStoreEnum, MetricEvent
+from ..exc import RedisClientException
+from ..access_patterns import BaseCacheAccessPattern
+
+if TYPE_CHECKING:
+    from .base import BaseCacheClient
+
+T = TypeVar("T")
+logger = logging.getLogger(__name__)
+
+_PENDING = object()
+
+
+class PipelineResult(Generic[T]):
+    """Value of a pipelined `get`, available once the pipeline has been executed."""
+
+    __slots__ = ("_value", "_error")
+
+    def __init__(self):
+        self._value: Any = _PENDING
+        self._error: BaseException | None = None
+
+    @property
+    def value(self) -> T:
+        if self._error is not None:
+            raise self._error
+        if self._value is _PENDING:
+            raise RuntimeError("Pipeline hasn't been executed yet")
+        return self._value
+
+    def _resolve(self, fn, *args, **kwargs):
+        try:
+            self._value = fn(*args, **kwargs)
+        except Exception as e:
+            self._error = e
+
+
+class _Op(NamedTuple):
+    access_pattern: BaseCacheAccessPattern
+    key: str
+    kwargs: dict
+    # Pending result of a get, or `(data, timeout)` of a set
+    result: PipelineResult | None
+    payload: tuple[bytes, int] | None
+
+
+class CachePipeline(Generic[T]):
+    """
+        Buffers gets and sets across access patterns and sends them together:
+        one round trip per store on django-redis stores, one call per
+        operation on other backends. Values are read and written exactly as the
+        client's own `get`/`set` would, L1 hits never leave the process, and
+        the circuit breaker is consulted and updated once per store.
+
+        On an open breaker or a Redis error, gets resolve as the client does
+        without a cache (`None`, or the DB for `CacheClientDB`) and, if any
+        sets were buffered, `RedisClientException` is raised after every store
+        has been tried.
+
+        Usage:
+            with client.pipeline() as pipeline:
+                shelters = pipeline.get(SHELTERS)
+                pipeline.set(menu, PHONE_MENU, phone=phone)
+            shelters.value
+    """
+
+    def __init__(self, client: "BaseCacheClient[T]"):
+        self.client = client
+        self._ops: list[_Op] = []
+
+    def __enter__(self) -> "CachePipeline[T]":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.execute()
+        else:
+            self._ops = []
+
+    def __len__(self) -> int:
+        return len(self._ops)
+
+    def get(self, access_pattern: BaseCacheAccessPattern, **kwargs) -> PipelineResult[T]:
+        result = PipelineResult()
+        local_data = self.client._get_local(access_pattern, **kwargs)
+        if local_data is not None:
+            result._value = local_data
+            return result
+        self._ops.append(_Op(access_pattern, self.client._key(access_pattern, **kwargs), kwargs, result, None))
+        return result
+
+    def set(self, value: T, access_pattern: BaseCacheAccessPattern, **kwargs):
+        key = self.client._key(access_pattern, **kwargs)
+        self._ops.append(_Op(access_pattern, key, kwargs, None, self.client._pipeline_encode(value, access_pattern)))
+
+    def execute(self):
+        ops, self._ops = self._ops, []
+        by_store: dict[CacheStoreEnum, list[_Op]] = {}
+        for op in ops:
+            by_store.setdefault(op.access_pattern.store, []).append(op)
+
+        errors = []
+        for store, store_ops in by_store.items():
+            try:
+                self._execute_store(store, store_ops)
+            except RedisClientException as e:
+                errors.append(e)
+        if errors:
+            raise errors[0]
+
+    def _execute_store(self, store: CacheStoreEnum, ops: list[_Op]):
+        writes = sum(op.result is None for op in ops)
+        if not self.client.circuit_breaker.allow(store):
+            logger.warning("Cache circuit breaker open. Pipeline bypassing cache store `%s`", store.value)
+            self._fallback(ops)
+            if writes:
+                raise RedisClientException(f"Cache circuit breaker open. {writes} pipelined writes to store `{store.value}` not applied")
+            return
+
+        backend = self.client._store(ops[0].access_pattern)
+        started = perf_counter()
+        try:
+            replies = self._send(backend, ops)
+        except Exception as e:
+            self.client.circuit_breaker.fail(store)
+            msg = f"Unexpected error executing a pipeline of {len(ops)} operations in cache store `{store.value}`"
+            logger.error(msg, exc_info=True)
+            self._fallback(ops)
+            if writes:
+                raise RedisClientException(msg) from e
+            return
+
+        self.client.circuit_breaker.success(store)
+        self.client.metrics.record(MetricEvent.CACHE_LATENCY, self.__class__.__name__, store.value, perf_counter() - started)
+        # Keyed by id(): patterns with dict params aren't hashable
+        written: dict[int, tuple[BaseCacheAccessPattern, list[str]]] = {}
+        for op, reply in zip(ops, replies):
+            if op.result is None:
+                written.setdefault(id(op.access_pattern), (op.access_pattern, []))[1].append(op.key)
+                continue
+            if reply is not None:
+                self.client._record(MetricEvent.HIT, op.access_pattern)
+                self.client._record(MetricEvent.PAYLOAD_BYTES, op.access_pattern, len(reply))
+            else:
+                self.client._record(MetricEvent.MISS, op.access_pattern)
+            op.result._resolve(self.client._pipeline_decode, reply, op.access_pattern, **op.kwargs)
+        for access_pattern, keys in written.values():
+            self.client._pipeline_written(access_pattern, keys)
+        logger.debug("Pipeline of %s operations executed in cache store `%s`", len(ops), store.value)
+
+    def _fallback(self, ops: list[_Op]):
+        for op in ops:
+            if op.result is not None:
+                op.result._resolve(self.client._pipeline_fallback, op.access_pattern, **op.kwargs)
+
+    @staticmethod
+    def _send(backend: BaseCache, ops: list[_Op]) -> list[Any]:
+        if not isinstance(backend, RedisCache):
+            # Backends without pipelining run the operations one by one
+            return [
+                backend.get(op.key, version=op.access_pattern.version) if op.result is not None
+                else backend.set(op.key, op.payload[0], timeout=op.payload[1], version=op.access_pattern.version)
+                for op in ops
+            ]
+
+        client = backend.client
+        pipeline = client.get_client(write=True).pipeline(transaction=False)
+        for op in ops:
+            key = client.make_key(op.key, version=op.access_pattern.version)
+            if op.result is not None:
+                pipeline.get(key)
+            else:
+                pipeline.set(key, client.encode(op.payload[0]), ex=op.payload[1])
+        replies = pipeline.execute()
+        return [
+            client.decode(reply) if op.result is not None and reply is not None else reply
+            for op, reply in zip(ops, replies)
+        ]
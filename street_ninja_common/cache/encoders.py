@@ -1,17 +1,218 @@
-from dataclasses import asdict
+from dataclasses import asdict, fields, is_dataclass
 import json
 import logging
 import pickle
+import zlib
 from typing import Any
 from django.db.models import QuerySet
+from .enums import CompressionStrategy, EncodingStrategy
 from .exc import RedisClientException
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import lz4.frame as lz4
+except ImportError:
+    lz4 = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 
 logger = logging.getLogger(__name__)
 
 
+# Blobs written by `DataEncoder.encode` in one of the newer formats start with a
+# single header byte: high nibble = codec, low nibble = compression. Legacy JSON
+# blobs always start with `{` (0x7B) and legacy pickles with 0x80, so neither
+# can be mistaken for a header and both formats stay readable during a rolling
+# deploy.
+_CODEC_IDS = {
+    EncodingStrategy.JSON: 0x1,
+    EncodingStrategy.PICKLE: 0x2,
+    EncodingStrategy.ORJSON: 0x3,
+    EncodingStrategy.MSGPACK: 0x4,
+}
+_COMPRESSION_IDS = {
+    None: 0x0,
+    CompressionStrategy.ZLIB: 0x1,
+    CompressionStrategy.LZ4: 0x2,
+    CompressionStrategy.ZSTD: 0x3,
+}
+_CODECS_BY_ID = {v: k for k, v in _CODEC_IDS.items()}
+_COMPRESSIONS_BY_ID = {v: k for k, v in _COMPRESSION_IDS.items()}
+_LEGACY_STRATEGIES = (EncodingStrategy.JSON, EncodingStrategy.PICKLE)
+_PICKLE_PROTO = b"\x80"
+
+
 class DataEncoder:
 
+    @classmethod
+    def encode(
+            cls,
+            value: Any,
+            strategy: EncodingStrategy,
+            compression: CompressionStrategy | None = None,
+            compression_threshold: int = 1024,
+    ) -> bytes:
+        """
+        Encode `value` with `strategy`, compressing payloads of at least
+        `compression_threshold` bytes. Uncompressed JSON and pickle payloads are
+        written headerless so that older readers can still decode them.
+        """
+        match strategy:
+            case EncodingStrategy.JSON:
+                data = cls.serialize(value)
+            case EncodingStrategy.PICKLE:
+                data = cls.pickle(value)
+            case EncodingStrategy.ORJSON:
+                data = cls.orjson_dumps(value)
+            case EncodingStrategy.MSGPACK:
+                data = cls.msgpack_dumps(value)
+            case _:
+                msg = f"Invalid EncodingStrategy for encoding: `{strategy}`"
+                logger.error(msg)
+                raise RedisClientException(msg)
+
+        if compression is None or len(data) < compression_threshold:
+            compression = None
+            if strategy in _LEGACY_STRATEGIES:
+                return data
+        else:
+            data = cls.compress(data, compression)
+
+        header = (_CODEC_IDS[strategy] << 4) | _COMPRESSION_IDS[compression]
+        return bytes((header,)) + data
+
+    @classmethod
+    def decode(cls, data: bytes, strategy: EncodingStrategy) -> tuple[Any, EncodingStrategy]:
+        """
+        Decode a blob written by `encode`. Headerless blobs are legacy JSON or
+        pickle; pickles are recognised by their protocol byte and anything else
+        is decoded with `strategy`. Returns the decoded object and the codec
+        that was used.
+        """
+        header = data[0] if data else 0
+        codec = _CODECS_BY_ID.get(header >> 4)
+        compression_id = header & 0x0F
+        if codec is not None and compression_id in _COMPRESSIONS_BY_ID:
+            strategy = codec
+            data = data[1:]
+            compression = _COMPRESSIONS_BY_ID[compression_id]
+            if compression is not None:
+                data = cls.decompress(data, compression)
+        elif data[:1] == _PICKLE_PROTO:
+            strategy = EncodingStrategy.PICKLE
+
+        match strategy:
+            case EncodingStrategy.JSON:
+                return cls.deserialize(data), strategy
+            case EncodingStrategy.PICKLE:
+                return cls.unpickle(data), strategy
+            case EncodingStrategy.ORJSON:
+                return cls.orjson_loads(data), strategy
+            case EncodingStrategy.MSGPACK:
+                return cls.msgpack_loads(data), strategy
+            case _:
+                msg = f"Invalid EncodingStrategy for decoding: `{strategy}`"
+                logger.error(msg)
+                raise RedisClientException(msg)
+
+    @staticmethod
+    def orjson_dumps(value: Any) -> bytes:
+        if orjson is None:
+            raise RedisClientException("EncodingStrategy.ORJSON requires the `orjson` package")
+        try:
+            # orjson serializes dataclasses natively, without the deep copy made by `asdict`
+            return orjson.dumps(value)
+        except TypeError as e:
+            msg = f"Cannot serialize {type(value)} with orjson: {e}"
+            logger.error(msg, exc_info=True)
+            raise RedisClientException(msg) from e
+
+    @staticmethod
+    def orjson_loads(data: bytes) -> Any:
+        if orjson is None:
+            raise RedisClientException("EncodingStrategy.ORJSON requires the `orjson` package")
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError as e:
+            msg = f"Failed to deserialize cached data with orjson: {e}"
+            logger.error(msg, exc_info=True)
+            raise RedisClientException(msg) from e
+
+    @classmethod
+    def msgpack_dumps(cls, value: Any) -> bytes:
+        if msgpack is None:
+            raise RedisClientException("EncodingStrategy.MSGPACK requires the `msgpack` package")
+        try:
+            return msgpack.packb(value, default=cls._msgpack_default)
+        except (TypeError, ValueError) as e:
+            msg = f"Cannot serialize {type(value)} with msgpack: {e}"
+            logger.error(msg, exc_info=True)
+            raise RedisClientException(msg) from e
+
+    @staticmethod
+    def msgpack_loads(data: bytes) -> Any:
+        if msgpack is None:
+            raise RedisClientException("EncodingStrategy.MSGPACK requires the `msgpack` package")
+        try:
+            return msgpack.unpackb(data)
+        except Exception as e:
+            msg = f"Failed to deserialize cached data with msgpack: {e}"
+            logger.error(msg, exc_info=True)
+            raise RedisClientException(msg) from e
+
+    @staticmethod
+    def _msgpack_default(obj: Any) -> Any:
+        # Shallow per-level dict; msgpack calls back in for nested dataclasses
+        if is_dataclass(obj) and not isinstance(obj, type):
+            return {f.name: getattr(obj, f.name) for f in fields(obj)}
+        raise TypeError(f"Object of type {type(obj)} is not msgpack serializable")
+
+    @staticmethod
+    def compress(data: bytes, compression: CompressionStrategy) -> bytes:
+        match compression:
+            case CompressionStrategy.ZLIB:
+                return zlib.compress(data, 1)
+            case CompressionStrategy.LZ4 if lz4 is not None:
+                return lz4.compress(data)
+            case CompressionStrategy.ZSTD if zstandard is not None:
+                return zstandard.ZstdCompressor(level=3).compress(data)
+            case _:
+                msg = f"CompressionStrategy `{compression}` is unavailable, is its package installed?"
+                logger.error(msg)
+                raise RedisClientException(msg)
+
+    @staticmethod
+    def decompress(data: bytes, compression: CompressionStrategy) -> bytes:
+        try:
+            match compression:
+                case CompressionStrategy.ZLIB:
+                    return zlib.decompress(data)
+                case CompressionStrategy.LZ4 if lz4 is not None:
+                    return lz4.decompress(data)
+                case CompressionStrategy.ZSTD if zstandard is not None:
+                    return zstandard.ZstdDecompressor().decompress(data)
+        except Exception as e:
+            msg = f"Failed to decompress cached data of size `{len(data)}` bytes with `{compression}`"
+            logger.error(msg, exc_info=True)
+            raise RedisClientException(msg) from e
+
+        msg = f"CompressionStrategy `{compression}` is unavailable, is its package installed?"
+        logger.error(msg)
+        raise RedisClientException(msg)
+
     @staticmethod
     def serialize(value: Any) -> bytes:
         try:
@@ -42,7 +243,7 @@ class DataEncoder:
             raise RedisClientException(msg) from e
 
         else:
-            logger.debug(f"Successfully pickled data of type {type(data)}")
+            logger.debug("Successfully pickled data of type %s", type(data))
             return pickled_data
 
     # @staticmethod
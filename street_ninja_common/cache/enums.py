@@ -44,4 +44,36 @@ class Seconds(StreetNinjaEnum):
 class EncodingStrategy(StreetNinjaEnum):
     
     JSON = "json"
-    PICKLE = "pickle"
\ No newline at end of file
+    PICKLE = "pickle"
+    ORJSON = "orjson"
+    MSGPACK = "msgpack"
+
+
+class CompressionStrategy(StreetNinjaEnum):
+
+    ZLIB = "zlib"
+    LZ4 = "lz4"
+    ZSTD = "zstd"
+
+
+class CircuitState(StreetNinjaEnum):
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class MetricEvent(StreetNinjaEnum):
+    """Cache measurements; values double as Prometheus metric names."""
+
+    HIT = "cache_hits_total"
+    LOCAL_HIT = "cache_local_hits_total"
+    NEGATIVE_HIT = "cache_negative_hits_total"
+    MISS = "cache_misses_total"
+    RATE_LIMITED = "rate_limit_denied_total"
+    CACHE_LATENCY = "cache_latency_seconds"
+    ENCODE_TIME = "cache_encode_seconds"
+    DECODE_TIME = "cache_decode_seconds"
+    PAYLOAD_BYTES = "cache_payload_bytes"
+    DB_QUERY_TIME = "cache_db_query_seconds"
+    CIRCUIT_STATE = "cache_circuit_state"
@@ -0,0 +1,47 @@
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class CacheEnvelope:
+    """
+        Wraps a cached value with the metadata needed for early refresh.
+
+        `refresh_at` is a wall-clock timestamp (shared between processes) after
+        which the value is considered stale but still servable until the hard TTL.
+        `delta` is how long the value took to compute, used to scale XFetch
+        probabilistic early expiry: slow queries start refreshing earlier.
+    """
+    value: Any
+    refresh_at: float
+    delta: float
+
+    def should_refresh(self, beta: float | None = None) -> bool:
+        now = time.time()
+        if beta:
+            return now - self.delta * beta * math.log(1.0 - random.random()) >= self.refresh_at
+        return now >= self.refresh_at
+
+
+@dataclass(frozen=True)
+class NegativeResult:
+    """
+        Marks a cached empty DB result (`None` or an empty collection).
+
+        Stored in place of the result for patterns with a `negative_ttl`, so a
+        cached "nothing here" is a hit rather than being mistaken for a miss,
+        and expires on its own shorter TTL.
+    """
+    value: Any = None
+
+    @staticmethod
+    def is_empty(value: Any) -> bool:
+        if value is None:
+            return True
+        try:
+            return len(value) == 0
+        except TypeError:
+            return False
@@ -0,0 +1,77 @@
+import math
+from typing import Any
+
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_EARTH_RADIUS_M = 6_371_008.8
+
+# (south, west, north, east) in degrees
+BBox = tuple[float, float, float, float]
+
+
+def geohash(lat: float, lon: float, precision: int) -> str:
+    """Geohash of a point. Precision 6 is a ~1.2km x 0.6km cell, 7 ~150m x 150m."""
+    south, north, west, east = -90.0, 90.0, -180.0, 180.0
+    chars = []
+    bits, ch, even = 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (west + east) / 2
+            if lon >= mid:
+                ch, west = (ch << 1) | 1, mid
+            else:
+                ch, east = ch << 1, mid
+        else:
+            mid = (south + north) / 2
+            if lat >= mid:
+                ch, south = (ch << 1) | 1, mid
+            else:
+                ch, north = ch << 1, mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[ch])
+            bits, ch = 0, 0
+    return "".join(chars)
+
+
+def geohash_bbox(cell: str) -> BBox:
+    """Bounding box of a geohash cell."""
+    south, north, west, east = -90.0, 90.0, -180.0, 180.0
+    even = True
+    for char in cell:
+        value = _BASE32.index(char)
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if even:
+                mid = (west + east) / 2
+                west, east = (mid, east) if bit else (west, mid)
+            else:
+                mid = (south + north) / 2
+                south, north = (mid, north) if bit else (south, mid)
+            even = not even
+    return south, west, north, east
+
+
+def expand_bbox(bbox: BBox, cells: int = 1) -> BBox:
+    """Grow a cell's bbox by `cells` cell widths on every side, e.g. 1 for the 3x3 block around it."""
+    south, west, north, east = bbox
+    height, width = (north - south) * cells, (east - west) * cells
+    return max(south - height, -90.0), max(west - width, -180.0), min(north + height, 90.0), min(east + width, 180.0)
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in metres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * _EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def coordinates(value: Any) -> tuple[float, float]:
+    """(lat, lon) of a GEOS point or of an already flattened `(lat, lon)` tuple."""
+    if getattr(value, "geom_type", None) == "Point":
+        return value.y, value.x
+    return value[0], value[1]
@@ -0,0 +1,152 @@
+import json
+import logging
+import queue
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable
+from django_redis import get_redis_connection
+from .access_patterns import BaseCacheAccessPattern
+from .enums import CacheStoreEnum
+from .local_cache import LocalCache
+
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidationTransport(ABC):
+    """Delivers invalidation messages between processes."""
+
+    @abstractmethod
+    def publish(self, channel: str, message: bytes):
+        pass
+
+    @abstractmethod
+    def listen(self, channel: str, handler: Callable[[bytes], None], stop: threading.Event):
+        """Block, passing every message on `channel` to `handler`, until `stop` is set."""
+        pass
+
+
+class RedisPubSubTransport(InvalidationTransport):
+    """Redis PUBLISH/SUBSCRIBE on the connection behind one of the Django cache stores."""
+
+    def __init__(self, store: CacheStoreEnum = CacheStoreEnum.DEFAULT, poll_timeout: float = 1.0):
+        self.store = store
+        self.poll_timeout = poll_timeout
+
+    def publish(self, channel: str, message: bytes):
+        get_redis_connection(self.store.value).publish(channel, message)
+
+    def listen(self, channel: str, handler: Callable[[bytes], None], stop: threading.Event):
+        pubsub = get_redis_connection(self.store.value).pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(channel)
+        try:
+            while not stop.is_set():
+                message = pubsub.get_message(timeout=self.poll_timeout)
+                if message is not None:
+                    handler(message["data"])
+        finally:
+            pubsub.close()
+
+
+class LocalPubSubTransport(InvalidationTransport):
+    """
+        In-process transport for single-process deployments, development and tests.
+        Every listener on a channel receives every message published to it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: dict[str, list[queue.Queue]] = {}
+
+    def publish(self, channel: str, message: bytes):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, []))
+        for subscriber in subscribers:
+            subscriber.put(message)
+
+    def listen(self, channel: str, handler: Callable[[bytes], None], stop: threading.Event):
+        inbox: queue.Queue = queue.Queue()
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(inbox)
+        try:
+            while not stop.is_set():
+                try:
+                    handler(inbox.get(timeout=0.1))
+                except queue.Empty:
+                    continue
+        finally:
+            with self._lock:
+                self._subscribers[channel].remove(inbox)
+
+
+class InvalidationBus:
+    """
+        Broadcasts cache invalidations so every process drops its L1 copy of a key.
+
+        Cache clients constructed with a bus publish an event from `invalidate()`.
+        Each service starts the bus once (e.g. in `AppConfig.ready`) to run a daemon
+        listener thread that removes matching entries from the process-wide
+        `LocalCache`. Events are addressed with the same (store, version, key)
+        triple the clients use for L1 entries.
+
+        Usage:
+            bus = InvalidationBus(RedisPubSubTransport(CacheStoreEnum.DEFAULT))
+            bus.start()
+            client = CacheClientDB(CacheCircuitBreaker(), invalidation_bus=bus)
+            client.invalidate(SHELTERS)
+    """
+    CHANNEL = "street_ninja:cache:invalidate"
+
+    def __init__(self, transport: InvalidationTransport, local_cache: LocalCache | None = None, reconnect_delay: float = 1.0):
+        self.transport = transport
+        self.local_cache = local_cache or LocalCache()
+        self.reconnect_delay = reconnect_delay
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def publish(self, access_pattern: BaseCacheAccessPattern, key: str):
+        self.publish_key(access_pattern.store, access_pattern.version, key)
+
+    def publish_key(self, store: CacheStoreEnum, version: int, key: str):
+        message = json.dumps({
+            "store": store.value,
+            "version": version,
+            "key": key,
+        }).encode("utf-8")
+        try:
+            self.transport.publish(self.CHANNEL, message)
+        except Exception:
+            logger.error("Failed to publish cache invalidation for key `%s`", key, exc_info=True)
+        else:
+            logger.debug("Published cache invalidation for key `%s`", key)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-invalidation", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.transport.listen(self.CHANNEL, self._handle, self._stop)
+            except Exception:
+                logger.error("Cache invalidation listener failed, reconnecting", exc_info=True)
+                self._stop.wait(self.reconnect_delay)
+
+    def _handle(self, message: bytes):
+        try:
+            event = json.loads(message)
+            local_key = (event["store"], event["version"], event["key"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed cache invalidation message `%r`", message)
+            return
+        self.local_cache.delete(local_key)
+        logger.debug("Dropped local cache entry for key `%s`", event['key'])
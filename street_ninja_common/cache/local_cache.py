@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class LocalCache:
+    """
+        Bounded in-process L1 cache that sits in front of Redis.
+
+        Holds already-decoded objects so that a hit skips both the Redis round trip
+        and the unpickle/deserialize step. Entries are evicted least-recently-used
+        once either `max_entries` or `max_bytes` (measured as the size of the
+        encoded payload the value was decoded from) is exceeded, and expire after
+        the TTL they were stored with.
+
+        Like the circuit breaker, this is a per-process singleton: every cache
+        client in a process shares the same L1 tier. Access patterns opt in by
+        setting `local_ttl`.
+
+        Usage:
+            local_cache = LocalCache()  # Always returns same instance
+            local_cache.configure(max_entries=512, max_bytes=64 * 1024 * 1024)
+            local_cache.stats()
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        # Prevent re-initialization of singleton
+        if hasattr(self, '_initialized'):
+            return
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[Any, float, int]] = OrderedDict()
+        self.max_entries = 1024
+        self.max_bytes: int | None = None
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._initialized = True
+
+    def configure(self, max_entries: int | None = None, max_bytes: int | None = None):
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._evict()
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at, size = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.current_bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float, size: int = 0):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous[2]
+            self._entries[key] = (value, time.monotonic() + ttl, size)
+            self.current_bytes += size
+            self._evict()
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.current_bytes -= entry[2]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _evict(self):
+        """Drop least recently used entries until both budgets are met. Caller holds the lock."""
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self.current_bytes > self.max_bytes)
+        ):
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self.current_bytes -= size
+            self.evictions += 1
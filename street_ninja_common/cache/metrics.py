@@ -0,0 +1,148 @@
+import bisect
+import threading
+from abc import ABC, abstractmethod
+from .enums import CacheStoreEnum, CircuitState, MetricEvent
+
+
+_COUNTERS = frozenset((MetricEvent.HIT, MetricEvent.LOCAL_HIT, MetricEvent.NEGATIVE_HIT, MetricEvent.MISS, MetricEvent.RATE_LIMITED))
+_GAUGES = frozenset((MetricEvent.CIRCUIT_STATE,))
+_SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+_BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+_CIRCUIT_STATE_VALUES = {CircuitState.CLOSED: 0, CircuitState.HALF_OPEN: 1, CircuitState.OPEN: 2}
+
+
+class MetricsSink(ABC):
+    """
+        Receives cache measurements labelled by access pattern class and store.
+
+        Cache clients take a sink via `metrics=`; wire circuit breaker state
+        changes in with `circuit_breaker.add_listener(sink.circuit_state_changed)`.
+    """
+
+    @abstractmethod
+    def record(self, event: MetricEvent, pattern: str, store: str, value: float = 1.0):
+        pass
+
+    def circuit_state_changed(self, store: CacheStoreEnum, state: CircuitState):
+        self.record(MetricEvent.CIRCUIT_STATE, "", store.value, _CIRCUIT_STATE_VALUES[state])
+
+
+class NullMetrics(MetricsSink):
+    """Discards everything. The default sink."""
+
+    def record(self, event: MetricEvent, pattern: str, store: str, value: float = 1.0):
+        pass
+
+
+class _Histogram:
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class InMemoryMetrics(MetricsSink):
+    """
+        Aggregates measurements in process: counters for hits/misses, a gauge for
+        circuit state and fixed-bucket histograms for timings and payload sizes.
+        Render it with `PrometheusExporter` or read `snapshot()` directly.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: dict[tuple[MetricEvent, str, str], float] = {}
+        self.gauges: dict[tuple[MetricEvent, str, str], float] = {}
+        self.histograms: dict[tuple[MetricEvent, str, str], _Histogram] = {}
+
+    def record(self, event: MetricEvent, pattern: str, store: str, value: float = 1.0):
+        labels = (event, pattern, store)
+        with self._lock:
+            if event in _COUNTERS:
+                self.counters[labels] = self.counters.get(labels, 0) + value
+            elif event in _GAUGES:
+                self.gauges[labels] = value
+            else:
+                histogram = self.histograms.get(labels)
+                if histogram is None:
+                    buckets = _BYTES_BUCKETS if event is MetricEvent.PAYLOAD_BYTES else _SECONDS_BUCKETS
+                    histogram = self.histograms[labels] = _Histogram(buckets)
+                histogram.observe(value)
+
+    def hit_ratio(self, pattern: str, store: str) -> float | None:
+        with self._lock:
+            hits = self.counters.get((MetricEvent.HIT, pattern, store), 0)
+            hits += self.counters.get((MetricEvent.LOCAL_HIT, pattern, store), 0)
+            misses = self.counters.get((MetricEvent.MISS, pattern, store), 0)
+        total = hits + misses
+        return hits / total if total else None
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "counters": {labels: value for labels, value in self.counters.items()},
+                "gauges": {labels: value for labels, value in self.gauges.items()},
+                "histograms": {
+                    labels: {"count": h.count, "sum": h.sum, "buckets": dict(zip((*h.buckets, float("inf")), h.counts))}
+                    for labels, h in self.histograms.items()
+                },
+            }
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+
+class PrometheusExporter:
+    """Renders an `InMemoryMetrics` aggregator in the Prometheus text exposition format."""
+
+    def __init__(self, metrics: InMemoryMetrics, namespace: str = "street_ninja"):
+        self.metrics = metrics
+        self.namespace = namespace
+
+    def render(self) -> str:
+        snapshot = self.metrics.snapshot()
+        lines: list[str] = []
+        typed: set[str] = set()
+
+        def name_of(event: MetricEvent, kind: str) -> str:
+            name = f"{self.namespace}_{event.value}"
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+            return name
+
+        for (event, pattern, store), value in sorted(snapshot["counters"].items(), key=self._sort_key):
+            lines.append(f"{name_of(event, 'counter')}{self._labels(pattern, store)} {value}")
+        for (event, pattern, store), value in sorted(snapshot["gauges"].items(), key=self._sort_key):
+            lines.append(f"{name_of(event, 'gauge')}{self._labels(pattern, store)} {value}")
+        for (event, pattern, store), histogram in sorted(snapshot["histograms"].items(), key=self._sort_key):
+            name = name_of(event, "histogram")
+            cumulative = 0
+            for bound, count in histogram["buckets"].items():
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{name}_bucket{self._labels(pattern, store, le=le)} {cumulative}")
+            lines.append(f"{name}_sum{self._labels(pattern, store)} {histogram['sum']}")
+            lines.append(f"{name}_count{self._labels(pattern, store)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _sort_key(item) -> tuple:
+        (event, pattern, store), _ = item
+        return (event.value, pattern, store)
+
+    @staticmethod
+    def _labels(pattern: str, store: str, **extra: str) -> str:
+        labels = {"store": store, **({"pattern": pattern} if pattern else {}), **extra}
+        return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
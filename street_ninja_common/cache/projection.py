@@ -0,0 +1,76 @@
+from collections import namedtuple
+from collections.abc import Iterable, Sequence
+from functools import lru_cache
+from typing import Any, overload
+from django.db.models import QuerySet
+
+
+@lru_cache(maxsize=None)
+def _row_type(fields: tuple[str, ...]) -> type:
+    return namedtuple("Row", [field.replace("__", "_") for field in fields])
+
+
+def _flatten(value: Any) -> Any:
+    # GEOS points become (lat, lon) floats; avoids importing django.contrib.gis (GDAL)
+    if getattr(value, "geom_type", None) == "Point":
+        return (value.y, value.x)
+    return value
+
+
+class ProjectedRows(Sequence):
+    """
+        Compact, read-only stand-in for a list of model instances.
+
+        Holds only the projected fields of each row as a plain tuple, so the
+        pickled payload is a list of builtin tuples instead of full Django model
+        instances (with their `_state`, related caches and GIS geometries).
+        Indexing and iteration hand back immutable namedtuples whose attributes
+        are the projected field names (`category__name` becomes `category_name`);
+        point geometries are `(lat, lon)` tuples.
+
+        Usage:
+            shelters = client.get(SHELTERS)   # AccessPatternDB(projection=("id", "name", "location"))
+            for shelter in shelters:
+                shelter.name, shelter.location
+    """
+    __slots__ = ("fields", "rows")
+
+    def __init__(self, fields: tuple[str, ...], rows: list[tuple]):
+        self.fields = fields
+        self.rows = rows
+
+    @classmethod
+    def from_data(cls, data: Any, fields: tuple[str, ...]) -> "ProjectedRows":
+        if isinstance(data, QuerySet):
+            rows = data.values_list(*fields)
+        elif isinstance(data, Iterable):
+            rows = ([getattr(obj, field) for field in fields] for obj in data)
+        else:
+            raise TypeError(f"Cannot project data of type `{type(data)}`")
+        return cls(fields, [tuple(_flatten(value) for value in row) for row in rows])
+
+    def column(self, field: str) -> list[Any]:
+        i = self.fields.index(field)
+        return [row[i] for row in self.rows]
+
+    @overload
+    def __getitem__(self, index: int) -> Any: ...
+    @overload
+    def __getitem__(self, index: slice) -> "ProjectedRows": ...
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ProjectedRows(self.fields, self.rows[index])
+        return _row_type(self.fields)._make(self.rows[index])
+
+    def __iter__(self):
+        make = _row_type(self.fields)._make
+        return map(make, self.rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __reduce__(self):
+        return (ProjectedRows, (self.fields, self.rows))
+
+    def __repr__(self) -> str:
+        return f"<ProjectedRows fields={self.fields} rows={len(self.rows)}>"
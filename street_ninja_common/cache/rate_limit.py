@@ -0,0 +1,287 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from django.core.cache import caches
+from django_redis import get_redis_connection
+from redis.exceptions import NoScriptError
+from .circuit_breaker import CacheCircuitBreaker
+from .enums import CacheStoreEnum, MetricEvent
+from .metrics import MetricsSink, NullMetrics
+
+
+logger = logging.getLogger(__name__)
+
+
+# Both scripts take the caller's wall clock in ARGV, so they stay deterministic
+# and the keys they touch are all declared in KEYS.
+_TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return {allowed, tostring(tokens)}
+"""
+
+_SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local cost = tonumber(ARGV[2])
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if previous * tonumber(ARGV[3]) + current + cost > limit then
+    return {0, current, previous}
+end
+current = redis.call('INCRBY', KEYS[1], cost)
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return {1, current, previous}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    # Requests of the checked cost still allowed right now
+    remaining: int
+    # Seconds until a request of the checked cost would be allowed, 0 when allowed
+    retry_after: float
+    # True when Redis wasn't asked, because of the local pre-check or an open
+    # circuit breaker / Redis error (see `fail_open`)
+    local: bool = False
+
+
+class RateLimiter(ABC):
+    """
+        Shared rate limit state in the GATE store, e.g. per phone number.
+
+        Each check is a single round trip running an atomic Lua script, and
+        `check_many` pipelines any number of identities into one round trip.
+        Denials are remembered in process until their `retry_after` has passed,
+        so a flood from one identity is rejected without calling Redis. That
+        never rejects a request Redis would have allowed: waiting out
+        `retry_after` is required however other processes use the limit.
+
+        When the circuit breaker for the store is open, or Redis fails, checks
+        are allowed if `fail_open` (the default: an outage shouldn't stop people
+        getting answers) and denied otherwise.
+    """
+    # Lua source of the check, run with `_keys()` and `_args()`
+    _source: str
+
+    def __init__(
+            self,
+            name: str,
+            circuit_breaker: CacheCircuitBreaker,
+            store: CacheStoreEnum = CacheStoreEnum.GATE,
+            fail_open: bool = True,
+            local_precheck: bool = True,
+            metrics: MetricsSink | None = None,
+    ):
+        self.name = name
+        self.circuit_breaker = circuit_breaker
+        self.store = store
+        self.fail_open = fail_open
+        self.local_precheck = local_precheck
+        self.metrics = metrics or NullMetrics()
+        self._lock = threading.Lock()
+        # identity -> time.monotonic() until which it is known to be denied
+        self._blocked: dict[str, float] = {}
+        self._sha = hashlib.sha1(self._source.encode("utf-8")).hexdigest()
+
+    def check(self, identity: str, cost: int = 1) -> RateLimitResult:
+        return self.check_many([identity], cost)[0]
+
+    def check_many(self, identities: list[str], cost: int = 1) -> list[RateLimitResult]:
+        """Check (and consume) `cost` for every identity in one round trip."""
+        results: list[RateLimitResult | None] = [None] * len(identities)
+        now = time.monotonic()
+        remote = []
+        for i, identity in enumerate(identities):
+            blocked_until = self._blocked.get(identity) if self.local_precheck else None
+            if blocked_until is not None and blocked_until > now:
+                results[i] = RateLimitResult(allowed=False, remaining=0, retry_after=blocked_until - now, local=True)
+            else:
+                remote.append(i)
+
+        if remote:
+            remote_results = self._check_remote([identities[i] for i in remote], cost)
+            for i, result in zip(remote, remote_results):
+                results[i] = result
+
+        denied = 0
+        for identity, result in zip(identities, results):
+            if not result.allowed:
+                denied += 1
+                if self.local_precheck and not result.local:
+                    self._block(identity, now + result.retry_after)
+        if denied:
+            self.metrics.record(MetricEvent.RATE_LIMITED, self.name, self.store.value, denied)
+        return results
+
+    def reset(self, identity: str):
+        self._blocked.pop(identity, None)
+        try:
+            get_redis_connection(self.store.value).delete(*self._keys(identity, time.time()))
+        except Exception:
+            logger.error("Failed to reset rate limit `%s` for `%s`", self.name, identity, exc_info=True)
+
+    def _check_remote(self, identities: list[str], cost: int) -> list[RateLimitResult]:
+        if not self.circuit_breaker.allow(self.store):
+            logger.warning("Cache circuit breaker open. Rate limit `%s` failing %s", self.name, "open" if self.fail_open else "closed")
+            return [self._failed() for _ in identities]
+
+        started = time.perf_counter()
+        try:
+            connection = get_redis_connection(self.store.value)
+            calls = [(identity, time.time()) for identity in identities]
+            try:
+                replies = self._evaluate(connection, calls, cost)
+            except NoScriptError:
+                # First use, or Redis restarted and lost its script cache
+                self._sha = connection.script_load(self._source)
+                replies = self._evaluate(connection, calls, cost)
+        except Exception:
+            self.circuit_breaker.fail(self.store)
+            logger.error(
+                "Rate limit `%s` check failed in store `%s`, failing %s",
+                self.name, self.store.value, "open" if self.fail_open else "closed",
+                exc_info=True,
+            )
+            return [self._failed() for _ in identities]
+
+        self.circuit_breaker.success(self.store)
+        self.metrics.record(MetricEvent.CACHE_LATENCY, self.name, self.store.value, time.perf_counter() - started)
+        return [self._result(reply, now, cost) for reply, (_, now) in zip(replies, calls)]
+
+    def _evaluate(self, connection, calls: list[tuple[str, float]], cost: int) -> list:
+        # EVALSHA directly rather than through redis-py `Script`, which checks
+        # SCRIPT EXISTS before every pipeline: an extra round trip per check
+        pipeline = connection.pipeline(transaction=False)
+        for identity, now in calls:
+            keys = self._keys(identity, now)
+            pipeline.evalsha(self._sha, len(keys), *keys, *self._args(now, cost))
+        return pipeline.execute()
+
+    def _failed(self) -> RateLimitResult:
+        return RateLimitResult(allowed=self.fail_open, remaining=0, retry_after=0.0, local=True)
+
+    def _block(self, identity: str, until: float):
+        with self._lock:
+            if len(self._blocked) >= 10_000:
+                now = time.monotonic()
+                self._blocked = {key: value for key, value in self._blocked.items() if value > now}
+            self._blocked[identity] = until
+
+    def _key(self, identity: str) -> str:
+        return caches[self.store.value].make_key(f"street_ninja:rate:{self.name}:{identity}")
+
+    @abstractmethod
+    def _keys(self, identity: str, now: float) -> list[str]:
+        pass
+
+    @abstractmethod
+    def _args(self, now: float, cost: int) -> list:
+        pass
+
+    @abstractmethod
+    def _result(self, reply: list, now: float, cost: int) -> RateLimitResult:
+        pass
+
+
+class TokenBucket(RateLimiter):
+    """
+        Allows bursts of up to `capacity` requests, refilled at `rate` per
+        second. State is one small hash per identity.
+
+        Usage:
+            sms_limit = TokenBucket("sms", CacheCircuitBreaker(), capacity=5, rate=5 / 60)
+            if not sms_limit.check(phone).allowed:
+                return TOO_MANY_MESSAGES
+    """
+
+    def __init__(self, name: str, circuit_breaker: CacheCircuitBreaker, capacity: int, rate: float, **kwargs):
+        super().__init__(name, circuit_breaker, **kwargs)
+        self.capacity = capacity
+        self.rate = rate
+        # An idle bucket is full again after this long, so its state can expire
+        self._ttl = math.ceil(capacity / rate) + 1
+
+    _source = _TOKEN_BUCKET_SCRIPT
+
+    def _keys(self, identity: str, now: float) -> list[str]:
+        return [self._key(identity)]
+
+    def _args(self, now: float, cost: int) -> list:
+        return [self.capacity, self.rate, repr(now), cost, self._ttl]
+
+    def _result(self, reply: list, now: float, cost: int) -> RateLimitResult:
+        allowed, tokens = bool(reply[0]), float(reply[1])
+        return RateLimitResult(
+            allowed=allowed,
+            remaining=int(tokens // cost) if cost else 0,
+            retry_after=0.0 if allowed else (cost - tokens) / self.rate,
+        )
+
+
+class SlidingWindow(RateLimiter):
+    """
+        Allows `limit` requests per `window` seconds, using a sliding window
+        counter: the previous fixed window's count is weighted by how much of it
+        still overlaps the sliding window. State is two counters per identity.
+
+        Usage:
+            search_limit = SlidingWindow("search", CacheCircuitBreaker(), limit=30, window=60)
+            results = search_limit.check_many(phones)
+    """
+
+    def __init__(self, name: str, circuit_breaker: CacheCircuitBreaker, limit: int, window: int, **kwargs):
+        super().__init__(name, circuit_breaker, **kwargs)
+        self.limit = limit
+        self.window = window
+
+    _source = _SLIDING_WINDOW_SCRIPT
+
+    def _keys(self, identity: str, now: float) -> list[str]:
+        key = self._key(identity)
+        index = int(now // self.window)
+        return [f"{key}:{index}", f"{key}:{index - 1}"]
+
+    def _args(self, now: float, cost: int) -> list:
+        return [self.limit, cost, repr(self._previous_weight(now)), 2 * self.window]
+
+    def _result(self, reply: list, now: float, cost: int) -> RateLimitResult:
+        allowed, current, previous = bool(reply[0]), int(reply[1]), int(reply[2])
+        weight = self._previous_weight(now)
+        spare = self.limit - (previous * weight + current)
+        return RateLimitResult(
+            allowed=allowed,
+            remaining=max(int(spare // cost), 0) if cost else 0,
+            retry_after=0.0 if allowed else self._retry_after(now, current, previous, cost),
+        )
+
+    def _previous_weight(self, now: float) -> float:
+        return 1.0 - (now % self.window) / self.window
+
+    def _retry_after(self, now: float, current: int, previous: int, cost: int) -> float:
+        elapsed = now % self.window
+        room = self.limit - current - cost
+        if room >= 0:
+            # Wait for enough of the previous window to slide out
+            return max(self.window * (1.0 - room / previous) - elapsed, 0.0) if previous else 0.0
+        # Wait for the next window, then for enough of this one to slide out
+        if cost > self.limit:
+            return float(self.window)
+        return (self.window - elapsed) + max(self.window * (1.0 - (self.limit - cost) / current), 0.0)
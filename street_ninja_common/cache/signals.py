@@ -0,0 +1,82 @@
+import logging
+from typing import Any, Callable
+from django.db import transaction
+from django.db.models import Model
+from django.db.models.signals import post_delete, post_save
+from .access_patterns import AccessPatternDB
+from .clients.client_db import CacheClientDB
+from .exc import RedisClientException
+
+
+logger = logging.getLogger(__name__)
+
+
+def write_through(
+        model: type[Model],
+        client: CacheClientDB,
+        access_pattern: AccessPatternDB,
+        kwargs_for: Callable[[Any], list[dict]] | None = None,
+        dispatch_uid: str | None = None,
+):
+    """
+    Rebuild the cached keys of `access_pattern` from the DB whenever a `model`
+    row is saved or deleted, once the transaction commits. Keys are refreshed
+    in place, so readers never see a miss, and TTLs can be long because
+    changes no longer wait for expiry. Other processes drop their L1 copies
+    of refreshed keys through the client's invalidation bus.
+
+    `kwargs_for(instance)` returns the key kwargs affected by a change; by
+    default the pattern's single key without kwargs is refreshed. For a
+    `GeoAccessPattern` use its `affected_kwargs()`; a row that moves also
+    leaves stale candidates behind in its old cells, which tag invalidation
+    (`invalidate_tags_on_change`) covers.
+
+    Usage (in `AppConfig.ready`):
+        write_through(Shelter, client, SHELTERS)
+        write_through(Shelter, client, NEARBY_SHELTERS, lambda shelter: NEARBY_SHELTERS.affected_kwargs(shelter.location.y, shelter.location.x))
+    """
+    def refresh(instance: Model):
+        for kwargs in kwargs_for(instance) if kwargs_for is not None else [{}]:
+            try:
+                client._set_from_db(access_pattern, **kwargs)
+            except RedisClientException:
+                logger.warning("Write-through refresh failed with AccessPattern `%s`", access_pattern.__class__.__name__, exc_info=True)
+                continue
+            # `_set_from_db` only drops this process's L1 copy
+            if client.invalidation_bus is not None and access_pattern.local_ttl is not None:
+                client.invalidation_bus.publish(access_pattern, client._key(access_pattern, **kwargs))
+
+    def handler(sender, instance: Model, **_):
+        transaction.on_commit(lambda: refresh(instance))
+
+    uid = dispatch_uid or f"write_through:{model._meta.label}:{access_pattern.__class__.__name__}"
+    post_save.connect(handler, sender=model, weak=False, dispatch_uid=f"{uid}:save")
+    post_delete.connect(handler, sender=model, weak=False, dispatch_uid=f"{uid}:delete")
+
+
+def invalidate_tags_on_change(
+        model: type[Model],
+        client: CacheClientDB,
+        tags: tuple[str, ...],
+        dispatch_uid: str | None = None,
+):
+    """
+    Invalidate every key under `tags` whenever a `model` row is saved or
+    deleted, once the transaction commits. The next read rebuilds them.
+
+    Usage (in `AppConfig.ready`):
+        invalidate_tags_on_change(Shelter, client, ("shelters",))
+    """
+    def invalidate():
+        for tag in tags:
+            try:
+                client.invalidate_tag(tag)
+            except RedisClientException:
+                logger.warning("Tag invalidation of `%s` failed, keys expire with their TTL", tag, exc_info=True)
+
+    def handler(sender, instance: Model, **_):
+        transaction.on_commit(invalidate)
+
+    uid = dispatch_uid or f"invalidate_tags:{model._meta.label}:{','.join(tags)}"
+    post_save.connect(handler, sender=model, weak=False, dispatch_uid=f"{uid}:save")
+    post_delete.connect(handler, sender=model, weak=False, dispatch_uid=f"{uid}:delete")
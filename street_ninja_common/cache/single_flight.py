@@ -0,0 +1,57 @@
+import threading
+from typing import Any, Callable, Hashable
+
+
+class _Call:
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+        Coalesces concurrent calls for the same key within a process.
+
+        The first caller for a key becomes the leader and runs the function. Every
+        caller that arrives while the leader is still running waits for it and
+        receives the same result (or the same exception) instead of repeating the
+        work. Once the leader finishes the key is released, so the next call runs
+        the function again.
+
+        Usage:
+            data = single_flight.do(key, lambda: expensive_query())
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+single_flight = SingleFlight()
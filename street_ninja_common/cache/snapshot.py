@@ -0,0 +1,380 @@
+import hashlib
+import json
+import logging
+import mmap
+import os
+import stat
+import struct
+import tempfile
+import threading
+import time
+from array import array
+from collections.abc import Sequence
+from typing import Any, Callable, Hashable
+from .access_patterns import AccessPatternDB
+from .exc import InvalidAccessPattern
+from .projection import ProjectedRows, _row_type
+
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"SNSNAP02"
+_PREAMBLE = struct.Struct("<8sI")
+# tmpfs where available, so snapshots live in shared memory rather than on disk.
+# One directory per user: other users must not be able to plant snapshots.
+DEFAULT_SNAPSHOT_DIR = os.path.join(
+    "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), f"street_ninja_snapshots-{os.getuid()}"
+)
+
+
+def _private_directory(directory: str, create: bool = False):
+    """Raise PermissionError unless `directory` is a real directory only this user can write to."""
+    if create:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+    st = os.lstat(directory)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(
+            f"Snapshot directory `{directory}` must be a directory owned by uid {os.getuid()} and writable only by it"
+        )
+
+
+def _open_owned(path: str) -> int:
+    """Open `path` for reading, without following symlinks, if this user owns it."""
+    fd = os.open(path, os.O_RDONLY | os.O_NOFOLLOW)
+    if os.fstat(fd).st_uid != os.getuid():
+        os.close(fd)
+        raise PermissionError(f"Snapshot file `{path}` is not owned by uid {os.getuid()}")
+    return fd
+
+
+def _column_kind(values: list[Any]) -> str:
+    present = [value for value in values if value is not None]
+    if not present:
+        return "json"
+    types = {type(value) for value in present}
+    if types == {bool}:
+        return "b1"
+    if types == {int} and all(-2 ** 63 <= value < 2 ** 63 for value in present):
+        return "i8"
+    if types <= {int, float} and float in types:
+        return "f8"
+    if types == {str}:
+        return "str"
+    if types == {tuple} and all(len(value) == 2 and {type(v) for v in value} <= {int, float} for value in present):
+        return "f8x2"
+    return "json"
+
+
+def _json_blob(value: Any) -> bytes:
+    blob = json.dumps(value, allow_nan=False).encode("utf-8")
+    # Tuples would come back as lists, and anything else JSON can't hold is refused
+    if json.loads(blob) != value:
+        raise TypeError(f"`{value!r}` does not round-trip through JSON")
+    return blob
+
+
+def _encode_column(kind: str, values: list[Any]) -> list[tuple[str, bytes]]:
+    if kind == "b1":
+        return [("data", bytes(bool(value) for value in values))]
+    if kind == "i8":
+        return [("data", array("q", (value or 0 for value in values)).tobytes())]
+    if kind == "f8":
+        return [("data", array("d", (0.0 if value is None else value for value in values)).tobytes())]
+    if kind == "f8x2":
+        flat = array("d")
+        for value in values:
+            flat.extend(value if value is not None else (0.0, 0.0))
+        return [("data", flat.tobytes())]
+    if kind == "str":
+        blobs = [value.encode("utf-8") if value is not None else b"" for value in values]
+    else:
+        blobs = [_json_blob(value) for value in values]
+    offsets = array("q", [0])
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+    return [("offsets", offsets.tobytes()), ("data", b"".join(blobs))]
+
+
+def write_snapshot(path: str, data: ProjectedRows, published_at: float | None = None):
+    """
+    Write `data` to `path` in the flat columnar snapshot format:
+    a preamble, a JSON header, then one 8-byte aligned buffer per column
+    (and per column null mask), read in place by `ResourceSnapshot`.
+    Columns that aren't numbers, points or strings are stored as JSON, and
+    TypeError is raised for values JSON can't represent exactly.
+    """
+    columns = [[row[i] for row in data.rows] for i in range(len(data.fields))]
+    body = bytearray()
+
+    def append(blob: bytes) -> list[int]:
+        body.extend(b"\0" * (-len(body) % 8))
+        offset = len(body)
+        body.extend(blob)
+        return [offset, len(blob)]
+
+    described = []
+    for values in columns:
+        kind = _column_kind(values)
+        column = {"kind": kind}
+        for name, blob in _encode_column(kind, values):
+            column[name] = append(blob)
+        if kind != "json" and any(value is None for value in values):
+            column["nulls"] = append(bytes(value is None for value in values))
+        described.append(column)
+
+    header = json.dumps({
+        "fields": list(data.fields),
+        "rows": len(data.rows),
+        "published_at": time.time() if published_at is None else published_at,
+        "columns": described,
+    }).encode("utf-8")
+    start = _PREAMBLE.size + len(header)
+    start += -start % 8
+    with open(path, "wb") as f:
+        f.write(_PREAMBLE.pack(_MAGIC, len(header)))
+        f.write(header)
+        f.write(b"\0" * (start - _PREAMBLE.size - len(header)))
+        f.write(body)
+
+
+class ResourceSnapshot(Sequence):
+    """
+        Read-only view of a snapshot file, mapped into memory.
+
+        Every process on the host that maps the same file shares its pages, and
+        nothing is decoded up front: numeric columns are read in place
+        through `memoryview`s and rows are built on access. Behaves like the
+        `ProjectedRows` it was written from (rows are the same namedtuples and
+        `column()` returns a list), and `array()` exposes numeric columns
+        without copying (`numpy.frombuffer(snapshot.array("id"), "q")`).
+    """
+
+    def __init__(self, path: str):
+        fd = _open_owned(path)
+        try:
+            self._mmap = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+        buffer = memoryview(self._mmap)
+        magic, header_size = _PREAMBLE.unpack_from(buffer)
+        if magic != _MAGIC:
+            raise ValueError(f"`{path}` is not a resource snapshot")
+        header = json.loads(bytes(buffer[_PREAMBLE.size:_PREAMBLE.size + header_size]))
+        start = _PREAMBLE.size + header_size
+        start += -start % 8
+
+        self.path = path
+        self.fields: tuple[str, ...] = tuple(header["fields"])
+        self.published_at: float = header["published_at"]
+        self._rows: int = header["rows"]
+        self._make = _row_type(self.fields)._make
+        self._views: dict[str, dict[str, Any]] = {}
+        self._getters: list[Callable[[int], Any]] = []
+        for field, column in zip(self.fields, header["columns"]):
+            views = {
+                name: buffer[start + span[0]:start + span[0] + span[1]]
+                for name, span in column.items() if name != "kind"
+            }
+            self._views[field] = {"kind": column["kind"], **views}
+            self._getters.append(self._getter(column["kind"], views))
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ProjectedRows(self.fields, [self._row(i) for i in range(*index.indices(self._rows))])
+        if index < 0:
+            index += self._rows
+        if not 0 <= index < self._rows:
+            raise IndexError("snapshot index out of range")
+        return self._make(self._row(index))
+
+    def __iter__(self):
+        make, row = self._make, self._row
+        return (make(row(i)) for i in range(self._rows))
+
+    def __reduce__(self):
+        # Pickles (e.g. into a cache) as the plain rows, not the mapping
+        return (ProjectedRows, (self.fields, [self._row(i) for i in range(self._rows)]))
+
+    def __repr__(self) -> str:
+        return f"<ResourceSnapshot fields={self.fields} rows={self._rows}>"
+
+    def column(self, field: str) -> list[Any]:
+        views = self._views[field]
+        kind = views["kind"]
+        if kind not in ("i8", "f8", "f8x2", "b1"):
+            get = self._getters[self.fields.index(field)]
+            return [get(i) for i in range(self._rows)]
+        values = self.array(field).tolist()
+        if kind == "f8x2":
+            values = list(zip(values[0::2], values[1::2]))
+        elif kind == "b1":
+            values = [bool(value) for value in values]
+        nulls = views.get("nulls")
+        if nulls is not None:
+            values = [None if null else value for value, null in zip(values, nulls)]
+        return values
+
+    def array(self, field: str) -> memoryview:
+        """Zero-copy view of a numeric column; `(lat, lon)` columns are interleaved."""
+        views = self._views[field]
+        kind = views["kind"]
+        if kind not in ("i8", "f8", "f8x2", "b1"):
+            raise TypeError(f"Column `{field}` of kind `{kind}` has no array view")
+        return views["data"].cast({"i8": "q", "f8": "d", "f8x2": "d", "b1": "B"}[kind])
+
+    def _row(self, index: int) -> tuple:
+        return tuple(getter(index) for getter in self._getters)
+
+    @staticmethod
+    def _getter(kind: str, views: dict[str, memoryview]) -> Callable[[int], Any]:
+        data = views["data"]
+        if kind == "b1":
+            get = lambda i: bool(data[i])
+        elif kind == "i8":
+            ints = data.cast("q")
+            get = ints.__getitem__
+        elif kind == "f8":
+            floats = data.cast("d")
+            get = floats.__getitem__
+        elif kind == "f8x2":
+            points = data.cast("d")
+            get = lambda i: (points[2 * i], points[2 * i + 1])
+        else:
+            offsets = views["offsets"].cast("q")
+            if kind == "str":
+                get = lambda i: str(data[offsets[i]:offsets[i + 1]], "utf-8")
+            elif kind == "json":
+                get = lambda i: json.loads(str(data[offsets[i]:offsets[i + 1]], "utf-8"))
+            else:
+                raise ValueError(f"Unknown snapshot column kind `{kind}`")
+        nulls = views.get("nulls")
+        if nulls is None:
+            return get
+        return lambda i: None if nulls[i] else get(i)
+
+
+def _snapshot_name(local_key: tuple) -> str:
+    return hashlib.sha1(repr(local_key).encode("utf-8")).hexdigest()[:24]
+
+
+class SnapshotPublisher:
+    """
+        Writes cached resource sets to versioned snapshot files shared by every
+        worker on the host, to be read through `SnapshotReader`.
+
+        The set is read through `CacheClientDB` (so a miss is filled from the
+        DB as usual) and must be projected (`AccessPatternDB(projection=...)`),
+        since the snapshot format is columnar. Each publish writes a new
+        version file and then swaps the `<name>.current` pointer with an atomic
+        rename; readers that still map an older version keep using it until
+        they next check. Run it on every host after the data changes, e.g.
+        from a periodic Celery task, as the same user as the readers: the
+        directory must be owned by that user and not writable by others.
+
+        Usage:
+            SnapshotPublisher(client).publish(SHELTERS)
+    """
+
+    def __init__(self, client, directory: str = DEFAULT_SNAPSHOT_DIR):
+        self.client = client
+        self.directory = directory
+
+    def publish(self, access_pattern: AccessPatternDB, **kwargs) -> str:
+        data = self.client.get(access_pattern, **kwargs)
+        if not isinstance(data, ProjectedRows):
+            raise InvalidAccessPattern(
+                f"{access_pattern.__class__.__name__} needs a `projection` to be published as a snapshot"
+            )
+        _private_directory(self.directory, create=True)
+        name = _snapshot_name(self.client._local_key(access_pattern, **kwargs))
+        version = time.time_ns()
+        path = os.path.join(self.directory, f"{name}.{version}.snap")
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            write_snapshot(tmp, data)
+        except TypeError as e:
+            raise InvalidAccessPattern(
+                f"{access_pattern.__class__.__name__} projects values a snapshot can't hold: {e}"
+            ) from e
+        os.replace(tmp, path)
+
+        pointer = os.path.join(self.directory, f"{name}.current")
+        with open(f"{pointer}.{os.getpid()}.tmp", "w") as f:
+            f.write(str(version))
+        os.replace(f"{pointer}.{os.getpid()}.tmp", pointer)
+        self._remove_older(name, version)
+        logger.info("Published snapshot of `%s` with %s rows to `%s`", access_pattern.__class__.__name__, len(data), path)
+        return path
+
+    def _remove_older(self, name: str, version: int):
+        # Mapped files stay readable after unlinking, so readers aren't affected
+        for filename in os.listdir(self.directory):
+            parts = filename.split(".")
+            if len(parts) == 3 and parts[0] == name and parts[2] == "snap" and parts[1].isdigit() and int(parts[1]) < version:
+                try:
+                    os.unlink(os.path.join(self.directory, filename))
+                except FileNotFoundError:
+                    pass
+
+
+class SnapshotReader:
+    """
+        Reads resource sets from host-local snapshots, falling back to the
+        client (Redis, then the DB) when no usable snapshot exists.
+
+        The pointer file is checked at most every `check_interval` seconds;
+        when it names a new version the new file is mapped and swapped in, and
+        the previous mapping is released once nothing references it. Snapshots
+        older than the pattern's `ttl` are ignored, so a host whose publisher
+        has stopped falls back to the cache instead of serving stale data, as
+        are snapshots in a directory or file this user doesn't own.
+
+        Usage:
+            snapshots = SnapshotReader(client)
+            shelters = snapshots.get(SHELTERS)
+    """
+
+    def __init__(self, client, directory: str = DEFAULT_SNAPSHOT_DIR, check_interval: float = 1.0):
+        self.client = client
+        self.directory = directory
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        # local key -> (snapshot or None, version, monotonic time of the last check)
+        self._mapped: dict[Hashable, tuple[ResourceSnapshot | None, int | None, float]] = {}
+
+    def get(self, access_pattern: AccessPatternDB, **kwargs) -> Any:
+        snapshot = self.snapshot(access_pattern, **kwargs)
+        if snapshot is not None:
+            return snapshot
+        return self.client.get(access_pattern, **kwargs)
+
+    def snapshot(self, access_pattern: AccessPatternDB, **kwargs) -> ResourceSnapshot | None:
+        local_key = self.client._local_key(access_pattern, **kwargs)
+        snapshot, version, checked_at = self._mapped.get(local_key, (None, None, float("-inf")))
+        now = time.monotonic()
+        if now - checked_at >= self.check_interval:
+            snapshot = self._refresh(local_key, snapshot, version, now)
+        if snapshot is not None and time.time() - snapshot.published_at > access_pattern.ttl.value:
+            return None
+        return snapshot
+
+    def _refresh(self, local_key: Hashable, snapshot: ResourceSnapshot | None, version: int | None, now: float) -> ResourceSnapshot | None:
+        name = _snapshot_name(local_key)
+        try:
+            _private_directory(self.directory)
+            with os.fdopen(_open_owned(os.path.join(self.directory, f"{name}.current"))) as f:
+                current = int(f.read())
+            if current != version:
+                snapshot = ResourceSnapshot(os.path.join(self.directory, f"{name}.{current}.snap"))
+                version = current
+        except FileNotFoundError:
+            snapshot, version = None, None
+        except (OSError, ValueError):
+            logger.error("Failed to map snapshot `%s` from `%s`", name, self.directory, exc_info=True)
+            snapshot, version = None, None
+        with self._lock:
+            self._mapped[local_key] = (snapshot, version, now)
+        return snapshot
@@ -0,0 +1,258 @@
+import heapq
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Sequence
+from .access_patterns import AccessPatternDB
+from .exc import InvalidAccessPattern
+from .geo import _EARTH_RADIUS_M, coordinates, haversine_m
+from .projection import ProjectedRows
+from .snapshot import ResourceSnapshot
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+_M_PER_DEGREE = math.pi * _EARTH_RADIUS_M / 180
+
+
+class SpatialIndex:
+    """
+        Grid index over the locations of a cached resource set.
+
+        Points are bucketed into square cells of `cell_deg` degrees. `nearest()`
+        searches rings of cells outwards from the query point until no closer
+        point can exist, and `within()` only looks at the cells a radius can
+        reach, so a query touches a few dozen points instead of the whole set.
+        Distances are exact haversine metres, computed over NumPy arrays when
+        NumPy is installed (`pip install street-ninja-common[spatial]`) and in
+        pure Python otherwise.
+
+        Items without a location are left out of the index.
+
+        Usage:
+            index = SpatialIndex.from_resources(client.get(SHELTERS))
+            index.nearest(lat, lon, k=5)
+            index.within(lat, lon, radius=800)
+    """
+
+    def __init__(self, items: Sequence[Any], points: Sequence[tuple[float, float]], cell_deg: float = 0.01):
+        self.items = items
+        self.cell_deg = cell_deg
+        self._cells: dict[tuple[int, int], Any] = {}
+        lats = [lat for lat, _ in points]
+        lons = [lon for _, lon in points]
+        buckets: dict[tuple[int, int], list[int]] = {}
+        for i, (lat, lon) in enumerate(points):
+            buckets.setdefault(self._cell(lat, lon), []).append(i)
+
+        if buckets:
+            rows = [i for i, _ in buckets]
+            cols = [j for _, j in buckets]
+            self._bounds = (min(rows), max(rows), min(cols), max(cols))
+            max_lat = min(max(abs(lat) for lat in lats) + cell_deg, 89.0)
+        else:
+            self._bounds = (0, -1, 0, -1)
+            max_lat = 0.0
+        # Lower bound on the width of a cell anywhere in the grid, in metres
+        self._cell_m = cell_deg * _M_PER_DEGREE * math.cos(math.radians(max_lat))
+
+        if np is not None:
+            self._lat = np.radians(np.asarray(lats, dtype=np.float64))
+            self._lon = np.radians(np.asarray(lons, dtype=np.float64))
+            self._cos_lat = np.cos(self._lat)
+            self._cells = {cell: np.asarray(indices, dtype=np.intp) for cell, indices in buckets.items()}
+        else:
+            self._lat, self._lon = lats, lons
+            self._cells = buckets
+
+    @classmethod
+    def from_resources(cls, resources: Sequence[Any], location_field: str = "location", cell_deg: float = 0.01) -> "SpatialIndex":
+        """
+        Index model instances, `ProjectedRows` or a `ResourceSnapshot` by
+        `location_field`, a GEOS point or `(lat, lon)` tuple.
+        """
+        if isinstance(resources, (ProjectedRows, ResourceSnapshot)):
+            locations = resources.column(location_field)
+        else:
+            attr = location_field.replace("__", "_")
+            locations = [getattr(resource, attr) for resource in resources]
+        items, points = [], []
+        for resource, location in zip(resources, locations):
+            if location is not None:
+                items.append(resource)
+                points.append(coordinates(location))
+        return cls(items, points, cell_deg)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def nearest(self, lat: float, lon: float, k: int = 5, max_distance: float | None = None) -> list[tuple[float, Any]]:
+        """Up to `k` `(distance_m, item)` pairs, nearest first, optionally within `max_distance` metres."""
+        if k <= 0 or not self.items:
+            return []
+        ci, cj = self._cell(lat, lon)
+        min_i, max_i, min_j, max_j = self._bounds
+        first_ring = max(min_i - ci, ci - max_i, min_j - cj, cj - max_j, 0)
+        distances, indices = self._empty()
+        for ring in range(first_ring, self._max_ring(ci, cj) + 1):
+            distances, indices = self._extend(distances, indices, *self._distances(lat, lon, self._ring(ci, cj, ring)))
+            # Anything in a further ring is at least `ring` whole cells away
+            reach = ring * self._cell_m
+            if max_distance is not None and reach >= max_distance:
+                break
+            if len(distances) >= k and self._kth(distances, k) <= reach:
+                break
+        distances, indices = self._smallest(distances, indices, k)
+        return [
+            (distance, self.items[i]) for distance, i in zip(distances, indices)
+            if max_distance is None or distance <= max_distance
+        ]
+
+    def within(self, lat: float, lon: float, radius: float) -> list[tuple[float, Any]]:
+        """Every `(distance_m, item)` pair within `radius` metres, nearest first."""
+        if not self.items:
+            return []
+        ci, cj = self._cell(lat, lon)
+        rings = min(int(radius // self._cell_m) + 1, self._max_ring(ci, cj))
+        min_i, max_i, min_j, max_j = self._bounds
+        cells = [
+            (i, j)
+            for i in range(max(ci - rings, min_i), min(ci + rings, max_i) + 1)
+            for j in range(max(cj - rings, min_j), min(cj + rings, max_j) + 1)
+        ]
+        distances, indices = self._distances(lat, lon, cells)
+        if np is not None:
+            keep = distances <= radius
+            distances, indices = distances[keep], indices[keep]
+            order = np.argsort(distances, kind="stable")
+            return [(distance, self.items[i]) for distance, i in zip(distances[order].tolist(), indices[order].tolist())]
+        found = sorted((distance, i) for distance, i in zip(distances, indices) if distance <= radius)
+        return [(distance, self.items[i]) for distance, i in found]
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg)
+
+    def _max_ring(self, ci: int, cj: int) -> int:
+        min_i, max_i, min_j, max_j = self._bounds
+        return max(ci - min_i, max_i - ci, cj - min_j, max_j - cj, 0)
+
+    def _ring(self, ci: int, cj: int, ring: int) -> list[tuple[int, int]]:
+        """Cells exactly `ring` cells from (ci, cj), clipped to the occupied part of the grid."""
+        if ring == 0:
+            return [(ci, cj)]
+        min_i, max_i, min_j, max_j = self._bounds
+        rows = range(max(ci - ring, min_i), min(ci + ring, max_i) + 1)
+        cells = []
+        for i in (ci - ring, ci + ring):
+            if min_i <= i <= max_i:
+                cells += [(i, j) for j in range(max(cj - ring, min_j), min(cj + ring, max_j) + 1)]
+        for j in (cj - ring, cj + ring):
+            if min_j <= j <= max_j:
+                cells += [(i, j) for i in rows if i != ci - ring and i != ci + ring]
+        return cells
+
+    def _distances(self, lat: float, lon: float, cells: list[tuple[int, int]]) -> tuple[Any, Any]:
+        """Haversine distances from (lat, lon) to every point in `cells`, with their indices."""
+        buckets = [self._cells[cell] for cell in cells if cell in self._cells]
+        if np is None:
+            indices = [i for bucket in buckets for i in bucket]
+            return [haversine_m(lat, lon, self._lat[i], self._lon[i]) for i in indices], indices
+        if not buckets:
+            return self._empty()
+        indices = buckets[0] if len(buckets) == 1 else np.concatenate(buckets)
+        phi, lam = math.radians(lat), math.radians(lon)
+        a = (
+            np.sin((self._lat[indices] - phi) / 2) ** 2
+            + math.cos(phi) * self._cos_lat[indices] * np.sin((self._lon[indices] - lam) / 2) ** 2
+        )
+        return 2 * _EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0))), indices
+
+    @staticmethod
+    def _empty() -> tuple[Any, Any]:
+        if np is None:
+            return [], []
+        return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.intp)
+
+    @staticmethod
+    def _extend(distances: Any, indices: Any, more_distances: Any, more_indices: Any) -> tuple[Any, Any]:
+        if not len(more_distances):
+            return distances, indices
+        if np is None:
+            return distances + more_distances, indices + more_indices
+        return np.concatenate((distances, more_distances)), np.concatenate((indices, more_indices))
+
+    @staticmethod
+    def _kth(distances: Any, k: int) -> float:
+        if np is None:
+            return heapq.nsmallest(k, distances)[-1]
+        return float(np.partition(distances, k - 1)[k - 1])
+
+    @staticmethod
+    def _smallest(distances: Any, indices: Any, k: int) -> tuple[list[float], list[int]]:
+        """The `k` nearest, sorted, as plain lists."""
+        if np is None:
+            pairs = heapq.nsmallest(k, zip(distances, indices))
+            return [d for d, _ in pairs], [i for _, i in pairs]
+        if len(distances) > k:
+            keep = np.argpartition(distances, k - 1)[:k]
+            distances, indices = distances[keep], indices[keep]
+        order = np.lexsort((indices, distances))
+        return distances[order].tolist(), indices[order].tolist()
+
+
+class SpatialIndexCache:
+    """
+        Keeps a `SpatialIndex` next to each cached resource set and rebuilds it
+        only when the cached value changes.
+
+        The access pattern must use the L1 tier (`local_ttl`): the L1 hands back
+        the same decoded object until the entry expires or is invalidated, so an
+        identity check tells whether the index is still current. Indexes are
+        kept per cache key, for up to `max_entries` keys.
+
+        Usage:
+            shelter_index = SpatialIndexCache(client, SHELTERS)
+            shelter_index.get().nearest(lat, lon, k=5)
+    """
+
+    def __init__(
+            self,
+            client,
+            access_pattern: AccessPatternDB,
+            location_field: str = "location",
+            cell_deg: float = 0.01,
+            max_entries: int = 64,
+    ):
+        if access_pattern.local_ttl is None:
+            raise InvalidAccessPattern(
+                f"{access_pattern.__class__.__name__} needs a `local_ttl` to be indexed in-process"
+            )
+        self.client = client
+        self.access_pattern = access_pattern
+        self.location_field = location_field
+        self.cell_deg = cell_deg
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._indexes: OrderedDict[Hashable, tuple[Any, SpatialIndex]] = OrderedDict()
+        self.builds = 0
+
+    def get(self, **kwargs) -> SpatialIndex:
+        data = self.client.get(self.access_pattern, **kwargs)
+        local_key = self.client._local_key(self.access_pattern, **kwargs)
+        with self._lock:
+            entry = self._indexes.get(local_key)
+            if entry is not None and entry[0] is data:
+                self._indexes.move_to_end(local_key)
+                return entry[1]
+
+        index = SpatialIndex.from_resources(data, self.location_field, self.cell_deg)
+        with self._lock:
+            self.builds += 1
+            self._indexes[local_key] = (data, index)
+            self._indexes.move_to_end(local_key)
+            while len(self._indexes) > self.max_entries:
+                self._indexes.popitem(last=False)
+        return index
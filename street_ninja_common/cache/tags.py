@@ -0,0 +1,98 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any
+from django.core.cache import caches
+from django_redis import get_redis_connection
+from django_redis.cache import RedisCache
+from .enums import CacheStoreEnum
+
+
+# Extend, never shorten: patterns sharing a tag can have different TTLs, and the
+# set must outlive the longest-lived key recorded in it
+_EXTEND_SCRIPT = """
+if redis.call('TTL', KEYS[1]) < tonumber(ARGV[1]) then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+"""
+
+
+class TagIndex(ABC):
+    """
+    Tracks which cache keys carry a tag, per store. Members are
+    `"<version>:<key>"` strings, where `key` is the key before the cache
+    backend adds its prefix. A tag is kept for at least the `ttl` of every
+    `add`, the longest the tagged keys can live, and then dropped.
+    """
+
+    @abstractmethod
+    def add(self, store: CacheStoreEnum, tags: tuple[str, ...], members: list[str], ttl: int):
+        pass
+
+    @abstractmethod
+    def pop(self, store: CacheStoreEnum, tag: str) -> list[str]:
+        """Remove and return every member of `tag` in `store`."""
+        pass
+
+    def supports(self, store: CacheStoreEnum) -> bool:
+        """Whether `store` can hold tags, i.e. is visited by a default `invalidate_tag`."""
+        return True
+
+
+class RedisTagIndex(TagIndex):
+    """
+    One Redis set per store and tag, next to the tagged keys. Adding is a
+    single pipelined round trip for all of a write's tags, which also extends
+    each set's expiry to the write's TTL, and `pop` takes the whole set
+    atomically with `SPOP`, so keys tagged while an invalidation is running are
+    never lost.
+    """
+    # SPOP count larger than the set returns the whole set
+    _POP_ALL = 2 ** 31 - 1
+    _scripts: dict[str, Any] = {}
+
+    def add(self, store: CacheStoreEnum, tags: tuple[str, ...], members: list[str], ttl: int):
+        conn = get_redis_connection(store.value)
+        extend = self._scripts.get(store.value)
+        if extend is None:
+            extend = self._scripts[store.value] = conn.register_script(_EXTEND_SCRIPT)
+        pipeline = conn.pipeline(transaction=False)
+        for tag in tags:
+            key = self._set_key(store, tag)
+            pipeline.sadd(key, *members)
+            extend(keys=[key], args=[ttl], client=pipeline)
+        pipeline.execute()
+
+    def pop(self, store: CacheStoreEnum, tag: str) -> list[str]:
+        members = get_redis_connection(store.value).spop(self._set_key(store, tag), self._POP_ALL)
+        return [member.decode("utf-8") if isinstance(member, bytes) else member for member in members or []]
+
+    def supports(self, store: CacheStoreEnum) -> bool:
+        return isinstance(caches[store.value], RedisCache)
+
+    def _set_key(self, store: CacheStoreEnum, tag: str) -> str:
+        return caches[store.value].make_key(f"street_ninja:tag:{tag}")
+
+
+class LocalTagIndex(TagIndex):
+    """In-process tag index for single-process deployments, development and tests."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (store, tag) -> (members, expires at)
+        self._members: dict[tuple[str, str], tuple[set[str], float]] = {}
+
+    def add(self, store: CacheStoreEnum, tags: tuple[str, ...], members: list[str], ttl: int):
+        now = time.monotonic()
+        with self._lock:
+            for tag in tags:
+                tagged, expires_at = self._members.get((store.value, tag), (set(), 0.0))
+                if expires_at <= now:
+                    tagged = set()
+                tagged.update(members)
+                self._members[(store.value, tag)] = (tagged, max(expires_at, now + ttl))
+
+    def pop(self, store: CacheStoreEnum, tag: str) -> list[str]:
+        with self._lock:
+            tagged, expires_at = self._members.pop((store.value, tag), ((), 0.0))
+            return list(tagged) if expires_at > time.monotonic() else []
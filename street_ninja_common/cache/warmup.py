@@ -0,0 +1,196 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from typing import Callable, Iterable
+from django.db import connections
+from .access_patterns import AccessPatternDB
+from .circuit_breaker import CacheCircuitBreaker
+from .clients.client_db import CacheClientDB
+from .exc import InvalidAccessPattern
+
+
+logger = logging.getLogger(__name__)
+
+# A fixed list of key kwargs, or a callable returning one when the warm-up runs
+KwargsDomain = list[dict] | Callable[[], Iterable[dict]]
+
+
+@dataclass(frozen=True)
+class WarmupResult:
+    pattern: str
+    keys: int
+    written: int
+    failed: int
+    seconds: float
+
+
+class WarmupRegistry:
+    """
+        Access patterns to pre-fill after a deploy or a Redis flush, each with
+        the domain of key kwargs to warm (`None` for a pattern without kwargs).
+
+        Services register their patterns once, e.g. in `AppConfig.ready`, and
+        run them with `WarmupRunner`, the `warm_cache` management command or the
+        `warm_cache` Celery task.
+
+        Usage:
+            warmup_registry.register(SHELTERS)
+            warmup_registry.register(NEARBY_FOOD, lambda: [{"lat": lat, "lon": lon} for lat, lon in CITY_GRID])
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._patterns: dict[str, tuple[AccessPatternDB, KwargsDomain | None]] = {}
+
+    def register(self, access_pattern: AccessPatternDB, kwargs_domain: KwargsDomain | None = None, name: str | None = None):
+        name = name or access_pattern.__class__.__name__
+        with self._lock:
+            registered = self._patterns.get(name)
+            if registered is not None and registered[0] != access_pattern:
+                raise InvalidAccessPattern(f"Another access pattern is already registered for warm-up as `{name}`")
+            self._patterns[name] = (access_pattern, kwargs_domain)
+
+    def unregister(self, name: str):
+        with self._lock:
+            self._patterns.pop(name, None)
+
+    def names(self) -> list[str]:
+        with self._lock:
+            return list(self._patterns)
+
+    def resolve(self, names: Iterable[str] | None = None) -> list[tuple[str, AccessPatternDB, list[dict]]]:
+        """`(name, access_pattern, kwargs_list)` for `names`, or every registered pattern."""
+        with self._lock:
+            patterns = dict(self._patterns)
+        if names is None:
+            names = list(patterns)
+        unknown = [name for name in names if name not in patterns]
+        if unknown:
+            raise InvalidAccessPattern(f"No access patterns registered for warm-up as `{unknown}`")
+
+        resolved = []
+        for name in names:
+            access_pattern, kwargs_domain = patterns[name]
+            if kwargs_domain is None:
+                kwargs_list = [{}]
+            elif callable(kwargs_domain):
+                kwargs_list = list(kwargs_domain())
+            else:
+                kwargs_list = list(kwargs_domain)
+            resolved.append((name, access_pattern, kwargs_list))
+        return resolved
+
+
+warmup_registry = WarmupRegistry()
+
+
+class WarmupRunner:
+    """
+        Fills registered access patterns from the DB concurrently.
+
+        Keys are split into batches of `batch_size`, which run on up to
+        `max_workers` threads. At most `db_concurrency` DB queries run at once,
+        however many workers there are, so a warm-up doesn't swamp Postgres.
+        Each batch is written with one `set_many` call (a single pipelined
+        round trip on django-redis). Patterns whose store has an open circuit
+        breaker are skipped and reported as failed.
+
+        Usage:
+            results = WarmupRunner(CacheClientDB(CacheCircuitBreaker())).run()
+    """
+
+    def __init__(
+            self,
+            client: CacheClientDB,
+            registry: WarmupRegistry = warmup_registry,
+            max_workers: int = 8,
+            db_concurrency: int = 4,
+            batch_size: int = 100,
+    ):
+        self.client = client
+        self.registry = registry
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self._db_slots = threading.BoundedSemaphore(db_concurrency)
+
+    def run(self, names: Iterable[str] | None = None) -> list[WarmupResult]:
+        patterns = self.registry.resolve(names)
+        started = {name: time.perf_counter() for name, _, _ in patterns}
+        finished: dict[str, float] = {}
+        written = {name: 0 for name, _, _ in patterns}
+        failed = {name: 0 for name, _, _ in patterns}
+        remaining = {name: 0 for name, _, _ in patterns}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cache-warmup") as executor:
+            futures = {}
+            for name, access_pattern, kwargs_list in patterns:
+                if not self.client.circuit_breaker.allow(access_pattern.store):
+                    logger.warning("Cache circuit breaker open, skipping warm-up of `%s`", name)
+                    failed[name] = len(kwargs_list)
+                    continue
+                for i in range(0, len(kwargs_list), self.batch_size):
+                    batch = kwargs_list[i:i + self.batch_size]
+                    futures[executor.submit(self._warm_batch, access_pattern, batch)] = (name, len(batch))
+                    remaining[name] += 1
+
+            for future in as_completed(futures):
+                name, size = futures[future]
+                try:
+                    written[name] += future.result()
+                except Exception:
+                    logger.error("Cache warm-up batch of `%s` failed", name, exc_info=True)
+                    failed[name] += size
+                remaining[name] -= 1
+                if not remaining[name]:
+                    finished[name] = time.perf_counter()
+
+        results = []
+        for name, _, kwargs_list in patterns:
+            result = WarmupResult(
+                pattern=name,
+                keys=len(kwargs_list),
+                written=written[name],
+                failed=failed[name],
+                seconds=finished.get(name, started[name]) - started[name],
+            )
+            logger.info(
+                "Warmed `%s`: %s/%s keys in %.2fs (%s failed)",
+                result.pattern, result.written, result.keys, result.seconds, result.failed,
+            )
+            results.append(result)
+        return results
+
+    def _warm_batch(self, access_pattern: AccessPatternDB, kwargs_list: list[dict]) -> int:
+        try:
+            values = []
+            for kwargs in kwargs_list:
+                with self._db_slots:
+                    values.append(self.client._get_from_db(access_pattern, **kwargs))
+            self.client.set_many(values, access_pattern, kwargs_list)
+            return len(values)
+        finally:
+            # Worker threads open their own DB connections
+            connections.close_all()
+
+
+def warm_cache(
+        patterns: list[str] | None = None,
+        max_workers: int = 8,
+        db_concurrency: int = 4,
+        batch_size: int = 100,
+) -> list[dict]:
+    """
+    Warm registered access patterns and return JSON-serializable results.
+    Wrap it as a Celery task for beat schedules:
+
+        warm_cache_task = shared_task(name="cache.warm_cache")(warm_cache)
+    """
+    runner = WarmupRunner(
+        CacheClientDB(CacheCircuitBreaker()),
+        max_workers=max_workers,
+        db_concurrency=db_concurrency,
+        batch_size=batch_size,
+    )
+    return [asdict(result) for result in runner.run(patterns)]
@@ -0,0 +1,143 @@
+import atexit
+import logging
+import queue
+import threading
+from typing import TYPE_CHECKING, Any
+from .access_patterns import BaseCacheAccessPattern
+
+if TYPE_CHECKING:
+    from .clients.base import BaseCacheClient
+
+logger = logging.getLogger(__name__)
+
+# (client, value, access pattern, key kwargs)
+_Write = tuple["BaseCacheClient", Any, BaseCacheAccessPattern, dict]
+
+
+class WriteBehindQueue:
+    """
+        Bounded queue of cache writes flushed by a background thread.
+
+        `set` calls on patterns with `write_behind=True` return as soon as the
+        value is queued. The thread takes up to `batch_size` queued writes at a
+        time, keeps only the last write to each key, and sends the batch
+        through `client.pipeline()`, so encoding and the round trip both leave
+        the request path. When the queue is full new writes are dropped (and
+        counted in `dropped`) rather than blocking the caller. Writes that
+        fail are counted in `failed`: a value that can't be encoded is dropped
+        on its own, a failed round trip loses the client's whole batch. Writes still queued at interpreter exit
+        are flushed.
+
+        Only for values whose loss or brief delay is harmless: a `get` right
+        after a deferred `set` may still see the previous value, and values
+        must not be mutated after they are queued.
+
+        Clients share the module-level `write_behind_queue` unless given their
+        own.
+
+        Usage:
+            client = CacheClient(CacheCircuitBreaker(), write_behind=WriteBehindQueue(max_size=50_000))
+    """
+
+    def __init__(self, max_size: int = 10_000, batch_size: int = 100, flush_interval: float = 0.05):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.failed = 0
+        self._queue: queue.Queue[_Write] = queue.Queue(max_size)
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def put(self, client: "BaseCacheClient", value: Any, access_pattern: BaseCacheAccessPattern, **kwargs) -> bool:
+        """Queue a write; False when it was dropped because the queue is full or closed."""
+        if self._stopping.is_set():
+            self.dropped += 1
+            return False
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait((client, value, access_pattern, kwargs))
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Write-behind queue full, dropped write with AccessPattern `%s`", access_pattern.__class__.__name__)
+            return False
+        return True
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until every queued write has been sent; False on timeout."""
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(lambda: not self._queue.unfinished_tasks, timeout)
+
+    def close(self, timeout: float = 5.0):
+        """Flush what is queued and stop the thread. Later writes are dropped."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="cache-write-behind", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def _run(self):
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                if self._stopping.is_set():
+                    return
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch: list[_Write]):
+        # Only the last write to a key matters
+        latest: dict[tuple, _Write] = {}
+        for write in batch:
+            client, _, access_pattern, kwargs = write
+            try:
+                local_key = (id(client), client._local_key(access_pattern, **kwargs))
+            except Exception:
+                self.failed += 1
+                logger.error("Dropped write-behind write with AccessPattern `%s`", access_pattern.__class__.__name__, exc_info=True)
+                continue
+            latest.pop(local_key, None)
+            latest[local_key] = write
+
+        by_client: dict[int, list[_Write]] = {}
+        for write in latest.values():
+            by_client.setdefault(id(write[0]), []).append(write)
+        for writes in by_client.values():
+            pipeline = writes[0][0].pipeline()
+            for _, value, access_pattern, kwargs in writes:
+                # A value that can't be encoded mustn't take the rest of the batch with it
+                try:
+                    pipeline.set(value, access_pattern, **kwargs)
+                except Exception:
+                    self.failed += 1
+                    logger.error("Dropped write-behind write with AccessPattern `%s`", access_pattern.__class__.__name__, exc_info=True)
+            queued = len(pipeline)
+            try:
+                pipeline.execute()
+            except Exception:
+                self.failed += queued
+                logger.error("Write-behind batch of %s writes failed", queued, exc_info=True)
+
+
+write_behind_queue = WriteBehindQueue()
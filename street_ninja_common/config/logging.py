@@ -1,5 +1,83 @@
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 import colorlog
 
+
+LOG_COLORS = {
+    "DEBUG": "cyan",
+    "INFO": "green",
+    "WARNING": "yellow",
+    "ERROR": "red",
+    "CRITICAL": "bold_red",
+}
+
+
+class QueueListenerHandler(QueueHandler):
+    """
+    Hands records to a background `QueueListener` so request threads never wait
+    on console or file I/O. The listener owns the real handlers, which keep
+    their own levels and formatters, and is flushed and stopped at exit.
+
+    The listener is started by the first record each process emits, so workers
+    forked after `dictConfig` (gunicorn `--preload`, Celery prefork) get their
+    own queue and thread instead of the parent's, which didn't survive the fork.
+    Records are queued as they are and formatted on the listener thread, so
+    arguments mutated after the logging call are logged in their new state.
+
+    Configured from `LOGGING_PRODUCTION` via the `()` factory key.
+    """
+
+    def __init__(self, filename: str = "log.street_ninja.log", file_level: int | str = logging.WARNING, console_level: int | str = logging.INFO):
+        super().__init__(queue.SimpleQueue())
+
+        console = logging.StreamHandler()
+        console.setLevel(console_level)
+        console.setFormatter(colorlog.ColoredFormatter(
+            "%(log_color)s%(asctime)s - %(levelname)s - %(module)s - %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+            log_colors=LOG_COLORS,
+        ))
+        file = logging.FileHandler(filename)
+        file.setLevel(file_level)
+        file.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(module)s - %(message)s"))
+
+        self.targets = (console, file)
+        self.listener: QueueListener | None = None
+        self._pid: int | None = None
+        atexit.register(self.close)
+
+    def emit(self, record: logging.LogRecord):
+        # `handle()` holds the handler lock, which logging re-creates in forked children
+        if self._pid != os.getpid():
+            self._start()
+        super().emit(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue never leaves the process, so the record needn't be made
+        # picklable; formatting it here would cost the request thread as much
+        # as writing it synchronously
+        return record
+
+    def close(self):
+        # Called by logging.shutdown() and atexit; only the process that
+        # started the listener owns its thread
+        if self.listener is not None and self._pid == os.getpid():
+            self.listener.stop()
+            self.listener = None
+        super().close()
+
+    def _start(self):
+        if self._pid is not None:
+            # Forked: drop the records the parent had queued but not yet written
+            self.queue = queue.SimpleQueue()
+        self.listener = QueueListener(self.queue, *self.targets, respect_handler_level=True)
+        self.listener.start()
+        self._pid = os.getpid()
+
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -8,13 +86,7 @@ LOGGING = {
             "()": "colorlog.ColoredFormatter",
             "format": "%(log_color)s%(asctime)s - %(levelname)s - %(module)s - %(message)s",
             "datefmt": "%Y-%m-%d %H:%M:%S",
-            "log_colors": {
-                "DEBUG": "cyan",
-                "INFO": "green",
-                "WARNING": "yellow",
-                "ERROR": "red",
-                "CRITICAL": "bold_red",
-            },
+            "log_colors": LOG_COLORS,
         },
         "file": {
             "format": "%(asctime)s - %(levelname)s - %(module)s - %(message)s",
@@ -50,3 +122,35 @@ LOGGING = {
         },
     },
 }
+
+# Production variant: loggers stop at INFO so debug calls on cache hot paths
+# return before a LogRecord is built, and all output goes through a queue so
+# the FileHandler never blocks request threads.
+LOGGING_PRODUCTION = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "queue": {
+            "()": "street_ninja_common.config.logging.QueueListenerHandler",
+            "filename": "log.street_ninja.log",
+            "file_level": "WARNING",
+            "console_level": "INFO",
+        },
+    },
+    "loggers": {
+        "django": {
+            "handlers": ["queue"],
+            "level": "INFO",
+            "propagate": False,
+        },
+        "": {  # Root logger
+            "handlers": ["queue"],
+            "level": "INFO",
+        },
+        "django.utils.autoreload": {
+            "handlers": ["queue"],
+            "level": "WARNING",  # Suppress autoreload logs
+            "propagate": False,
+        },
+    },
+}
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from street_ninja_common.cache import CacheClientDB, CacheCircuitBreaker
+from street_ninja_common.cache.exc import InvalidAccessPattern
+from street_ninja_common.cache.warmup import WarmupRunner, warmup_registry
+
+
+class Command(BaseCommand):
+    help = "Fill the cache for access patterns registered for warm-up"
+
+    def add_arguments(self, parser):
+        parser.add_argument("patterns", nargs="*", help="Registered pattern names (default: all)")
+        parser.add_argument("--workers", type=int, default=8, help="Concurrent warm-up batches")
+        parser.add_argument("--db-concurrency", type=int, default=4, help="Maximum concurrent DB queries")
+        parser.add_argument("--batch-size", type=int, default=100, help="Keys written per set_many call")
+        parser.add_argument("--list", action="store_true", help="List registered patterns and exit")
+
+    def handle(self, *args, **options):
+        if options["list"]:
+            for name in warmup_registry.names():
+                self.stdout.write(name)
+            return
+
+        runner = WarmupRunner(
+            CacheClientDB(CacheCircuitBreaker()),
+            max_workers=options["workers"],
+            db_concurrency=options["db_concurrency"],
+            batch_size=options["batch_size"],
+        )
+        try:
+            results = runner.run(options["patterns"] or None)
+        except InvalidAccessPattern as e:
+            raise CommandError(str(e)) from e
+
+        for result in results:
+            line = f"{result.pattern}: {result.written}/{result.keys} keys in {result.seconds:.2f}s"
+            if result.failed:
+                self.stdout.write(self.style.WARNING(f"{line} ({result.failed} failed)"))
+            else:
+                self.stdout.write(self.style.SUCCESS(line))
+        if any(result.failed for result in results):
+            raise CommandError("Cache warm-up finished with failures")
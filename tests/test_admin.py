@@ -0,0 +1,111 @@
+import pytest
+from django.contrib.admin import AdminSite
+from django.contrib.auth.models import Permission, User
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import path, reverse
+from street_ninja_common.admin import BaseAdmin
+
+
+class PermissionAdmin(BaseAdmin):
+    # `content_type` is a foreign key, loaded once per row unless joined
+    list_display = ("name", "content_type")
+    search_fields = ("name",)
+
+
+class ContentTypeAdmin(BaseAdmin):
+    # `__str__` may read any field
+    list_display = ("__str__",)
+
+
+site = AdminSite(name="tests")
+site.register(Permission, PermissionAdmin)
+site.register(ContentType, ContentTypeAdmin)
+urlpatterns = [path("admin/", site.urls)]
+
+
+@pytest.mark.usefixtures("django_db_setup")
+@override_settings(ROOT_URLCONF=__name__)
+class ChangelistQueryCountTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def add_permissions(self, count: int):
+        for _ in range(count):
+            n = Permission.objects.count()
+            content_type = ContentType.objects.create(app_label="shelters", model=f"shelter{n}")
+            Permission.objects.create(name=f"Can view shelter {n}", codename=f"view_shelter{n}", content_type=content_type)
+
+    def changelist_queries(self, query: str = "", url: str = "tests:auth_permission_changelist") -> list[str]:
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(url) + query)
+        self.assertEqual(response.status_code, 200)
+        return [query["sql"] for query in queries.captured_queries]
+
+    def test_query_count_is_independent_of_rows(self):
+        self.add_permissions(10)
+        small = self.changelist_queries()
+        # Past a full page (`list_per_page` is 100)
+        self.add_permissions(150)
+        self.assertEqual(len(self.changelist_queries()), len(small))
+
+    def test_filtered_query_count_is_independent_of_rows(self):
+        self.add_permissions(10)
+        small = self.changelist_queries("?q=shelter")
+        self.add_permissions(150)
+        self.assertEqual(len(self.changelist_queries("?q=shelter")), len(small))
+
+    def test_undisplayed_columns_are_not_loaded(self):
+        self.add_permissions(10)
+        rows = [sql for sql in self.changelist_queries() if 'FROM "auth_permission"' in sql and "COUNT" not in sql]
+        self.assertTrue(rows)
+        for sql in rows:
+            columns = sql.split(" FROM ")[0]
+            self.assertNotIn('"auth_permission"."codename"', columns)
+
+    def test_str_column_loads_every_field(self):
+        self.add_permissions(10)
+        rows = [
+            sql for sql in self.changelist_queries(url="tests:contenttypes_contenttype_changelist")
+            if 'FROM "django_content_type"' in sql and "COUNT" not in sql
+        ]
+        self.assertTrue(rows)
+        for sql in rows:
+            columns = sql.split(" FROM ")[0]
+            self.assertIn('"django_content_type"."app_label"', columns)
+            self.assertIn('"django_content_type"."model"', columns)
+
+
+def test_geometries_are_deferred_only_on_opt_in():
+    try:
+        from street_ninja_common.admin import BaseGISAdmin
+    except ImproperlyConfigured:
+        pytest.skip("GeoDjango needs the GDAL library")
+    from django.contrib.gis.db import models
+
+    class Shelter(models.Model):
+        name = models.CharField(max_length=100)
+        location = models.PointField()
+        catchment = models.PolygonField(null=True)
+
+        class Meta:
+            app_label = "shelters"
+
+    class ShelterAdmin(BaseGISAdmin):
+        list_display = ("__str__", "location")
+
+    class DeferringShelterAdmin(ShelterAdmin):
+        defer_geometry = True
+
+    list_display = ShelterAdmin.list_display
+    assert ShelterAdmin(Shelter, site)._changelist_fields(list_display) is None
+    assert ShelterAdmin(Shelter, site)._changelist_deferred(list_display) == []
+    assert DeferringShelterAdmin(Shelter, site)._changelist_deferred(list_display) == ["catchment"]
@@ -0,0 +1,64 @@
+import time
+from dataclasses import dataclass
+from street_ninja_common.cache import (
+    AccessPatternDB, CacheCircuitBreaker, CacheClientDB, CacheStoreEnum, CircuitState, Seconds,
+)
+
+
+def test_leaked_probe_slot_expires():
+    breaker = CacheCircuitBreaker()
+    breaker.configure(failure_threshold=1, retry_timeout=0.05, half_open_probes=1)
+    store = CacheStoreEnum.GEO
+    try:
+        breaker.fail(store)
+        time.sleep(0.06)
+        # The probe's caller raises before reporting success or failure
+        assert breaker.allow(store)
+        assert not breaker.allow(store)
+
+        time.sleep(0.06)
+        assert not breaker.allow(store)
+        assert breaker.state(store) is CircuitState.OPEN
+
+        time.sleep(0.06)
+        assert breaker.allow(store)
+        breaker.success(store)
+        assert breaker.state(store) is CircuitState.CLOSED
+    finally:
+        breaker.configure(failure_threshold=3, retry_timeout=30.0, half_open_probes=1)
+
+
+@dataclass(frozen=True)
+class ShelterPattern(AccessPatternDB):
+
+    def key(self, **kwargs) -> str:
+        return f"{self._key_enum}:{kwargs['id']}"
+
+    def query_params(self, **kwargs) -> dict:
+        return kwargs
+
+
+def test_read_through_miss_is_one_probe():
+    breaker = CacheCircuitBreaker()
+    breaker.configure(failure_threshold=1, retry_timeout=0.05, half_open_probes=2)
+    client = CacheClientDB(breaker)
+    pattern = ShelterPattern(
+        store=CacheStoreEnum.TESTS, ttl=Seconds.HOUR, _key_enum="probe-shelter", value_type=dict,
+        query=lambda id: {"id": id},
+    )
+    store = pattern.store
+    try:
+        breaker.fail(store)
+        time.sleep(0.06)
+        # Reads the key, misses, and writes the DB result back: two successes, one probe
+        assert client.get(pattern, id=1) == {"id": 1}
+        assert breaker.state(store) is CircuitState.HALF_OPEN
+
+        # Writes that never asked `allow()` aren't probes
+        client.set({"id": 2}, pattern, id=2)
+        assert breaker.state(store) is CircuitState.HALF_OPEN
+
+        assert client.get(pattern, id=3) == {"id": 3}
+        assert breaker.state(store) is CircuitState.CLOSED
+    finally:
+        breaker.configure(failure_threshold=3, retry_timeout=30.0, half_open_probes=1)
@@ -0,0 +1,110 @@
+from dataclasses import dataclass, field, replace
+import pytest
+from django.conf import settings
+from django.test import override_settings
+from street_ninja_common.cache import (
+    BaseCacheAccessPattern, CacheClient, CacheCircuitBreaker, CacheStoreEnum, CircuitState, RedisClientException,
+    Seconds, SessionCacheClient,
+)
+from street_ninja_common.cache.exc import InvalidAccessPattern
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@dataclass
+class PhoneSession:
+    phone: str
+    step: str = "menu"
+    score: float = 0.5
+    history: list[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class PhoneSessionPattern(BaseCacheAccessPattern):
+
+    def key(self, **kwargs) -> str:
+        return f"phone:{kwargs['phone']}"
+
+
+PHONE_SESSION = PhoneSessionPattern(
+    store=CacheStoreEnum.PHONE_SESSION,
+    ttl=Seconds.MINUTES_FIFTEEN,
+    _key_enum="phone",
+    value_type=PhoneSession,
+)
+
+
+@pytest.fixture
+def sessions():
+    caches = {
+        **settings.CACHES,
+        CacheStoreEnum.PHONE_SESSION.value: {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": "redis://localhost:6379/0",
+            "OPTIONS": {"CONNECTION_POOL_KWARGS": {"connection_class": fakeredis.FakeRedisConnection}},
+        },
+    }
+    breaker = CacheCircuitBreaker()
+    with override_settings(CACHES=caches):
+        yield SessionCacheClient(breaker)
+    assert breaker.state(CacheStoreEnum.PHONE_SESSION) is CircuitState.CLOSED
+
+
+def test_incr_on_non_integer_field_is_not_a_store_failure(sessions):
+    sessions.set(PhoneSession("604"), PHONE_SESSION, phone="604")
+    for _ in range(5):
+        with pytest.raises(InvalidAccessPattern):
+            sessions.incr(PHONE_SESSION, "score", phone="604")
+    assert sessions.get(PHONE_SESSION, phone="604").score == 0.5
+
+
+def test_transaction_propagates_application_errors(sessions):
+    sessions.set(PhoneSession("604"), PHONE_SESSION, phone="604")
+
+    def fn(session: PhoneSession) -> PhoneSession:
+        raise ValueError("no such menu option")
+
+    for _ in range(5):
+        with pytest.raises(ValueError):
+            sessions.transaction(PHONE_SESSION, fn, phone="604")
+    assert sessions.transaction(PHONE_SESSION, lambda s: replace(s, step="shelters"), phone="604").step == "shelters"
+
+
+def test_legacy_string_session(sessions):
+    # Written by CacheClient before the pattern moved to SessionCacheClient
+    CacheClient(sessions.circuit_breaker).set(PhoneSession("604"), PHONE_SESSION, phone="604")
+    for _ in range(5):
+        with pytest.raises(InvalidAccessPattern):
+            sessions.get(PHONE_SESSION, phone="604")
+
+    sessions.invalidate(PHONE_SESSION, phone="604")
+    sessions.set(PhoneSession("604", history=["menu"]), PHONE_SESSION, phone="604")
+    assert sessions.get(PHONE_SESSION, phone="604").history == ["menu"]
+
+
+def test_connection_errors_open_the_breaker(sessions, monkeypatch):
+    breaker = sessions.circuit_breaker
+    monkeypatch.setattr(fakeredis.FakeRedisConnection, "send_packed_command", connection_refused)
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(RedisClientException):
+            sessions.get(PHONE_SESSION, phone="604")
+    assert breaker.state(CacheStoreEnum.PHONE_SESSION) is CircuitState.OPEN
+
+    # Recover through a half-open probe, as after a real outage
+    monkeypatch.undo()
+    retry_timeout = breaker.retry_timeout
+    breaker.configure(retry_timeout=0)
+    try:
+        assert sessions.get_or_none(PHONE_SESSION, phone="778") is None
+    finally:
+        breaker.configure(retry_timeout=retry_timeout)
+
+
+def connection_refused(*args, **kwargs):
+    from redis.exceptions import ConnectionError
+    raise ConnectionError("Connection refused")
+
+
+def test_pipeline_is_not_supported(sessions):
+    with pytest.raises(InvalidAccessPattern):
+        sessions.pipeline()
@@ -0,0 +1,79 @@
+import time
+from dataclasses import dataclass
+import pytest
+from street_ninja_common.cache import (
+    BaseCacheAccessPattern, CacheClient, CacheCircuitBreaker, CacheStoreEnum, InvalidationBus, LocalCache,
+    LocalPubSubTransport, Seconds,
+)
+
+
+# LocalCache is a per-process singleton; a subclass gets its own instance, so
+# each one stands in for the L1 tier of a separate worker process
+class WorkerOneCache(LocalCache):
+    _instance = None
+
+
+class WorkerTwoCache(LocalCache):
+    _instance = None
+
+
+@dataclass(frozen=True)
+class Shelter:
+    name: str
+    beds: int
+
+
+@dataclass(frozen=True)
+class ShelterPattern(BaseCacheAccessPattern):
+
+    def key(self, **kwargs) -> str:
+        return f"shelter:{kwargs['id']}"
+
+
+SHELTER = ShelterPattern(
+    store=CacheStoreEnum.TESTS,
+    ttl=Seconds.HOUR,
+    _key_enum="shelter",
+    value_type=Shelter,
+    local_ttl=Seconds.MINUTE,
+)
+
+
+def wait_for(condition, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def workers():
+    transport = LocalPubSubTransport()
+    buses = [InvalidationBus(transport, cache) for cache in (WorkerOneCache(), WorkerTwoCache())]
+    for bus in buses:
+        bus.start()
+    # Messages published before a listener subscribes are not delivered to it
+    assert wait_for(lambda: len(transport._subscribers.get(InvalidationBus.CHANNEL, [])) == len(buses))
+    yield [CacheClient(CacheCircuitBreaker(), bus.local_cache, invalidation_bus=bus) for bus in buses]
+    for bus in buses:
+        bus.stop()
+        bus.local_cache.clear()
+
+
+def test_invalidate_drops_l1_entry_in_other_process(workers):
+    one, two = workers
+    one.set(Shelter("Union Gospel Mission", 40), SHELTER, id=1)
+    two.set(Shelter("Covenant House", 12), SHELTER, id=2)
+    assert two.get(SHELTER, id=1) == Shelter("Union Gospel Mission", 40)
+    assert two.get(SHELTER, id=2) == Shelter("Covenant House", 12)
+    local_key = two._local_key(SHELTER, id=1)
+    assert two.local_cache.get(local_key) is not None
+
+    one.invalidate(SHELTER, id=1)
+
+    assert wait_for(lambda: two.local_cache.get(local_key) is None)
+    assert two.get(SHELTER, id=1) is None
+    # Other keys stay cached
+    assert two.local_cache.get(two._local_key(SHELTER, id=2)) == Shelter("Covenant House", 12)
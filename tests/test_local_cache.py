@@ -0,0 +1,76 @@
+from dataclasses import dataclass
+import pytest
+from street_ninja_common.cache import (
+    AccessPatternDB, BaseCacheAccessPattern, CacheClient, CacheClientDB, CacheCircuitBreaker, CacheStoreEnum,
+    LocalCache, Seconds,
+)
+from street_ninja_common.cache.exc import InvalidAccessPattern
+
+
+@dataclass
+class Menu:
+    items: list[str]
+
+
+@dataclass(frozen=True)
+class FrozenMenu:
+    items: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class MenuPattern(BaseCacheAccessPattern):
+
+    def key(self, **kwargs) -> str:
+        return f"{self._key_enum}:{kwargs['id']}"
+
+
+@dataclass(frozen=True)
+class MenusPattern(AccessPatternDB):
+
+    def key(self, **kwargs) -> str:
+        return f"{self._key_enum}:all"
+
+
+@pytest.fixture
+def local_cache():
+    local_cache = LocalCache()
+    yield local_cache
+    local_cache.clear()
+
+
+@pytest.mark.parametrize("value_type", [list, dict, set, Menu])
+def test_local_ttl_rejects_mutable_values(value_type):
+    with pytest.raises(InvalidAccessPattern):
+        MenuPattern(
+            store=CacheStoreEnum.TESTS, ttl=Seconds.HOUR, _key_enum="menu", value_type=value_type,
+            local_ttl=Seconds.MINUTE,
+        )
+    # Without the L1 tier every read decodes its own copy
+    MenuPattern(store=CacheStoreEnum.TESTS, ttl=Seconds.HOUR, _key_enum="menu", value_type=value_type)
+
+
+def test_projected_patterns_can_use_local_ttl():
+    MenusPattern(
+        store=CacheStoreEnum.TESTS, ttl=Seconds.HOUR, _key_enum="menus", value_type=list, query=list,
+        projection=("id", "name"), local_ttl=Seconds.MINUTE,
+    )
+
+
+def test_l1_hits_share_one_object(local_cache):
+    client = CacheClient(CacheCircuitBreaker(), local_cache)
+    pattern = MenuPattern(
+        store=CacheStoreEnum.TESTS, ttl=Seconds.HOUR, _key_enum="frozen-menu", value_type=FrozenMenu,
+        local_ttl=Seconds.MINUTE,
+    )
+    client.set(FrozenMenu(("soup", "bread")), pattern, id=1)
+    first = client.get(pattern, id=1)
+    assert client.get(pattern, id=1) is first
+
+    db_client = CacheClientDB(CacheCircuitBreaker(), local_cache)
+    rows = MenusPattern(
+        store=CacheStoreEnum.TESTS, ttl=Seconds.HOUR, _key_enum="menus", value_type=tuple,
+        query=lambda: ("soup", "bread"), local_ttl=Seconds.MINUTE,
+    )
+    db_client.get(rows)
+    first = db_client.get(rows)
+    assert db_client.get(rows) is first
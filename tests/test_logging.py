@@ -0,0 +1,37 @@
+import logging
+import os
+import pytest
+from street_ninja_common.config.logging import QueueListenerHandler
+
+
+@pytest.fixture
+def queued_logger(tmp_path):
+    handler = QueueListenerHandler(filename=str(tmp_path / "queued.log"), console_level=logging.CRITICAL)
+    logger = logging.getLogger("tests.queued")
+    logger.propagate = False
+    logger.addHandler(handler)
+    yield logger, handler, tmp_path / "queued.log"
+    logger.removeHandler(handler)
+    handler.close()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_forked_worker_starts_its_own_listener(queued_logger):
+    logger, handler, path = queued_logger
+    logger.warning("from the parent")
+
+    pid = os.fork()
+    if pid == 0:
+        # Forked worker, like gunicorn --preload: the parent's listener thread is gone
+        try:
+            logger.warning("from the worker")
+            handler.close()
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+    handler.close()
+    handler.close()
+
+    lines = path.read_text().splitlines()
+    assert sum("from the parent" in line for line in lines) == 1
+    assert sum("from the worker" in line for line in lines) == 1
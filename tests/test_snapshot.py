@@ -0,0 +1,78 @@
+import os
+from collections import namedtuple
+from dataclasses import dataclass
+from decimal import Decimal
+import pytest
+from street_ninja_common.cache import (
+    AccessPatternDB, CacheClientDB, CacheCircuitBreaker, CacheStoreEnum, Seconds, SnapshotPublisher, SnapshotReader,
+)
+from street_ninja_common.cache.exc import InvalidAccessPattern
+
+
+Shelter = namedtuple("Shelter", ["id", "name", "location", "services"])
+SHELTERS = [
+    Shelter(1, "Union Gospel Mission", (49.2813, -123.0996), {"beds": 40, "meals": ["breakfast", "dinner"]}),
+    Shelter(2, "Covenant House", (49.2770, -123.1290), None),
+]
+
+
+@dataclass(frozen=True)
+class SheltersPattern(AccessPatternDB):
+
+    def key(self, **kwargs) -> str:
+        return f"{self._key_enum}:all"
+
+
+def shelters(name: str, rows: list) -> SheltersPattern:
+    return SheltersPattern(
+        store=CacheStoreEnum.TESTS, ttl=Seconds.HOUR, _key_enum=f"snapshot-{name}", value_type=list,
+        query=lambda: rows, projection=("id", "name", "location", "services"),
+    )
+
+
+@pytest.fixture
+def client():
+    return CacheClientDB(CacheCircuitBreaker())
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path / "snapshots")
+
+
+def test_publish_and_read(client, directory):
+    pattern = shelters("round-trip", SHELTERS)
+    SnapshotPublisher(client, directory).publish(pattern)
+
+    snapshot = SnapshotReader(client, directory).snapshot(pattern)
+    assert snapshot is not None
+    assert list(snapshot) == list(client.get(pattern))
+    assert snapshot[0].services == {"beds": 40, "meals": ["breakfast", "dinner"]}
+    assert os.stat(directory).st_mode & 0o777 == 0o700
+
+
+def test_values_json_cant_hold_are_refused(client, directory):
+    pattern = shelters("decimal", [Shelter(1, "Union Gospel Mission", (49.28, -123.10), Decimal("1.5"))])
+    with pytest.raises(InvalidAccessPattern):
+        SnapshotPublisher(client, directory).publish(pattern)
+
+
+def test_directory_writable_by_others_is_refused(client, directory):
+    pattern = shelters("shared-dir", SHELTERS)
+    SnapshotPublisher(client, directory).publish(pattern)
+    os.chmod(directory, 0o777)
+
+    with pytest.raises(PermissionError):
+        SnapshotPublisher(client, directory).publish(pattern)
+    assert SnapshotReader(client, directory).snapshot(pattern) is None
+
+
+@pytest.mark.skipif(os.getuid() != 0, reason="changing a file's owner needs root")
+def test_files_owned_by_other_users_are_ignored(client, directory):
+    pattern = shelters("foreign-file", SHELTERS)
+    path = SnapshotPublisher(client, directory).publish(pattern)
+    os.chown(path, 65534, -1)
+
+    reader = SnapshotReader(client, directory)
+    assert reader.snapshot(pattern) is None
+    assert list(reader.get(pattern)) == list(client.get(pattern))
@@ -0,0 +1,105 @@
+import threading
+import time
+from dataclasses import dataclass
+from django.core.cache import caches
+from street_ninja_common.cache import AccessPatternDB, CacheClientDB, CacheCircuitBreaker, CacheStoreEnum, Seconds
+from street_ninja_common.cache.single_flight import SingleFlight
+
+
+PROCESSES = 4
+THREADS_PER_PROCESS = 8
+ROWS = [{"id": i, "name": f"Shelter {i}"} for i in range(100)]
+
+
+@dataclass(frozen=True)
+class SheltersPattern(AccessPatternDB):
+
+    def key(self, **kwargs) -> str:
+        return f"{self._key_enum}:all"
+
+
+class CountingQuery:
+
+    def __init__(self, latency: float = 0.2):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return ROWS
+
+
+def clients() -> list[CacheClientDB]:
+    """One client per simulated worker process, each with its own single-flight group."""
+    result = []
+    for _ in range(PROCESSES):
+        client = CacheClientDB(CacheCircuitBreaker())
+        client._single_flight = SingleFlight()
+        result.append(client)
+    return result
+
+
+def stampede(pattern: SheltersPattern) -> list:
+    barrier = threading.Barrier(PROCESSES * THREADS_PER_PROCESS)
+    results = []
+
+    def worker(client: CacheClientDB):
+        barrier.wait()
+        results.append(client.get(pattern))
+
+    threads = [
+        threading.Thread(target=worker, args=(client,))
+        for client in clients() for _ in range(THREADS_PER_PROCESS)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_one_db_query_for_concurrent_misses():
+    query = CountingQuery()
+    pattern = SheltersPattern(
+        store=CacheStoreEnum.TESTS,
+        ttl=Seconds.HOUR,
+        _key_enum="stampede",
+        value_type=list,
+        query=query,
+        lock_ttl=Seconds.MINUTE_HALF,
+    )
+
+    results = stampede(pattern)
+
+    assert query.calls == 1
+    assert len(results) == PROCESSES * THREADS_PER_PROCESS
+    assert all(result == ROWS for result in results)
+
+
+def test_waiters_query_db_when_lock_holder_never_writes():
+    query = CountingQuery(latency=0.0)
+    pattern = SheltersPattern(
+        store=CacheStoreEnum.TESTS,
+        ttl=Seconds.HOUR,
+        _key_enum="stampede-abandoned",
+        value_type=list,
+        query=query,
+        lock_ttl=Seconds.MINUTE_HALF,
+        lock_timeout=0.2,
+    )
+    # A worker that took the lock and died before writing the value
+    lock_key = CacheClientDB(CacheCircuitBreaker())._lock_key(pattern)
+    assert caches[pattern.store.value].add(lock_key, "crashed-worker", timeout=30, version=pattern.version)
+
+    started = time.monotonic()
+    results = stampede(pattern)
+
+    assert time.monotonic() - started >= pattern.lock_timeout
+    # Each process's single-flight leader gives up waiting and queries once,
+    # unless another process's result is already cached when it wakes
+    assert 1 <= query.calls <= PROCESSES
+    assert len(results) == PROCESSES * THREADS_PER_PROCESS
+    assert all(result == ROWS for result in results)
@@ -0,0 +1,65 @@
+from dataclasses import dataclass
+import pytest
+from django.conf import settings
+from django.test import override_settings
+from django_redis import get_redis_connection
+from street_ninja_common.cache import (
+    AccessPatternDB, CacheClientDB, CacheCircuitBreaker, CacheStoreEnum, CircuitState, Seconds,
+)
+from street_ninja_common.cache.tags import RedisTagIndex
+
+
+def test_invalidate_tag_skips_stores_without_redis():
+    breaker = CacheCircuitBreaker()
+    client = CacheClientDB(breaker, tag_index=RedisTagIndex())
+
+    assert client.invalidate_tag("shelters") == 0
+    assert all(breaker.state(store) is CircuitState.CLOSED for store in CacheStoreEnum)
+
+
+@dataclass(frozen=True)
+class ShelterPattern(AccessPatternDB):
+
+    def key(self, **kwargs) -> str:
+        return f"{self._key_enum}:{kwargs['id']}"
+
+
+def shelters(ttl: Seconds) -> ShelterPattern:
+    return ShelterPattern(
+        store=CacheStoreEnum.RESOURCES, ttl=ttl, _key_enum=f"tagged-{ttl.name}", value_type=dict,
+        query=dict, tags=("shelters",),
+    )
+
+
+@pytest.fixture
+def redis_client():
+    fakeredis = pytest.importorskip("fakeredis")
+    caches = {
+        **settings.CACHES,
+        CacheStoreEnum.RESOURCES.value: {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": "redis://localhost:6379/1",
+            "OPTIONS": {"CONNECTION_POOL_KWARGS": {"connection_class": fakeredis.FakeRedisConnection}},
+        },
+    }
+    with override_settings(CACHES=caches):
+        yield CacheClientDB(CacheCircuitBreaker(), tag_index=RedisTagIndex())
+
+
+def test_tag_sets_expire_with_their_longest_lived_key(redis_client):
+    tag_index = redis_client.tag_index
+    conn = get_redis_connection(CacheStoreEnum.RESOURCES.value)
+    tag_key = tag_index._set_key(CacheStoreEnum.RESOURCES, "shelters")
+
+    redis_client.set({"beds": 40}, shelters(Seconds.HOUR), id=1)
+    assert 0 < conn.ttl(tag_key) <= Seconds.HOUR.value
+
+    # A shorter-lived key doesn't cut the set's lifetime short
+    redis_client.set({"beds": 12}, shelters(Seconds.MINUTE), id=2)
+    assert conn.ttl(tag_key) > Seconds.MINUTE.value
+
+    redis_client.set({"beds": 8}, shelters(Seconds.DAY), id=3)
+    assert conn.ttl(tag_key) > Seconds.HOUR.value
+
+    assert redis_client.invalidate_tag("shelters") == 3
+    assert not conn.exists(tag_key)
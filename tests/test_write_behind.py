@@ -0,0 +1,42 @@
+from dataclasses import dataclass
+from street_ninja_common.cache import (
+    BaseCacheAccessPattern, CacheClient, CacheCircuitBreaker, CacheStoreEnum, Seconds, WriteBehindQueue,
+)
+
+
+@dataclass
+class Menu:
+    phone: str
+    options: list
+
+
+@dataclass(frozen=True)
+class MenuPattern(BaseCacheAccessPattern):
+
+    def key(self, **kwargs) -> str:
+        return f"menu:{kwargs['phone']}"
+
+
+MENU = MenuPattern(
+    store=CacheStoreEnum.TESTS,
+    ttl=Seconds.HOUR,
+    _key_enum="menu",
+    value_type=Menu,
+    write_behind=True,
+)
+
+
+def test_unencodable_value_only_drops_its_own_write():
+    queue = WriteBehindQueue()
+    client = CacheClient(CacheCircuitBreaker(), write_behind=queue)
+    try:
+        client.set(Menu("bad", [object()]), MENU, phone="bad")
+        for n in range(10):
+            client.set(Menu(str(n), ["shelters", "food"]), MENU, phone=str(n))
+        assert queue.flush(timeout=5)
+    finally:
+        queue.close()
+
+    assert queue.failed == 1
+    assert client.get(MENU, phone="bad") is None
+    assert all(client.get(MENU, phone=str(n)) == Menu(str(n), ["shelters", "food"]) for n in range(10))